@@ -1,23 +1,68 @@
 import os
+import asyncio
 from motor.motor_asyncio import AsyncIOMotorClient
+from pymongo import ReadPreference
 from beanie import init_beanie
 from app.models.user import User
 from app.models.organization import Organization
-from app.models.note import Note
+from app.models.note import Note, NoteTombstone
+from app.models.session import Session
+from app.models.revoked_token import RevokedToken
+from app.database.settings import (
+    client_options, OPERATION_READ_PREFERENCES, MONGO_MIN_POOL_SIZE, MONGO_WARMUP_CONNECTIONS
+)
+from app.database.metrics import pool_metrics
 
 client = None
 
+# Topologies where multi-document transactions are available
+TRANSACTION_TOPOLOGIES = ("ReplicaSetWithPrimary", "Sharded", "LoadBalanced")
+
 async def connect_to_mongo():
     global client
     mongo_url = os.getenv("MONGO_URL", "mongodb://localhost:27017")
     database_name = os.getenv("MONGO_DB", "notes_api")
     
-    client = AsyncIOMotorClient(mongo_url)
+    client = AsyncIOMotorClient(mongo_url, event_listeners=[pool_metrics], **client_options())
     await init_beanie(
         database=client[database_name],
-        document_models=[User, Organization, Note]
+        document_models=[User, Organization, Note, NoteTombstone, Session, RevokedToken]
     )
+    await warm_connection_pool(client)
+
+async def warm_connection_pool(motor_client):
+    """Open connections ahead of traffic with concurrent pings"""
+    connections = MONGO_WARMUP_CONNECTIONS
+    if connections is None:
+        connections = max(1, MONGO_MIN_POOL_SIZE or 0)
+    await asyncio.gather(*[motor_client.admin.command("ping") for _ in range(connections)])
 
 async def close_mongo_connection():
     if client:
-        client.close()
\ No newline at end of file
+        client.close()
+
+def supports_transactions(motor_client) -> bool:
+    topology = getattr(motor_client, "topology_description", None)
+    return getattr(topology, "topology_type_name", None) in TRANSACTION_TOPOLOGIES
+
+async def run_in_transaction(operation):
+    """Await ``operation(session)`` inside a multi-document transaction.
+
+    Standalone servers cannot run transactions, so there ``operation`` is
+    awaited with ``session=None`` and has to undo partial writes itself.
+    """
+    motor_client = User.get_motor_collection().database.client
+    if not supports_transactions(motor_client):
+        return await operation(None)
+    async with await motor_client.start_session() as session:
+        # with_transaction retries transient errors and unknown commit results
+        return await session.with_transaction(operation)
+
+
+def read_collection(document_model, operation: str):
+    """Motor collection of ``document_model`` with the read preference for ``operation``"""
+    collection = document_model.get_motor_collection()
+    read_preference = OPERATION_READ_PREFERENCES.get(operation, ReadPreference.PRIMARY)
+    if read_preference == ReadPreference.PRIMARY:
+        return collection
+    return collection.with_options(read_preference=read_preference)
@@ -0,0 +1,66 @@
+import os
+from typing import Optional
+from pymongo.read_preferences import make_read_preference, read_pref_mode_from_name
+
+def _optional_int(name: str) -> Optional[int]:
+    value = os.getenv(name)
+    return int(value) if value not in (None, "") else None
+
+# Connection pool and timeouts; unset values keep the driver defaults
+MONGO_MAX_POOL_SIZE = _optional_int("MONGO_MAX_POOL_SIZE")
+MONGO_MIN_POOL_SIZE = _optional_int("MONGO_MIN_POOL_SIZE")
+MONGO_MAX_IDLE_TIME_MS = _optional_int("MONGO_MAX_IDLE_TIME_MS")
+MONGO_WAIT_QUEUE_TIMEOUT_MS = _optional_int("MONGO_WAIT_QUEUE_TIMEOUT_MS")
+MONGO_SERVER_SELECTION_TIMEOUT_MS = _optional_int("MONGO_SERVER_SELECTION_TIMEOUT_MS")
+MONGO_CONNECT_TIMEOUT_MS = _optional_int("MONGO_CONNECT_TIMEOUT_MS")
+MONGO_SOCKET_TIMEOUT_MS = _optional_int("MONGO_SOCKET_TIMEOUT_MS")
+# Comma separated, in preference order, e.g. "zstd,snappy,zlib"
+MONGO_COMPRESSORS = os.getenv("MONGO_COMPRESSORS", "")
+# Connections opened at startup so the first requests do not pay for the handshake
+MONGO_WARMUP_CONNECTIONS = _optional_int("MONGO_WARMUP_CONNECTIONS")
+
+# Secondary reads mode: note reads default to secondaries with bounded staleness, and
+# clients keep read-your-writes by echoing back the causal token of their last write
+SECONDARY_READS = os.getenv("SECONDARY_READS", "false").lower() in ("1", "true", "yes")
+_DEFAULT_NOTE_READ_PREFERENCE = "secondaryPreferred" if SECONDARY_READS else "primary"
+
+# Per-operation read preference: primary, primaryPreferred, secondary, secondaryPreferred
+# or nearest. Everything not listed here, and every write, stays on the primary.
+MONGO_LISTING_READ_PREFERENCE = os.getenv("MONGO_LISTING_READ_PREFERENCE", _DEFAULT_NOTE_READ_PREFERENCE)
+MONGO_SEARCH_READ_PREFERENCE = os.getenv("MONGO_SEARCH_READ_PREFERENCE", _DEFAULT_NOTE_READ_PREFERENCE)
+MONGO_GET_READ_PREFERENCE = os.getenv("MONGO_GET_READ_PREFERENCE", _DEFAULT_NOTE_READ_PREFERENCE)
+# Secondaries further behind than this are not read from (-1 disables, otherwise >= 90)
+MONGO_MAX_STALENESS_SECONDS = int(
+    os.getenv("MONGO_MAX_STALENESS_SECONDS", "90" if SECONDARY_READS else "-1")
+)
+
+def client_options() -> dict:
+    """Keyword arguments for AsyncIOMotorClient built from the settings above"""
+    options = {
+        "maxPoolSize": MONGO_MAX_POOL_SIZE,
+        "minPoolSize": MONGO_MIN_POOL_SIZE,
+        "maxIdleTimeMS": MONGO_MAX_IDLE_TIME_MS,
+        "waitQueueTimeoutMS": MONGO_WAIT_QUEUE_TIMEOUT_MS,
+        "serverSelectionTimeoutMS": MONGO_SERVER_SELECTION_TIMEOUT_MS,
+        "connectTimeoutMS": MONGO_CONNECT_TIMEOUT_MS,
+        "socketTimeoutMS": MONGO_SOCKET_TIMEOUT_MS,
+    }
+    options = {key: value for key, value in options.items() if value is not None}
+    if MONGO_COMPRESSORS:
+        options["compressors"] = MONGO_COMPRESSORS
+    return options
+
+def parse_read_preference(name: str, max_staleness: int = MONGO_MAX_STALENESS_SECONDS):
+    """pymongo read preference from its name in connection-string form"""
+    mode = read_pref_mode_from_name(name)
+    # Staleness bounds only apply to modes that may read from a secondary
+    if name == "primary":
+        max_staleness = -1
+    return make_read_preference(mode, None, max_staleness)
+
+# Read preference used by each read-heavy operation
+OPERATION_READ_PREFERENCES = {
+    "listing": parse_read_preference(MONGO_LISTING_READ_PREFERENCE),
+    "search": parse_read_preference(MONGO_SEARCH_READ_PREFERENCE),
+    "get": parse_read_preference(MONGO_GET_READ_PREFERENCE),
+}
@@ -0,0 +1,224 @@
+import os
+import zlib
+from typing import Callable, Dict, Optional, Tuple
+
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.services.cache import TTLCache
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover - optional dependency
+    brotli = None
+
+try:
+    import zstandard
+except ImportError:  # pragma: no cover - optional dependency
+    zstandard = None
+
+# Compression configuration
+COMPRESSION_MIN_SIZE = int(os.getenv("COMPRESSION_MIN_SIZE", "1024"))
+COMPRESSION_LEVEL = int(os.getenv("COMPRESSION_LEVEL", "6"))
+COMPRESSION_CACHE_SIZE = int(os.getenv("COMPRESSION_CACHE_SIZE", "256"))
+COMPRESSION_CACHE_TTL_SECONDS = float(os.getenv("COMPRESSION_CACHE_TTL_SECONDS", "300"))
+COMPRESSION_CACHE_MAX_BODY = int(os.getenv("COMPRESSION_CACHE_MAX_BODY", str(1024 * 1024)))
+
+COMPRESSIBLE_TYPES = ("application/json", "application/x-ndjson", "text/")
+
+
+class _GzipStream:
+    def __init__(self, level: int):
+        self._compressor = zlib.compressobj(level, zlib.DEFLATED, 31)
+
+    def compress(self, data: bytes) -> bytes:
+        return self._compressor.compress(data)
+
+    def finish(self) -> bytes:
+        return self._compressor.flush()
+
+
+class _BrotliStream:
+    def __init__(self, level: int):
+        self._compressor = brotli.Compressor(quality=min(level, 11))
+
+    def compress(self, data: bytes) -> bytes:
+        return self._compressor.process(data)
+
+    def finish(self) -> bytes:
+        return self._compressor.finish()
+
+
+class _ZstdStream:
+    def __init__(self, level: int):
+        self._compressor = zstandard.ZstdCompressor(level=level).compressobj()
+
+    def compress(self, data: bytes) -> bytes:
+        return self._compressor.compress(data)
+
+    def finish(self) -> bytes:
+        return self._compressor.flush()
+
+
+def available_encodings() -> Dict[str, Callable[[int], object]]:
+    """Supported content codings in server preference order"""
+    encodings = {}
+    if brotli is not None:
+        encodings["br"] = _BrotliStream
+    if zstandard is not None:
+        encodings["zstd"] = _ZstdStream
+    encodings["gzip"] = _GzipStream
+    return encodings
+
+
+def negotiate_encoding(accept_encoding: str, encodings: Dict[str, Callable]) -> Optional[str]:
+    """Pick the preferred encoding the client accepts, honouring ``q=0``"""
+    accepted = {}
+    for item in accept_encoding.split(","):
+        name, _, params = item.strip().partition(";")
+        quality = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                quality = float(params[2:])
+            except ValueError:
+                quality = 0.0
+        accepted[name.strip().lower()] = quality
+
+    best, best_quality = None, 0.0
+    for name in encodings:
+        quality = accepted.get(name, accepted.get("*", 0.0))
+        if quality > best_quality:
+            best, best_quality = name, quality
+    return best
+
+
+class CompressionMiddleware:
+    """Negotiated gzip/brotli/zstd response compression.
+
+    Bodies below ``minimum_size`` are sent as is. Streaming responses such
+    as the NDJSON export are compressed chunk by chunk. Compressed bodies of
+    responses carrying an ETag are cached, so hot unchanged listings are only
+    compressed once.
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        minimum_size: int = COMPRESSION_MIN_SIZE,
+        level: int = COMPRESSION_LEVEL,
+        cache: Optional[TTLCache] = None
+    ) -> None:
+        self.app = app
+        self.minimum_size = minimum_size
+        self.level = level
+        self.encodings = available_encodings()
+        self.cache = cache if cache is not None else TTLCache(
+            maxsize=COMPRESSION_CACHE_SIZE, ttl=COMPRESSION_CACHE_TTL_SECONDS
+        )
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] == "http":
+            headers = Headers(scope=scope)
+            encoding = negotiate_encoding(headers.get("Accept-Encoding", ""), self.encodings)
+            if encoding:
+                responder = _CompressionResponder(self, scope, encoding)
+                await responder(receive, send)
+                return
+        await self.app(scope, receive, send)
+
+
+class _CompressionResponder:
+    def __init__(self, middleware: CompressionMiddleware, scope: Scope, encoding: str) -> None:
+        self.middleware = middleware
+        self.scope = scope
+        self.encoding = encoding
+        self.send: Send = None
+        self.initial_message: Message = {}
+        self.started = False
+        self.passthrough = False
+        self.stream = None
+
+    async def __call__(self, receive: Receive, send: Send) -> None:
+        self.send = send
+        await self.middleware.app(self.scope, receive, self.send_compressed)
+
+    def _cache_key(self, headers: Headers) -> Optional[Tuple[str, str, str, str]]:
+        # Only safe reads are cacheable; write responses share paths and ETags
+        etag = headers.get("etag")
+        if not etag or self.scope["method"] != "GET":
+            return None
+        query = self.scope.get("query_string", b"").decode("latin-1")
+        return (self.scope["path"], query, etag, self.encoding)
+
+    def _compress(self, body: bytes) -> bytes:
+        stream = self.middleware.encodings[self.encoding](self.middleware.level)
+        return stream.compress(body) + stream.finish()
+
+    def _set_encoding_headers(self, headers: MutableHeaders) -> None:
+        headers["Content-Encoding"] = self.encoding
+        headers.add_vary_header("Accept-Encoding")
+
+    async def send_compressed(self, message: Message) -> None:
+        message_type = message["type"]
+        if message_type == "http.response.start":
+            # Hold the headers back until the first body chunk tells us what to do
+            self.initial_message = message
+            headers = Headers(raw=message["headers"])
+            content_type = headers.get("content-type", "")
+            self.passthrough = (
+                "content-encoding" in headers
+                or message["status"] < 200
+                or message["status"] in (204, 304)
+                or not content_type.startswith(COMPRESSIBLE_TYPES)
+            )
+            return
+
+        if message_type != "http.response.body":
+            await self.send(message)
+            return
+
+        if self.passthrough:
+            if not self.started:
+                self.started = True
+                await self.send(self.initial_message)
+            await self.send(message)
+            return
+
+        body = message.get("body", b"")
+        more_body = message.get("more_body", False)
+
+        if not self.started:
+            self.started = True
+            headers = MutableHeaders(raw=self.initial_message["headers"])
+
+            if not more_body:
+                if len(body) < self.middleware.minimum_size:
+                    await self.send(self.initial_message)
+                    await self.send(message)
+                    return
+
+                cache_key = self._cache_key(headers)
+                compressed = self.middleware.cache.get(cache_key) if cache_key else None
+                if compressed is None:
+                    compressed = self._compress(body)
+                    if cache_key and len(body) <= COMPRESSION_CACHE_MAX_BODY:
+                        self.middleware.cache.set(cache_key, compressed)
+
+                self._set_encoding_headers(headers)
+                headers["Content-Length"] = str(len(compressed))
+                await self.send(self.initial_message)
+                await self.send({"type": "http.response.body", "body": compressed})
+                return
+
+            # Streaming response: the total size is unknown, compress as it flows
+            self.stream = self.middleware.encodings[self.encoding](self.middleware.level)
+            self._set_encoding_headers(headers)
+            del headers["Content-Length"]
+            await self.send(self.initial_message)
+
+        chunk = self.stream.compress(body)
+        if not more_body:
+            chunk += self.stream.finish()
+        if chunk or not more_body:
+            await self.send({"type": "http.response.body", "body": chunk, "more_body": more_body})
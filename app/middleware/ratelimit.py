@@ -0,0 +1,65 @@
+from typing import Optional, Tuple
+
+from jose import JWTError
+from starlette.datastructures import Headers
+from starlette.responses import JSONResponse
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+from app.services.auth import decode_access_token
+from app.services.ratelimit import (
+    RATE_LIMIT_ENABLED, RateLimiter, classify_route, rate_limiter, retry_after_header
+)
+
+
+class RateLimitMiddleware:
+    """Token-bucket rate limiting per user and per organization.
+
+    Authenticated requests are charged against the caller's bucket and
+    their tenant's bucket for the route class; anonymous requests are
+    keyed by client address. Verified claims are left on the request
+    state so ``get_current_user`` does not decode the token twice.
+    """
+
+    def __init__(self, app: ASGIApp, limiter: Optional[RateLimiter] = None,
+                 enabled: bool = RATE_LIMIT_ENABLED) -> None:
+        self.app = app
+        self.limiter = limiter if limiter is not None else rate_limiter
+        self.enabled = enabled
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if not self.enabled or scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        route_class = classify_route(scope["method"], scope["path"])
+        if route_class is None:
+            await self.app(scope, receive, send)
+            return
+
+        principal, org_id = self._identify(scope)
+        retry_after = await self.limiter.check(route_class, principal, org_id)
+        if retry_after > 0:
+            response = JSONResponse(
+                {"detail": "Rate limit exceeded"},
+                status_code=429,
+                headers={"Retry-After": retry_after_header(retry_after)},
+            )
+            await response(scope, receive, send)
+            return
+
+        await self.app(scope, receive, send)
+
+    def _identify(self, scope: Scope) -> Tuple[str, Optional[str]]:
+        authorization = Headers(scope=scope).get("Authorization", "")
+        scheme, _, token = authorization.partition(" ")
+        if scheme.lower() == "bearer" and token:
+            try:
+                claims = decode_access_token(token)
+            except JWTError:
+                claims = None
+            if claims and claims.get("sub") and claims.get("org_id"):
+                scope.setdefault("state", {})["token_claims"] = (token, claims)
+                return f"user:{claims['sub']}", claims["org_id"]
+
+        client = scope.get("client")
+        return f"ip:{client[0] if client else 'unknown'}", None
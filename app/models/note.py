@@ -1,8 +1,13 @@
+import os
 from typing import Optional
-from beanie import Document
-from pydantic import Field
+import pymongo
+from beanie import Document, PydanticObjectId
+from pydantic import BaseModel, Field
 from datetime import datetime
 
+NOTE_EXCERPT_LENGTH = 200
+NOTE_TOMBSTONE_TTL_DAYS = int(os.getenv("NOTE_TOMBSTONE_TTL_DAYS", "30"))
+
 class Note(Document):
     title: str
     content: str
@@ -10,11 +15,16 @@ class Note(Document):
     created_by: str
     created_at: datetime = Field(default_factory=datetime.utcnow)
     updated_at: datetime = Field(default_factory=datetime.utcnow)
+    version: int = Field(default=1, description="Incremented on every update")
 
     class Settings:
         name = "notes"
         indexes = [
-            [("organization_id", 1)],  # This is For tenant isolation
+            [("organization_id", 1), ("_id", 1)],  # Tenant isolation + keyset pagination
+            # Per-tenant full-text search; the equality prefix keeps each query inside one tenant
+            [("organization_id", 1), ("title", pymongo.TEXT), ("content", pymongo.TEXT)],
+            # Recently updated listings and incremental sync (read in reverse)
+            [("organization_id", 1), ("updated_at", -1), ("_id", -1)],
         ]
         
     class Config:
@@ -25,4 +35,67 @@ class Note(Document):
                 "organization_id": "org_123",
                 "created_by": "user_123"
             }
-        }
\ No newline at end of file
+        }
+
+class NoteTombstone(Document):
+    """Record of a deleted note, kept so sync clients can learn about deletions"""
+    note_id: str
+    organization_id: str
+    deleted_at: datetime = Field(default_factory=datetime.utcnow)
+
+    class Settings:
+        name = "note_tombstones"
+        indexes = [
+            [("organization_id", 1), ("deleted_at", 1), ("note_id", 1)],
+            pymongo.IndexModel(
+                [("deleted_at", 1)],
+                expireAfterSeconds=NOTE_TOMBSTONE_TTL_DAYS * 24 * 60 * 60
+            ),
+        ]
+
+class NoteSummaryView(BaseModel):
+    """Projection of a note for list views, leaving out the content"""
+    id: PydanticObjectId = Field(alias="_id")
+    title: str
+    organization_id: str
+    created_by: str
+    created_at: datetime
+    updated_at: datetime
+    excerpt: Optional[str] = None
+
+    class Settings:
+        projection = {
+            "_id": 1,
+            "title": 1,
+            "organization_id": 1,
+            "created_by": 1,
+            "created_at": 1,
+            "updated_at": 1,
+        }
+
+class NoteExcerptView(NoteSummaryView):
+    """Summary projection with an excerpt of the content cut server-side"""
+
+    class Settings:
+        projection = {
+            **NoteSummaryView.Settings.projection,
+            "excerpt": {"$substrCP": ["$content", 0, NOTE_EXCERPT_LENGTH]},
+        }
+
+
+class NoteSearchView(BaseModel):
+    """Search hit with its text relevance score"""
+    id: PydanticObjectId = Field(alias="_id")
+    title: str
+    content: str
+    created_by: str
+    created_at: datetime
+    updated_at: datetime
+    score: float
+
+
+class NoteVersionView(BaseModel):
+    """Just enough of a note to compute its ETag and check ownership"""
+    id: PydanticObjectId = Field(alias="_id")
+    created_by: str
+    version: int = 1
@@ -1,11 +1,20 @@
 from typing import Optional
 from beanie import Document
-from pydantic import Field
+from pydantic import BaseModel, Field
 from datetime import datetime
 
+class AdminSummary(BaseModel):
+    """Denormalized copy of an organization's admin, kept up to date on role changes"""
+    id: str
+    email: str
+    name: str
+    role: str = "admin"
+
 class Organization(Document):
     name: str = Field(..., description="Organization name")
     description: Optional[str] = Field(None, description="Organization description")
+    notes_version: int = Field(default=0, description="Bumped on every note write, used for listing ETags")
+    admin_user: Optional[AdminSummary] = None
     created_at: datetime = Field(default_factory=datetime.utcnow)
     updated_at: datetime = Field(default_factory=datetime.utcnow)
 
@@ -0,0 +1,20 @@
+import pymongo
+from beanie import Document
+from pydantic import Field
+from datetime import datetime
+
+class RevokedToken(Document):
+    """Access token revoked before its expiry, identified by its ``jti``"""
+    jti: str
+    user_id: str
+    revoked_at: datetime = Field(default_factory=datetime.utcnow)
+    # Once the token itself has expired the entry is no longer needed
+    expires_at: datetime
+
+    class Settings:
+        name = "revoked_tokens"
+        indexes = [
+            pymongo.IndexModel([("jti", 1)], unique=True),
+            [("revoked_at", 1)],  # Incremental filter refresh
+            pymongo.IndexModel([("expires_at", 1)], expireAfterSeconds=0),
+        ]
@@ -0,0 +1,25 @@
+import os
+from typing import Optional
+import pymongo
+from beanie import Document
+from pydantic import Field
+from datetime import datetime
+
+REFRESH_TOKEN_EXPIRE_DAYS = int(os.getenv("REFRESH_TOKEN_EXPIRE_DAYS", "30"))
+
+class Session(Document):
+    """Server-side login session backing a rotating refresh token"""
+    user_id: str
+    organization_id: str
+    token_hash: str
+    previous_token_hash: Optional[str] = None
+    created_at: datetime = Field(default_factory=datetime.utcnow)
+    last_used_at: datetime = Field(default_factory=datetime.utcnow)
+    expires_at: datetime
+
+    class Settings:
+        name = "sessions"
+        indexes = [
+            [("user_id", 1)],  # Revoking every session of a user
+            pymongo.IndexModel([("expires_at", 1)], expireAfterSeconds=0),
+        ]
@@ -1,6 +1,7 @@
 from typing import Optional
+import pymongo
 from beanie import Document
-from pydantic import Field, EmailStr
+from pydantic import BaseModel, Field, EmailStr
 from datetime import datetime
 
 class User(Document):
@@ -12,11 +13,14 @@ class User(Document):
     is_active: bool = Field(default=True)
     created_at: datetime = Field(default_factory=datetime.utcnow)
     updated_at: datetime = Field(default_factory=datetime.utcnow)
+    token_version: int = Field(default=0, description="Bumped when role or status changes")
 
     class Settings:
         name = "users"
         indexes = [
-            [("organization_id", 1), ("email", 1)], 
+            # Emails are unique per organization; duplicates are rejected by the index
+            pymongo.IndexModel([("organization_id", 1), ("email", 1)], unique=True),
+            [("organization_id", 1), ("role", 1)],  # Finding an org's admins
         ]
         
     class Config:
@@ -27,4 +31,9 @@ class User(Document):
                 "role": "writer",
                 "organization_id": "org_123"
             }
-        }
\ No newline at end of file
+        }
+
+class UserTokenVersionView(BaseModel):
+    """Just the fields stateless tokens are checked against"""
+    token_version: int = 0
+    is_active: bool = True
@@ -0,0 +1,71 @@
+import os
+
+from app.repositories.base import DuplicateError, NoteWrite, StorageBackend
+
+# Storage backend: "mongo" or "sqlite"
+STORAGE_BACKEND = os.getenv("STORAGE_BACKEND", "mongo")
+
+
+def build_backend(name: str = STORAGE_BACKEND) -> StorageBackend:
+    if name == "mongo":
+        from app.repositories.mongo import MongoBackend
+        return MongoBackend()
+    if name == "sqlite":
+        from app.repositories.sqlite import SQLiteBackend
+        check_mongo_only_settings(name)
+        return SQLiteBackend()
+    raise ValueError(f"Unknown storage backend: {name!r}")
+
+
+def check_mongo_only_settings(name: str):
+    """Refuse settings that talk to MongoDB directly when it is not the store.
+
+    They would otherwise fail on every request instead of at startup.
+    """
+    from app.database.settings import SECONDARY_READS
+    from app.services.ratelimit import RATE_LIMIT_BACKEND
+
+    if SECONDARY_READS:
+        raise ValueError(f"SECONDARY_READS needs STORAGE_BACKEND=mongo, not {name!r}")
+    if RATE_LIMIT_BACKEND == "mongo":
+        raise ValueError(f"RATE_LIMIT_BACKEND=mongo needs STORAGE_BACKEND=mongo, not {name!r}")
+
+
+class Storage:
+    """Repositories of the configured backend.
+
+    Services hold on to the module-level ``storage`` and reach repositories
+    through it, so swapping ``backend`` switches every service at once.
+    """
+
+    def __init__(self, backend: StorageBackend):
+        self.backend = backend
+
+    @property
+    def notes(self):
+        return self.backend.notes
+
+    @property
+    def users(self):
+        return self.backend.users
+
+    @property
+    def organizations(self):
+        return self.backend.organizations
+
+    @property
+    def sessions(self):
+        return self.backend.sessions
+
+    @property
+    def revoked_tokens(self):
+        return self.backend.revoked_tokens
+
+    async def connect(self):
+        await self.backend.connect()
+
+    async def close(self):
+        await self.backend.close()
+
+
+storage = Storage(build_backend())
@@ -0,0 +1,242 @@
+from abc import ABC, abstractmethod
+from datetime import datetime
+from typing import AsyncIterator, Dict, List, NamedTuple, Optional, Tuple, Type
+
+from pydantic import BaseModel
+
+from app.models.note import Note, NoteTombstone, NoteSearchView
+from app.models.organization import Organization, AdminSummary
+from app.models.revoked_token import RevokedToken
+from app.models.session import Session
+from app.models.user import User, UserTokenVersionView
+
+# Notes fetched per round trip when streaming a whole organization
+EXPORT_BATCH_SIZE = 500
+
+# A ``(timestamp, note id)`` position in a note or tombstone timeline
+TimePosition = Tuple[datetime, str]
+
+
+class DuplicateError(Exception):
+    """A write collided with a unique key"""
+
+
+class NoteWrite(NamedTuple):
+    """One operation of a bulk note write"""
+    op: str  # "create", "update" or "delete"
+    note_id: str
+    fields: Optional[dict] = None  # Note fields to create with or set
+    owner_id: Optional[str] = None  # Only touch the note if it was created by this user
+
+
+class NoteRepository(ABC):
+    """Storage of notes, their tombstones and per-tenant listing versions.
+
+    ``session`` is a MongoDB client session for causally consistent reads;
+    backends without replicas ignore it.
+    """
+
+    @abstractmethod
+    async def create(self, fields: dict, session=None) -> Note:
+        """Insert a note built from ``fields`` and return it"""
+
+    @abstractmethod
+    async def get(
+        self, note_id: str, organization_id: str,
+        projection: Optional[Type[BaseModel]] = None, session=None
+    ):
+        """Note of an organization, or only the ``projection`` fields; None if missing"""
+
+    @abstractmethod
+    async def owners(self, note_ids: List[str], organization_id: str, session=None) -> Dict[str, str]:
+        """Creator of each of ``note_ids`` that exists in the organization"""
+
+    @abstractmethod
+    async def list_page(
+        self,
+        organization_id: str,
+        limit: int,
+        after=None,
+        sort: str = "id",
+        projection: Optional[Type[BaseModel]] = None,
+        session=None
+    ) -> list:
+        """Up to ``limit`` notes past ``after``.
+
+        With ``sort="id"`` notes come in ascending id order and ``after`` is
+        a note id; with ``sort="updated_at"`` they come newest first and
+        ``after`` is a ``(updated_at, note id)`` position.
+        """
+
+    @abstractmethod
+    async def search(
+        self, organization_id: str, text: str, offset: int, limit: int, session=None
+    ) -> List[NoteSearchView]:
+        """Full-text matches for ``text``, best first"""
+
+    @abstractmethod
+    async def changed_since(
+        self, organization_id: str, since: Optional[TimePosition], limit: int
+    ) -> List[Note]:
+        """Notes updated after ``since`` in ``(updated_at, id)`` order"""
+
+    @abstractmethod
+    async def deleted_since(
+        self, organization_id: str, since: Optional[TimePosition], limit: int
+    ) -> List[NoteTombstone]:
+        """Tombstones recorded after ``since`` in ``(deleted_at, note_id)`` order"""
+
+    @abstractmethod
+    def stream(self, organization_id: str, after: Optional[str] = None) -> AsyncIterator[Note]:
+        """Every note of an organization in id order; raises ValueError for a bad ``after``"""
+
+    @abstractmethod
+    async def update(
+        self,
+        note_id: str,
+        organization_id: str,
+        fields: dict,
+        owner_id: Optional[str] = None,
+        expected_versions: Optional[List[int]] = None,
+        session=None
+    ) -> Optional[Note]:
+        """Set ``fields`` and bump the version of a matching note, returning it.
+
+        With no ``fields`` the matching note is returned unchanged.
+        """
+
+    @abstractmethod
+    async def delete(
+        self,
+        note_id: str,
+        organization_id: str,
+        owner_id: Optional[str] = None,
+        expected_versions: Optional[List[int]] = None,
+        session=None
+    ) -> bool:
+        """Delete a matching note; False if none matched"""
+
+    @abstractmethod
+    async def bulk_write(
+        self, writes: List[NoteWrite], organization_id: str, session=None
+    ) -> Dict[int, Tuple[int, str]]:
+        """Apply ``writes`` unordered; failures as ``{position: (status, detail)}``.
+
+        An update or delete whose filter matched nothing fails with 404 when
+        the note is gone and 409 when it is now owned by someone else.
+        """
+
+    @abstractmethod
+    async def add_tombstones(self, note_ids: List[str], organization_id: str, session=None):
+        """Record deletions for sync clients"""
+
+    @abstractmethod
+    async def get_listing_version(self, organization_id: str, session=None) -> int:
+        """Current note listing version of an organization, read like listing pages"""
+
+    @abstractmethod
+    async def bump_listing_version(self, organization_id: str, session=None):
+        """Advance the listing version after a note write"""
+
+
+class UserRepository(ABC):
+    @abstractmethod
+    async def create(self, fields: dict) -> User:
+        """Insert a user; raises DuplicateError if the email is taken in the organization"""
+
+    @abstractmethod
+    async def get(self, user_id: str, organization_id: Optional[str] = None) -> Optional[User]:
+        """User by id, optionally only within one organization"""
+
+    @abstractmethod
+    async def find_by_email(self, email: str, organization_id: str) -> Optional[User]:
+        pass
+
+    @abstractmethod
+    async def list_for_organization(self, organization_id: str) -> List[User]:
+        pass
+
+    @abstractmethod
+    async def find_admin(self, organization_id: str, exclude_id: Optional[str] = None) -> Optional[User]:
+        """Any admin of an organization other than ``exclude_id``"""
+
+    @abstractmethod
+    async def update(self, user_id: str, fields: dict, bump_token_version: bool = False):
+        """Set ``fields`` on a user, also advancing ``token_version`` in the same write if asked"""
+
+    @abstractmethod
+    async def delete(self, user_id: str):
+        pass
+
+    @abstractmethod
+    async def get_token_version(self, user_id: str) -> Optional[UserTokenVersionView]:
+        pass
+
+
+class OrganizationRepository(ABC):
+    @abstractmethod
+    async def create_with_admin(self, organization: dict, admin: dict) -> Tuple[Organization, User]:
+        """Insert an organization and its first admin, both or neither"""
+
+    @abstractmethod
+    async def get(self, org_id: str) -> Optional[Organization]:
+        pass
+
+    @abstractmethod
+    async def set_admin_summary(self, org_id: str, summary: Optional[AdminSummary]):
+        pass
+
+
+class SessionRepository(ABC):
+    @abstractmethod
+    async def create(self, fields: dict) -> Session:
+        pass
+
+    @abstractmethod
+    async def rotate(
+        self, session_id: str, token_hash: str, new_token_hash: str,
+        now: datetime, expires_at: datetime
+    ) -> Optional[Session]:
+        """Swap the token hash of an unexpired session holding ``token_hash``"""
+
+    @abstractmethod
+    async def delete_rotated(self, session_id: str, previous_token_hash: str):
+        """Delete a session whose previous token is being reused"""
+
+    @abstractmethod
+    async def delete(self, session_id: str, token_hash: str) -> bool:
+        pass
+
+    @abstractmethod
+    async def delete_for_user(self, user_id: str):
+        pass
+
+
+class RevokedTokenRepository(ABC):
+    @abstractmethod
+    def revoked_since(self, since: Optional[datetime]) -> AsyncIterator[RevokedToken]:
+        """Revocations recorded at or after ``since``, oldest first"""
+
+    @abstractmethod
+    async def exists(self, jti: str) -> bool:
+        pass
+
+    @abstractmethod
+    async def add(self, jti: str, user_id: str, expires_at: datetime):
+        """Record a revocation; recording the same token twice is a no-op"""
+
+
+class StorageBackend(ABC):
+    notes: NoteRepository
+    users: UserRepository
+    organizations: OrganizationRepository
+    sessions: SessionRepository
+    revoked_tokens: RevokedTokenRepository
+
+    @abstractmethod
+    async def connect(self):
+        pass
+
+    @abstractmethod
+    async def close(self):
+        pass
@@ -0,0 +1,413 @@
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple, Type
+
+from beanie import BulkWriter, PydanticObjectId
+from beanie.odm.queries.update import UpdateResponse
+from beanie.odm.utils.projection import get_projection
+from bson import ObjectId
+from pydantic import BaseModel
+from pymongo import ASCENDING, DESCENDING
+from pymongo.errors import BulkWriteError, DuplicateKeyError
+
+from app.database.mongodb import (
+    connect_to_mongo, close_mongo_connection, read_collection, run_in_transaction
+)
+from app.models.note import Note, NoteTombstone, NoteSearchView, NoteSummaryView
+from app.models.organization import Organization, AdminSummary
+from app.models.revoked_token import RevokedToken
+from app.models.session import Session
+from app.models.user import User, UserTokenVersionView
+from app.repositories.base import (
+    EXPORT_BATCH_SIZE, DuplicateError, NoteWrite, NoteRepository, UserRepository,
+    OrganizationRepository, SessionRepository, RevokedTokenRepository, StorageBackend
+)
+
+
+def object_id(value) -> Optional[ObjectId]:
+    try:
+        return ObjectId(value)
+    except Exception:
+        return None
+
+
+def version_filter(versions: List[int]) -> dict:
+    """Query clause matching notes at one of ``versions``"""
+    clause = {"version": {"$in": versions}}
+    if 1 in versions:
+        # Notes written before versioning have no field and count as version 1
+        return {"$or": [clause, {"version": {"$exists": False}}]}
+    return clause
+
+
+def note_filter(
+    obj_id: ObjectId,
+    organization_id: str,
+    owner_id: Optional[str] = None,
+    expected_versions: Optional[List[int]] = None
+) -> dict:
+    filters = {"_id": obj_id, "organization_id": organization_id}
+    if owner_id is not None:
+        filters["created_by"] = owner_id
+    if expected_versions is not None:
+        filters.update(version_filter(expected_versions))
+    return filters
+
+
+class MongoNoteRepository(NoteRepository):
+    async def create(self, fields: dict, session=None) -> Note:
+        return await Note(**fields).insert(session=session)
+
+    async def get(self, note_id, organization_id, projection=None, session=None):
+        obj_id = object_id(note_id)
+        if obj_id is None:
+            return None
+        # Read through Motor so the read preference for gets applies
+        document = await read_collection(Note, "get").find_one(
+            {"_id": obj_id, "organization_id": organization_id},
+            projection=get_projection(projection) if projection is not None else None,
+            session=session
+        )
+        return (projection or Note).model_validate(document) if document else None
+
+    async def owners(self, note_ids, organization_id, session=None) -> Dict[str, str]:
+        found = await Note.find({
+            "_id": {"$in": [ObjectId(note_id) for note_id in note_ids]},
+            "organization_id": organization_id
+        }, session=session).project(NoteSummaryView).to_list()
+        return {str(note.id): note.created_by for note in found}
+
+    async def list_page(
+        self,
+        organization_id: str,
+        limit: int,
+        after=None,
+        sort: str = "id",
+        projection: Optional[Type[BaseModel]] = None,
+        session=None
+    ) -> list:
+        query = {"organization_id": organization_id}
+        if sort == "updated_at":
+            if after:
+                updated_at, note_id = after
+                query["$or"] = [
+                    {"updated_at": {"$lt": updated_at}},
+                    {"updated_at": updated_at, "_id": {"$lt": ObjectId(note_id)}},
+                ]
+            sort_order = [("updated_at", DESCENDING), ("_id", DESCENDING)]
+        else:
+            if after:
+                query["_id"] = {"$gt": ObjectId(after)}
+            sort_order = [("_id", ASCENDING)]
+
+        # Read through Motor so the listing read preference applies
+        documents = await read_collection(Note, "listing").find(
+            query,
+            projection=get_projection(projection) if projection is not None else None,
+            session=session
+        ).sort(sort_order).limit(limit).to_list(length=None)
+        return [(projection or Note).model_validate(document) for document in documents]
+
+    async def search(self, organization_id, text, offset, limit, session=None) -> List[NoteSearchView]:
+        # The (organization_id, title, content) text index applies the tenant
+        # filter inside the index
+        pipeline = [
+            {"$match": {"organization_id": organization_id, "$text": {"$search": text}}},
+            {"$addFields": {"score": {"$meta": "textScore"}}},
+            {"$sort": {"score": -1, "_id": 1}},
+            {"$skip": offset},
+            {"$limit": limit},
+            {"$project": get_projection(NoteSearchView)},
+        ]
+        hits = await read_collection(Note, "search").aggregate(
+            pipeline, session=session
+        ).to_list(length=None)
+        return [NoteSearchView.model_validate(hit) for hit in hits]
+
+    async def changed_since(self, organization_id, since, limit) -> List[Note]:
+        query = {"organization_id": organization_id}
+        if since:
+            since_at, since_id = since
+            query["$or"] = [
+                {"updated_at": {"$gt": since_at}},
+                {"updated_at": since_at, "_id": {"$gt": ObjectId(since_id)}},
+            ]
+        return await Note.find(query).sort(
+            [("updated_at", ASCENDING), ("_id", ASCENDING)]
+        ).limit(limit).to_list()
+
+    async def deleted_since(self, organization_id, since, limit) -> List[NoteTombstone]:
+        query = {"organization_id": organization_id}
+        if since:
+            since_at, since_id = since
+            query["$or"] = [
+                {"deleted_at": {"$gt": since_at}},
+                {"deleted_at": since_at, "note_id": {"$gt": since_id}},
+            ]
+        return await NoteTombstone.find(query).sort(
+            [("deleted_at", ASCENDING), ("note_id", ASCENDING)]
+        ).limit(limit).to_list()
+
+    def stream(self, organization_id, after=None):
+        # Documents are pulled from the server EXPORT_BATCH_SIZE at a time
+        query = {"organization_id": organization_id}
+        if after:
+            try:
+                query["_id"] = {"$gt": ObjectId(after)}
+            except Exception:
+                raise ValueError("Invalid note id to resume after")
+        return Note.find(query, batch_size=EXPORT_BATCH_SIZE).sort([("_id", ASCENDING)])
+
+    async def update(
+        self, note_id, organization_id, fields, owner_id=None, expected_versions=None, session=None
+    ) -> Optional[Note]:
+        obj_id = object_id(note_id)
+        if obj_id is None:
+            return None
+        filters = note_filter(obj_id, organization_id, owner_id, expected_versions)
+        if not fields:
+            return await Note.find_one(filters, session=session)
+        # One atomic round trip: match, update and return the new document
+        return await Note.find_one(filters, session=session).update(
+            {"$set": {**fields, "updated_at": datetime.utcnow()}, "$inc": {"version": 1}},
+            response_type=UpdateResponse.NEW_DOCUMENT
+        )
+
+    async def delete(
+        self, note_id, organization_id, owner_id=None, expected_versions=None, session=None
+    ) -> bool:
+        obj_id = object_id(note_id)
+        if obj_id is None:
+            return False
+        filters = note_filter(obj_id, organization_id, owner_id, expected_versions)
+        result = await Note.find_one(filters, session=session).delete()
+        return result is not None and result.deleted_count == 1
+
+    async def bulk_write(
+        self, writes: List[NoteWrite], organization_id, session=None
+    ) -> Dict[int, Tuple[int, str]]:
+        # A single unordered bulk write for the whole batch
+        writer = BulkWriter(session=session, ordered=False, object_class=Note)
+        for write in writes:
+            if write.op == "create":
+                note = Note(id=PydanticObjectId(write.note_id), organization_id=organization_id, **write.fields)
+                await Note.insert_one(note, bulk_writer=writer)
+                continue
+            filters = note_filter(ObjectId(write.note_id), organization_id, write.owner_id)
+            if write.op == "update":
+                await Note.find_one(filters).update(
+                    {"$set": {**write.fields, "updated_at": datetime.utcnow()}, "$inc": {"version": 1}},
+                    bulk_writer=writer
+                )
+            else:
+                await Note.find_one(filters).delete(bulk_writer=writer)
+
+        failures = {}
+        try:
+            result = await writer.commit()
+            matched, removed = result.matched_count, result.deleted_count
+        except BulkWriteError as e:
+            for error in e.details.get("writeErrors", []):
+                status = 409 if error.get("code") == 11000 else 500
+                failures[error["index"]] = (status, error.get("errmsg"))
+            matched, removed = e.details.get("nMatched", 0), e.details.get("nRemoved", 0)
+
+        updates = [p for p, write in enumerate(writes) if write.op == "update" and p not in failures]
+        deletes = [p for p, write in enumerate(writes) if write.op == "delete" and p not in failures]
+        if matched < len(updates) or removed < len(deletes):
+            # Bulk results only carry totals; find the writes that missed
+            failures.update(await self._unmatched(writes, updates + deletes, organization_id, session))
+        return failures
+
+    async def _unmatched(self, writes, positions, organization_id, session=None) -> Dict[int, Tuple[int, str]]:
+        """Failures among update and delete ``positions`` whose filter matched nothing"""
+        note_ids = list({writes[position].note_id for position in positions})
+        owners = await self.owners(note_ids, organization_id, session=session)
+        # A note that is gone but already tombstoned was deleted by another request
+        tombstoned = {
+            tombstone.note_id for tombstone in await NoteTombstone.find({
+                "organization_id": organization_id, "note_id": {"$in": note_ids}
+            }, session=session).to_list()
+        }
+
+        failures = {}
+        for position in positions:
+            write = writes[position]
+            owner = owners.get(write.note_id)
+            if owner is None:
+                if write.op == "update" or write.note_id in tombstoned:
+                    failures[position] = (404, "Note not found")
+            elif write.op == "delete" or (write.owner_id is not None and owner != write.owner_id):
+                failures[position] = (409, "Note changed owner")
+        return failures
+
+    async def add_tombstones(self, note_ids, organization_id, session=None):
+        tombstones = [
+            NoteTombstone(note_id=note_id, organization_id=organization_id) for note_id in note_ids
+        ]
+        if tombstones:
+            await NoteTombstone.insert_many(tombstones, session=session)
+
+    async def get_listing_version(self, organization_id, session=None) -> int:
+        obj_id = object_id(organization_id)
+        if obj_id is None:
+            return 0
+        # Same read preference as the page, so a lagging secondary cannot
+        # serve an old page under a newer version
+        organization = await read_collection(Organization, "listing").find_one(
+            {"_id": obj_id}, {"notes_version": 1}, session=session
+        )
+        return (organization or {}).get("notes_version", 0)
+
+    async def bump_listing_version(self, organization_id, session=None):
+        obj_id = object_id(organization_id)
+        if obj_id is None:
+            return
+        await Organization.get_motor_collection().update_one(
+            {"_id": obj_id}, {"$inc": {"notes_version": 1}}, session=session
+        )
+
+
+class MongoUserRepository(UserRepository):
+    async def create(self, fields: dict) -> User:
+        try:
+            return await User(**fields).insert()
+        except DuplicateKeyError:
+            raise DuplicateError()
+
+    async def get(self, user_id, organization_id=None) -> Optional[User]:
+        obj_id = object_id(user_id)
+        if obj_id is None:
+            return None
+        if organization_id is None:
+            return await User.get(obj_id)
+        return await User.find_one({"_id": obj_id, "organization_id": organization_id})
+
+    async def find_by_email(self, email, organization_id) -> Optional[User]:
+        return await User.find_one({"email": email, "organization_id": organization_id})
+
+    async def list_for_organization(self, organization_id) -> List[User]:
+        return await User.find({"organization_id": organization_id}).to_list()
+
+    async def find_admin(self, organization_id, exclude_id=None) -> Optional[User]:
+        query = {"organization_id": organization_id, "role": "admin"}
+        if exclude_id is not None:
+            query["_id"] = {"$ne": ObjectId(exclude_id)}
+        return await User.find_one(query)
+
+    async def update(self, user_id, fields: dict, bump_token_version: bool = False):
+        update = {"$set": {**fields, "updated_at": datetime.utcnow()}}
+        if bump_token_version:
+            update["$inc"] = {"token_version": 1}
+        await User.find_one({"_id": ObjectId(user_id)}).update(update)
+
+    async def delete(self, user_id):
+        await User.find_one({"_id": ObjectId(user_id)}).delete()
+
+    async def get_token_version(self, user_id) -> Optional[UserTokenVersionView]:
+        obj_id = object_id(user_id)
+        if obj_id is None:
+            return None
+        return await User.find_one({"_id": obj_id}).project(UserTokenVersionView)
+
+
+class MongoOrganizationRepository(OrganizationRepository):
+    async def create_with_admin(self, organization: dict, admin: dict) -> Tuple[Organization, User]:
+        organization = Organization(**organization)
+        admin_user = User(**admin)
+
+        async def insert_organization_and_admin(session):
+            await organization.insert(session=session)
+            try:
+                await admin_user.insert(session=session)
+            except Exception:
+                # Without a transaction there is nothing to roll back
+                if session is None:
+                    await organization.delete()
+                raise
+
+        await run_in_transaction(insert_organization_and_admin)
+        return organization, admin_user
+
+    async def get(self, org_id) -> Optional[Organization]:
+        obj_id = object_id(org_id)
+        if obj_id is None:
+            return None
+        return await Organization.get(obj_id)
+
+    async def set_admin_summary(self, org_id, summary: Optional[AdminSummary]):
+        await Organization.find_one({"_id": ObjectId(org_id)}).update(
+            {"$set": {"admin_user": summary.model_dump() if summary else None}}
+        )
+
+
+class MongoSessionRepository(SessionRepository):
+    async def create(self, fields: dict) -> Session:
+        return await Session(**fields).insert()
+
+    async def rotate(self, session_id, token_hash, new_token_hash, now, expires_at) -> Optional[Session]:
+        obj_id = object_id(session_id)
+        if obj_id is None:
+            return None
+        # A single primary-key update; the filter rejects stale and expired tokens
+        return await Session.find_one(
+            {"_id": obj_id, "token_hash": token_hash, "expires_at": {"$gt": now}}
+        ).update(
+            {
+                "$set": {
+                    "token_hash": new_token_hash,
+                    "previous_token_hash": token_hash,
+                    "last_used_at": now,
+                    "expires_at": expires_at,
+                }
+            },
+            response_type=UpdateResponse.NEW_DOCUMENT
+        )
+
+    async def delete_rotated(self, session_id, previous_token_hash):
+        await Session.find_one(
+            {"_id": ObjectId(session_id), "previous_token_hash": previous_token_hash}
+        ).delete()
+
+    async def delete(self, session_id, token_hash) -> bool:
+        obj_id = object_id(session_id)
+        if obj_id is None:
+            return False
+        result = await Session.find_one({"_id": obj_id, "token_hash": token_hash}).delete()
+        return result is not None and result.deleted_count > 0
+
+    async def delete_for_user(self, user_id):
+        await Session.find({"user_id": str(user_id)}).delete()
+
+
+class MongoRevokedTokenRepository(RevokedTokenRepository):
+    def revoked_since(self, since):
+        query = {}
+        if since is not None:
+            query = {"revoked_at": {"$gte": since}}
+        return RevokedToken.find(query).sort("revoked_at")
+
+    async def exists(self, jti) -> bool:
+        return await RevokedToken.find_one({"jti": jti}) is not None
+
+    async def add(self, jti, user_id, expires_at):
+        try:
+            await RevokedToken(jti=jti, user_id=str(user_id), expires_at=expires_at).insert()
+        except DuplicateKeyError:
+            pass
+
+
+class MongoBackend(StorageBackend):
+    """MongoDB through Beanie and Motor"""
+
+    def __init__(self):
+        self.notes = MongoNoteRepository()
+        self.users = MongoUserRepository()
+        self.organizations = MongoOrganizationRepository()
+        self.sessions = MongoSessionRepository()
+        self.revoked_tokens = MongoRevokedTokenRepository()
+
+    async def connect(self):
+        await connect_to_mongo()
+
+    async def close(self):
+        await close_mongo_connection()
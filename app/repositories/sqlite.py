@@ -0,0 +1,797 @@
+import asyncio
+import os
+import re
+import sqlite3
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Tuple, Type
+
+from beanie import Document, PydanticObjectId
+from bson import ObjectId
+from pydantic import BaseModel
+
+from app.models.note import Note, NoteTombstone, NoteSearchView, NOTE_EXCERPT_LENGTH, NOTE_TOMBSTONE_TTL_DAYS
+from app.models.organization import Organization, AdminSummary
+from app.models.revoked_token import RevokedToken
+from app.models.session import Session
+from app.models.user import User, UserTokenVersionView
+from app.repositories.base import (
+    EXPORT_BATCH_SIZE, DuplicateError, NoteWrite, NoteRepository, UserRepository,
+    OrganizationRepository, SessionRepository, RevokedTokenRepository, StorageBackend
+)
+
+# SQLite configuration
+SQLITE_PATH = os.getenv("SQLITE_PATH", "notes.db")
+SQLITE_READ_CONNECTIONS = int(os.getenv("SQLITE_READ_CONNECTIONS", "4"))
+SQLITE_BUSY_TIMEOUT_MS = int(os.getenv("SQLITE_BUSY_TIMEOUT_MS", "5000"))
+
+EPOCH = datetime(1970, 1, 1)
+
+# Timestamps are stored as epoch milliseconds, the precision MongoDB keeps,
+# so sync and listing cursors behave the same on both backends
+DATETIME_COLUMNS = {"created_at", "updated_at", "deleted_at", "last_used_at", "expires_at", "revoked_at"}
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS organizations (
+    id TEXT PRIMARY KEY,
+    name TEXT NOT NULL,
+    description TEXT,
+    notes_version INTEGER NOT NULL DEFAULT 0,
+    admin_user TEXT,
+    created_at INTEGER NOT NULL,
+    updated_at INTEGER NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS users (
+    id TEXT PRIMARY KEY,
+    organization_id TEXT NOT NULL,
+    email TEXT NOT NULL,
+    password TEXT NOT NULL,
+    name TEXT NOT NULL,
+    role TEXT NOT NULL,
+    is_active INTEGER NOT NULL DEFAULT 1,
+    token_version INTEGER NOT NULL DEFAULT 0,
+    created_at INTEGER NOT NULL,
+    updated_at INTEGER NOT NULL,
+    UNIQUE (organization_id, email)
+);
+CREATE INDEX IF NOT EXISTS users_organization_role ON users (organization_id, role);
+
+-- The integer key gives the full-text index a stable rowid to point at
+CREATE TABLE IF NOT EXISTS notes (
+    seq INTEGER PRIMARY KEY,
+    id TEXT NOT NULL UNIQUE,
+    organization_id TEXT NOT NULL,
+    title TEXT NOT NULL,
+    content TEXT NOT NULL,
+    created_by TEXT NOT NULL,
+    created_at INTEGER NOT NULL,
+    updated_at INTEGER NOT NULL,
+    version INTEGER NOT NULL DEFAULT 1
+);
+CREATE INDEX IF NOT EXISTS notes_organization_id ON notes (organization_id, id);
+CREATE INDEX IF NOT EXISTS notes_organization_updated ON notes (organization_id, updated_at, id);
+
+-- The organization id is indexed as a token so searches stay inside one tenant
+CREATE VIRTUAL TABLE IF NOT EXISTS notes_fts USING fts5(
+    organization_id, title, content,
+    content='notes', content_rowid='seq', tokenize='porter unicode61'
+);
+CREATE TRIGGER IF NOT EXISTS notes_fts_insert AFTER INSERT ON notes BEGIN
+    INSERT INTO notes_fts (rowid, organization_id, title, content)
+    VALUES (new.seq, new.organization_id, new.title, new.content);
+END;
+CREATE TRIGGER IF NOT EXISTS notes_fts_delete AFTER DELETE ON notes BEGIN
+    INSERT INTO notes_fts (notes_fts, rowid, organization_id, title, content)
+    VALUES ('delete', old.seq, old.organization_id, old.title, old.content);
+END;
+CREATE TRIGGER IF NOT EXISTS notes_fts_update AFTER UPDATE OF title, content ON notes BEGIN
+    INSERT INTO notes_fts (notes_fts, rowid, organization_id, title, content)
+    VALUES ('delete', old.seq, old.organization_id, old.title, old.content);
+    INSERT INTO notes_fts (rowid, organization_id, title, content)
+    VALUES (new.seq, new.organization_id, new.title, new.content);
+END;
+
+CREATE TABLE IF NOT EXISTS note_tombstones (
+    note_id TEXT NOT NULL,
+    organization_id TEXT NOT NULL,
+    deleted_at INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS note_tombstones_organization_deleted
+    ON note_tombstones (organization_id, deleted_at, note_id);
+CREATE INDEX IF NOT EXISTS note_tombstones_deleted ON note_tombstones (deleted_at);
+
+CREATE TABLE IF NOT EXISTS sessions (
+    id TEXT PRIMARY KEY,
+    user_id TEXT NOT NULL,
+    organization_id TEXT NOT NULL,
+    token_hash TEXT NOT NULL,
+    previous_token_hash TEXT,
+    created_at INTEGER NOT NULL,
+    last_used_at INTEGER NOT NULL,
+    expires_at INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS sessions_user ON sessions (user_id);
+CREATE INDEX IF NOT EXISTS sessions_expires ON sessions (expires_at);
+
+CREATE TABLE IF NOT EXISTS revoked_tokens (
+    jti TEXT PRIMARY KEY,
+    user_id TEXT NOT NULL,
+    revoked_at INTEGER NOT NULL,
+    expires_at INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS revoked_tokens_revoked ON revoked_tokens (revoked_at);
+CREATE INDEX IF NOT EXISTS revoked_tokens_expires ON revoked_tokens (expires_at);
+"""
+
+NOTE_COLUMNS = "id, organization_id, title, content, created_by, created_at, updated_at, version"
+USER_COLUMNS = (
+    "id, organization_id, email, password, name, role, is_active, token_version, created_at, updated_at"
+)
+
+
+def to_millis(value: datetime) -> int:
+    return (value - EPOCH) // timedelta(milliseconds=1)
+
+
+def from_millis(value: int) -> datetime:
+    return EPOCH + timedelta(milliseconds=value)
+
+
+def to_params(values: dict) -> dict:
+    """Python values of a document as SQLite parameters"""
+    params = {}
+    for key, value in values.items():
+        if isinstance(value, datetime):
+            value = to_millis(value)
+        elif isinstance(value, BaseModel):
+            value = value.model_dump_json()
+        elif isinstance(value, ObjectId):
+            value = str(value)
+        params[key] = value
+    return params
+
+
+def from_row(row: sqlite3.Row) -> dict:
+    values = {}
+    for key in row.keys():
+        value = row[key]
+        if value is not None and key in DATETIME_COLUMNS:
+            value = from_millis(value)
+        elif key == "is_active":
+            value = bool(value)
+        elif key == "admin_user" and value is not None:
+            value = AdminSummary.model_validate_json(value)
+        values[key] = value
+    return values
+
+
+def build(model: Type[BaseModel], values: dict):
+    """Instantiate a document or projection from stored values.
+
+    Beanie documents cannot be validated before ``init_beanie``, so they
+    are built with ``model_construct`` from values that were validated on
+    the way in.
+    """
+    values = dict(values)
+    if issubclass(model, Document):
+        if values.get("id") is not None:
+            values["id"] = PydanticObjectId(values["id"])
+        return model.model_construct(**values)
+    if "id" in values:
+        values["_id"] = PydanticObjectId(values.pop("id"))
+    return model.model_validate(values)
+
+
+def load(model: Type[BaseModel], row: Optional[sqlite3.Row]):
+    return build(model, from_row(row)) if row is not None else None
+
+
+def fetch_one(connection, sql: str, params=()) -> Optional[sqlite3.Row]:
+    # fetchall() runs the statement to completion, which RETURNING needs before COMMIT
+    rows = connection.execute(sql, params).fetchall()
+    return rows[0] if rows else None
+
+
+def fetch_all(connection, sql: str, params=()) -> List[sqlite3.Row]:
+    return connection.execute(sql, params).fetchall()
+
+
+def execute(connection, sql: str, params=()) -> int:
+    return connection.execute(sql, params).rowcount
+
+
+def placeholders(count: int) -> str:
+    return ", ".join("?" * count)
+
+
+def insert_sql(table: str, values: dict) -> str:
+    columns = ", ".join(values)
+    return f"INSERT INTO {table} ({columns}) VALUES ({', '.join(':' + name for name in values)})"
+
+
+def fts_string(text: str) -> str:
+    return '"' + text.replace('"', '""') + '"'
+
+
+def fts_query(organization_id: str, text: str) -> Optional[str]:
+    """Translate MongoDB ``$text`` search syntax into an FTS5 query.
+
+    Any of the terms may match, every quoted phrase must match and
+    ``-term`` excludes. Returns None when nothing could match.
+    """
+    phrases = [phrase for phrase in re.findall(r'"([^"]*)"', text) if re.search(r"\w", phrase)]
+    terms, negated = [], []
+    for term in re.findall(r"-?\w+", re.sub(r'"[^"]*"', " ", text)):
+        if term.startswith("-"):
+            negated.append(term[1:])
+        else:
+            terms.append(term)
+    if phrases:
+        expression = " AND ".join(fts_string(phrase) for phrase in phrases)
+    elif terms:
+        expression = " OR ".join(fts_string(term) for term in terms)
+    else:
+        return None
+    for term in negated:
+        expression = f"({expression}) NOT {fts_string(term)}"
+    return f"organization_id : {fts_string(organization_id)} AND {{title content}} : ({expression})"
+
+
+def note_columns(projection: Optional[Type[BaseModel]]) -> str:
+    """Columns a projection model needs, mirroring its MongoDB projection"""
+    if projection is None:
+        return NOTE_COLUMNS
+    settings = getattr(projection, "Settings", None)
+    names = list(settings.projection) if settings is not None else list(projection.model_fields)
+    columns = []
+    for name in names:
+        if name in ("_id", "id"):
+            columns.append("id")
+        elif name == "excerpt":
+            columns.append(f"substr(content, 1, {NOTE_EXCERPT_LENGTH}) AS excerpt")
+        else:
+            columns.append(name)
+    return ", ".join(columns)
+
+
+def note_where(
+    note_id: str,
+    organization_id: str,
+    owner_id: Optional[str] = None,
+    expected_versions: Optional[List[int]] = None
+) -> Tuple[str, list]:
+    clauses = ["id = ?", "organization_id = ?"]
+    params = [note_id, organization_id]
+    if owner_id is not None:
+        clauses.append("created_by = ?")
+        params.append(owner_id)
+    if expected_versions is not None:
+        # An empty list leaves "version IN ()", which never matches
+        clauses.append(f"version IN ({placeholders(len(expected_versions))})")
+        params.extend(expected_versions)
+    return " AND ".join(clauses), params
+
+
+def update_note_sql(fields: dict, where: str) -> str:
+    assignments = ", ".join(f"{name} = ?" for name in fields)
+    return (
+        f"UPDATE notes SET {assignments}, updated_at = ?, version = version + 1 "
+        f"WHERE {where} RETURNING {NOTE_COLUMNS}"
+    )
+
+
+class SQLiteDatabase:
+    """One SQLite file in WAL mode, with a single writer and a pool of readers.
+
+    Every write runs on one dedicated thread and connection, so writes never
+    contend for the database lock; WAL lets the reader connections keep
+    answering queries while a write is in progress.
+    """
+
+    def __init__(self, path: str, read_connections: int = SQLITE_READ_CONNECTIONS):
+        self.path = path
+        self.read_connections = read_connections
+        self._writer: Optional[ThreadPoolExecutor] = None
+        self._readers: Optional[ThreadPoolExecutor] = None
+        self._local = threading.local()
+        self._connections: List[sqlite3.Connection] = []
+        self._lock = threading.Lock()
+
+    def _connection(self, readonly: bool) -> sqlite3.Connection:
+        connection = getattr(self._local, "connection", None)
+        if connection is None:
+            connection = sqlite3.connect(self.path, isolation_level=None, check_same_thread=False)
+            connection.row_factory = sqlite3.Row
+            connection.execute(f"PRAGMA busy_timeout = {SQLITE_BUSY_TIMEOUT_MS}")
+            # In WAL mode NORMAL only risks the last commits on power loss, never corruption
+            connection.execute("PRAGMA synchronous = NORMAL")
+            if readonly:
+                connection.execute("PRAGMA query_only = ON")
+            self._local.connection = connection
+            with self._lock:
+                self._connections.append(connection)
+        return connection
+
+    async def _run(self, executor: ThreadPoolExecutor, readonly: bool, operation, *args):
+        def run():
+            return operation(self._connection(readonly), *args)
+        return await asyncio.get_running_loop().run_in_executor(executor, run)
+
+    async def connect(self):
+        self._writer = ThreadPoolExecutor(max_workers=1, thread_name_prefix="sqlite-writer")
+        self._readers = ThreadPoolExecutor(
+            max_workers=self.read_connections, thread_name_prefix="sqlite-reader"
+        )
+
+        def create_schema(connection):
+            connection.execute("PRAGMA journal_mode = WAL")
+            connection.executescript(SCHEMA)
+
+        await self._run(self._writer, False, create_schema)
+
+    async def read(self, operation, *args):
+        """Run ``operation(connection, *args)`` on a reader connection"""
+        return await self._run(self._readers, True, operation, *args)
+
+    async def write(self, operation, *args):
+        """Run ``operation(connection, *args)`` in one transaction on the writer"""
+        def transaction(connection, *args):
+            connection.execute("BEGIN IMMEDIATE")
+            try:
+                result = operation(connection, *args)
+            except BaseException:
+                connection.execute("ROLLBACK")
+                raise
+            connection.execute("COMMIT")
+            return result
+        return await self._run(self._writer, False, transaction, *args)
+
+    async def close(self):
+        writer, readers = self._writer, self._readers
+        self._writer = self._readers = None
+
+        def shutdown():
+            # Queued writes still commit; queued reads are dropped
+            if readers is not None:
+                readers.shutdown(wait=True, cancel_futures=True)
+            if writer is not None:
+                writer.shutdown(wait=True)
+            with self._lock:
+                for connection in self._connections:
+                    connection.close()
+                self._connections.clear()
+
+        # Waiting for the pools to drain must not block the event loop
+        await asyncio.get_running_loop().run_in_executor(None, shutdown)
+        self._local = threading.local()
+
+
+class SQLiteNoteRepository(NoteRepository):
+    def __init__(self, db: SQLiteDatabase):
+        self.db = db
+
+    async def create(self, fields: dict, session=None) -> Note:
+        now = datetime.utcnow()
+        values = {
+            "id": str(PydanticObjectId()), "created_at": now, "updated_at": now, "version": 1, **fields
+        }
+        await self.db.write(execute, insert_sql("notes", values), to_params(values))
+        return build(Note, values)
+
+    async def get(self, note_id, organization_id, projection=None, session=None):
+        if not ObjectId.is_valid(note_id):
+            return None
+        row = await self.db.read(
+            fetch_one,
+            f"SELECT {note_columns(projection)} FROM notes WHERE id = ? AND organization_id = ?",
+            (note_id, organization_id)
+        )
+        return load(projection or Note, row)
+
+    async def owners(self, note_ids, organization_id, session=None) -> Dict[str, str]:
+        rows = await self.db.read(
+            fetch_all,
+            f"SELECT id, created_by FROM notes WHERE organization_id = ? "
+            f"AND id IN ({placeholders(len(note_ids))})",
+            (organization_id, *note_ids)
+        )
+        return {row["id"]: row["created_by"] for row in rows}
+
+    async def list_page(
+        self,
+        organization_id: str,
+        limit: int,
+        after=None,
+        sort: str = "id",
+        projection: Optional[Type[BaseModel]] = None,
+        session=None
+    ) -> list:
+        # Both orders are range scans of an (organization_id, ...) index
+        where, params = "organization_id = ?", [organization_id]
+        if sort == "updated_at":
+            if after:
+                updated_at, note_id = after
+                where += " AND (updated_at, id) < (?, ?)"
+                params.extend([to_millis(updated_at), note_id])
+            order = "updated_at DESC, id DESC"
+        else:
+            if after:
+                where += " AND id > ?"
+                params.append(str(after))
+            order = "id"
+        rows = await self.db.read(
+            fetch_all,
+            f"SELECT {note_columns(projection)} FROM notes WHERE {where} ORDER BY {order} LIMIT ?",
+            (*params, limit)
+        )
+        return [load(projection or Note, row) for row in rows]
+
+    async def search(self, organization_id, text, offset, limit, session=None) -> List[NoteSearchView]:
+        query = fts_query(organization_id, text)
+        if query is None:
+            return []
+        rows = await self.db.read(
+            fetch_all,
+            """
+            SELECT n.id, n.title, n.content, n.created_by, n.created_at, n.updated_at,
+                   -bm25(notes_fts, 0.0, 1.0, 1.0) AS score
+            FROM notes_fts JOIN notes n ON n.seq = notes_fts.rowid
+            WHERE notes_fts MATCH ? AND n.organization_id = ?
+            ORDER BY score DESC, n.id
+            LIMIT ? OFFSET ?
+            """,
+            (query, organization_id, limit, offset)
+        )
+        return [load(NoteSearchView, row) for row in rows]
+
+    async def changed_since(self, organization_id, since, limit) -> List[Note]:
+        where, params = "organization_id = ?", [organization_id]
+        if since:
+            where += " AND (updated_at, id) > (?, ?)"
+            params.extend([to_millis(since[0]), since[1]])
+        rows = await self.db.read(
+            fetch_all,
+            f"SELECT {NOTE_COLUMNS} FROM notes WHERE {where} ORDER BY updated_at, id LIMIT ?",
+            (*params, limit)
+        )
+        return [load(Note, row) for row in rows]
+
+    async def deleted_since(self, organization_id, since, limit) -> List[NoteTombstone]:
+        where, params = "organization_id = ?", [organization_id]
+        if since:
+            where += " AND (deleted_at, note_id) > (?, ?)"
+            params.extend([to_millis(since[0]), since[1]])
+        rows = await self.db.read(
+            fetch_all,
+            f"SELECT note_id, organization_id, deleted_at FROM note_tombstones "
+            f"WHERE {where} ORDER BY deleted_at, note_id LIMIT ?",
+            (*params, limit)
+        )
+        return [load(NoteTombstone, row) for row in rows]
+
+    def stream(self, organization_id, after=None):
+        if after and not ObjectId.is_valid(after):
+            raise ValueError("Invalid note id to resume after")
+        return self._stream(organization_id, after)
+
+    async def _stream(self, organization_id, after):
+        # Keyset pages of EXPORT_BATCH_SIZE keep memory flat
+        while True:
+            notes = await self.list_page(organization_id, EXPORT_BATCH_SIZE, after=after)
+            for note in notes:
+                yield note
+            if len(notes) < EXPORT_BATCH_SIZE:
+                return
+            after = str(notes[-1].id)
+
+    async def update(
+        self, note_id, organization_id, fields, owner_id=None, expected_versions=None, session=None
+    ) -> Optional[Note]:
+        if not ObjectId.is_valid(note_id):
+            return None
+        where, params = note_where(note_id, organization_id, owner_id, expected_versions)
+        if not fields:
+            row = await self.db.read(fetch_one, f"SELECT {NOTE_COLUMNS} FROM notes WHERE {where}", params)
+        else:
+            # One statement matches, updates and returns the new row
+            row = await self.db.write(
+                fetch_one,
+                update_note_sql(fields, where),
+                (*fields.values(), to_millis(datetime.utcnow()), *params)
+            )
+        return load(Note, row)
+
+    async def delete(
+        self, note_id, organization_id, owner_id=None, expected_versions=None, session=None
+    ) -> bool:
+        if not ObjectId.is_valid(note_id):
+            return False
+        where, params = note_where(note_id, organization_id, owner_id, expected_versions)
+        return await self.db.write(execute, f"DELETE FROM notes WHERE {where}", params) == 1
+
+    async def bulk_write(
+        self, writes: List[NoteWrite], organization_id, session=None
+    ) -> Dict[int, Tuple[int, str]]:
+        now = datetime.utcnow()
+
+        def apply(connection):
+            # One transaction; a failing statement is rolled back on its own
+            failures = {}
+            for position, write in enumerate(writes):
+                try:
+                    if write.op == "create":
+                        values = {
+                            "id": write.note_id, "organization_id": organization_id,
+                            "created_at": now, "updated_at": now, "version": 1, **write.fields
+                        }
+                        connection.execute(insert_sql("notes", values), to_params(values))
+                        continue
+                    where, params = note_where(write.note_id, organization_id, write.owner_id)
+                    if write.op == "update":
+                        changed = len(connection.execute(
+                            update_note_sql(write.fields, where),
+                            (*write.fields.values(), to_millis(now), *params)
+                        ).fetchall())
+                    else:
+                        changed = execute(connection, f"DELETE FROM notes WHERE {where}", params)
+                    if not changed:
+                        exists = fetch_one(
+                            connection, "SELECT 1 FROM notes WHERE id = ? AND organization_id = ?",
+                            (write.note_id, organization_id)
+                        )
+                        failures[position] = (409, "Note changed owner") if exists else (404, "Note not found")
+                except sqlite3.IntegrityError as e:
+                    failures[position] = (409, str(e))
+                except sqlite3.Error as e:
+                    failures[position] = (500, str(e))
+            return failures
+
+        return await self.db.write(apply)
+
+    async def add_tombstones(self, note_ids, organization_id, session=None):
+        now = datetime.utcnow()
+
+        def insert(connection):
+            connection.executemany(
+                "INSERT INTO note_tombstones (note_id, organization_id, deleted_at) VALUES (?, ?, ?)",
+                [(note_id, organization_id, to_millis(now)) for note_id in note_ids]
+            )
+            # Stands in for the MongoDB TTL index
+            connection.execute(
+                "DELETE FROM note_tombstones WHERE deleted_at < ?",
+                (to_millis(now - timedelta(days=NOTE_TOMBSTONE_TTL_DAYS)),)
+            )
+
+        await self.db.write(insert)
+
+    async def get_listing_version(self, organization_id, session=None) -> int:
+        row = await self.db.read(
+            fetch_one, "SELECT notes_version FROM organizations WHERE id = ?", (organization_id,)
+        )
+        return row["notes_version"] if row else 0
+
+    async def bump_listing_version(self, organization_id, session=None):
+        await self.db.write(
+            execute,
+            "UPDATE organizations SET notes_version = notes_version + 1 WHERE id = ?",
+            (organization_id,)
+        )
+
+
+def new_user_values(fields: dict) -> dict:
+    now = datetime.utcnow()
+    return {
+        "id": str(PydanticObjectId()), "is_active": True, "token_version": 0,
+        "created_at": now, "updated_at": now, **fields
+    }
+
+
+class SQLiteUserRepository(UserRepository):
+    def __init__(self, db: SQLiteDatabase):
+        self.db = db
+
+    async def create(self, fields: dict) -> User:
+        values = new_user_values(fields)
+        try:
+            await self.db.write(execute, insert_sql("users", values), to_params(values))
+        except sqlite3.IntegrityError:
+            raise DuplicateError()
+        return build(User, values)
+
+    async def get(self, user_id, organization_id=None) -> Optional[User]:
+        if organization_id is None:
+            row = await self.db.read(
+                fetch_one, f"SELECT {USER_COLUMNS} FROM users WHERE id = ?", (str(user_id),)
+            )
+        else:
+            row = await self.db.read(
+                fetch_one,
+                f"SELECT {USER_COLUMNS} FROM users WHERE id = ? AND organization_id = ?",
+                (str(user_id), organization_id)
+            )
+        return load(User, row)
+
+    async def find_by_email(self, email, organization_id) -> Optional[User]:
+        row = await self.db.read(
+            fetch_one,
+            f"SELECT {USER_COLUMNS} FROM users WHERE organization_id = ? AND email = ?",
+            (organization_id, email)
+        )
+        return load(User, row)
+
+    async def list_for_organization(self, organization_id) -> List[User]:
+        rows = await self.db.read(
+            fetch_all,
+            f"SELECT {USER_COLUMNS} FROM users WHERE organization_id = ? ORDER BY rowid",
+            (organization_id,)
+        )
+        return [load(User, row) for row in rows]
+
+    async def find_admin(self, organization_id, exclude_id=None) -> Optional[User]:
+        row = await self.db.read(
+            fetch_one,
+            f"SELECT {USER_COLUMNS} FROM users "
+            f"WHERE organization_id = ? AND role = 'admin' AND id != ? LIMIT 1",
+            (organization_id, str(exclude_id or ""))
+        )
+        return load(User, row)
+
+    async def update(self, user_id, fields: dict, bump_token_version: bool = False):
+        values = to_params({**fields, "updated_at": datetime.utcnow()})
+        assignments = ", ".join(f"{name} = :{name}" for name in values)
+        if bump_token_version:
+            assignments += ", token_version = token_version + 1"
+        await self.db.write(
+            execute, f"UPDATE users SET {assignments} WHERE id = :user_id", {**values, "user_id": str(user_id)}
+        )
+
+    async def delete(self, user_id):
+        await self.db.write(execute, "DELETE FROM users WHERE id = ?", (str(user_id),))
+
+    async def get_token_version(self, user_id) -> Optional[UserTokenVersionView]:
+        row = await self.db.read(
+            fetch_one, "SELECT token_version, is_active FROM users WHERE id = ?", (str(user_id),)
+        )
+        return load(UserTokenVersionView, row)
+
+
+class SQLiteOrganizationRepository(OrganizationRepository):
+    def __init__(self, db: SQLiteDatabase):
+        self.db = db
+
+    async def create_with_admin(self, organization: dict, admin: dict) -> Tuple[Organization, User]:
+        now = datetime.utcnow()
+        organization = {
+            "description": None, "notes_version": 0, "admin_user": None,
+            "created_at": now, "updated_at": now, **organization
+        }
+        admin = new_user_values(admin)
+
+        def insert(connection):
+            connection.execute(insert_sql("organizations", organization), to_params(organization))
+            connection.execute(insert_sql("users", admin), to_params(admin))
+
+        # Both rows are written in one transaction
+        await self.db.write(insert)
+        return build(Organization, organization), build(User, admin)
+
+    async def get(self, org_id) -> Optional[Organization]:
+        row = await self.db.read(fetch_one, "SELECT * FROM organizations WHERE id = ?", (str(org_id),))
+        return load(Organization, row)
+
+    async def set_admin_summary(self, org_id, summary: Optional[AdminSummary]):
+        await self.db.write(
+            execute,
+            "UPDATE organizations SET admin_user = ? WHERE id = ?",
+            (summary.model_dump_json() if summary else None, str(org_id))
+        )
+
+
+class SQLiteSessionRepository(SessionRepository):
+    def __init__(self, db: SQLiteDatabase):
+        self.db = db
+
+    async def create(self, fields: dict) -> Session:
+        now = datetime.utcnow()
+        values = {
+            "id": str(PydanticObjectId()), "previous_token_hash": None,
+            "created_at": now, "last_used_at": now, **fields
+        }
+
+        def insert(connection):
+            connection.execute(insert_sql("sessions", values), to_params(values))
+            # Stands in for the MongoDB TTL index
+            connection.execute("DELETE FROM sessions WHERE expires_at <= ?", (to_millis(now),))
+
+        await self.db.write(insert)
+        return build(Session, values)
+
+    async def rotate(self, session_id, token_hash, new_token_hash, now, expires_at) -> Optional[Session]:
+        row = await self.db.write(
+            fetch_one,
+            """
+            UPDATE sessions
+            SET token_hash = ?, previous_token_hash = ?, last_used_at = ?, expires_at = ?
+            WHERE id = ? AND token_hash = ? AND expires_at > ?
+            RETURNING *
+            """,
+            (
+                new_token_hash, token_hash, to_millis(now), to_millis(expires_at),
+                str(session_id), token_hash, to_millis(now)
+            )
+        )
+        return load(Session, row)
+
+    async def delete_rotated(self, session_id, previous_token_hash):
+        await self.db.write(
+            execute,
+            "DELETE FROM sessions WHERE id = ? AND previous_token_hash = ?",
+            (str(session_id), previous_token_hash)
+        )
+
+    async def delete(self, session_id, token_hash) -> bool:
+        deleted = await self.db.write(
+            execute, "DELETE FROM sessions WHERE id = ? AND token_hash = ?", (str(session_id), token_hash)
+        )
+        return deleted > 0
+
+    async def delete_for_user(self, user_id):
+        await self.db.write(execute, "DELETE FROM sessions WHERE user_id = ?", (str(user_id),))
+
+
+class SQLiteRevokedTokenRepository(RevokedTokenRepository):
+    def __init__(self, db: SQLiteDatabase):
+        self.db = db
+
+    async def revoked_since(self, since):
+        now = to_millis(datetime.utcnow())
+        rows = await self.db.read(
+            fetch_all,
+            "SELECT jti, user_id, revoked_at, expires_at FROM revoked_tokens "
+            "WHERE revoked_at >= ? AND expires_at > ? ORDER BY revoked_at",
+            (to_millis(since) if since is not None else 0, now)
+        )
+        for row in rows:
+            yield load(RevokedToken, row)
+
+    async def exists(self, jti) -> bool:
+        row = await self.db.read(
+            fetch_one,
+            "SELECT 1 FROM revoked_tokens WHERE jti = ? AND expires_at > ?",
+            (jti, to_millis(datetime.utcnow()))
+        )
+        return row is not None
+
+    async def add(self, jti, user_id, expires_at):
+        now = datetime.utcnow()
+
+        def insert(connection):
+            connection.execute(
+                "INSERT OR IGNORE INTO revoked_tokens (jti, user_id, revoked_at, expires_at) "
+                "VALUES (?, ?, ?, ?)",
+                (jti, str(user_id), to_millis(now), to_millis(expires_at))
+            )
+            # Stands in for the MongoDB TTL index
+            connection.execute("DELETE FROM revoked_tokens WHERE expires_at <= ?", (to_millis(now),))
+
+        await self.db.write(insert)
+
+
+class SQLiteBackend(StorageBackend):
+    """A single SQLite file, for single-node deployments and tests without MongoDB"""
+
+    def __init__(self, path: str = SQLITE_PATH):
+        self.db = SQLiteDatabase(path)
+        self.notes = SQLiteNoteRepository(self.db)
+        self.users = SQLiteUserRepository(self.db)
+        self.organizations = SQLiteOrganizationRepository(self.db)
+        self.sessions = SQLiteSessionRepository(self.db)
+        self.revoked_tokens = SQLiteRevokedTokenRepository(self.db)
+
+    async def connect(self):
+        await self.db.connect()
+
+    async def close(self):
+        await self.db.close()
@@ -0,0 +1,37 @@
+import os
+from typing import Any, Mapping, Optional
+import pydantic_core
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse, Response
+
+# Render responses with pydantic-core instead of jsonable_encoder + json.dumps
+FAST_JSON_RESPONSES = os.getenv("FAST_JSON_RESPONSES", "true").lower() in ("1", "true", "yes")
+
+class PydanticJSONResponse(JSONResponse):
+    """JSON response serialized in Rust by pydantic-core.
+
+    Accepts pydantic models (including nested and in lists) as well as
+    plain JSON-compatible data.
+    """
+
+    def render(self, content: Any) -> bytes:
+        return pydantic_core.to_json(content)
+
+def get_default_response_class():
+    """Response class FastAPI should use for handlers returning plain data"""
+    return PydanticJSONResponse if FAST_JSON_RESPONSES else JSONResponse
+
+def model_response(
+    content: Any,
+    status_code: int = 200,
+    headers: Optional[Mapping[str, str]] = None
+) -> Response:
+    """Wrap already validated response models in a finished response.
+
+    Returning a ``Response`` makes FastAPI skip re-validating the content
+    against ``response_model``; the route keeps ``response_model`` for the
+    OpenAPI schema only.
+    """
+    if FAST_JSON_RESPONSES:
+        return PydanticJSONResponse(content, status_code=status_code, headers=headers)
+    return JSONResponse(jsonable_encoder(content), status_code=status_code, headers=headers)
@@ -1,30 +1,52 @@
 from datetime import timedelta
-from fastapi import APIRouter, HTTPException, status, Depends
-from app.schemas.user import UserLogin, Token, UserResponse
+from typing import Optional
+from fastapi import APIRouter, HTTPException, Request, status, Depends
+from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
+from app.schemas.user import UserLogin, Token, UserResponse, RefreshRequest, RefreshedToken
 from app.services.auth import (
     authenticate_user, create_access_token, 
-    get_current_active_user, ACCESS_TOKEN_EXPIRE_MINUTES
+    get_current_active_user, invalidate_principal, revoke_access_token,
+    build_token_claims, refresh_token_claims, ACCESS_TOKEN_EXPIRE_MINUTES
 )
-from app.services.auth import verify_password, get_password_hash
+from app.services.auth import verify_password_async, get_password_hash_async
 from app.models.user import User
+from app.services.login_throttle import login_throttle
+from app.services.session import SessionService
+from app.services.user import UserService
 
 router = APIRouter()
+optional_bearer = HTTPBearer(auto_error=False)
+
+def issue_access_token(claims: dict) -> str:
+    return create_access_token(
+        data=claims,
+        expires_delta=timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
+    )
 
 @router.post("/login/{org_id}", response_model=Token)
-async def login_for_access_token(org_id: str, form_data: UserLogin):
+async def login_for_access_token(org_id: str, form_data: UserLogin, request: Request):
+    # Throttled attempts are rejected before any database or bcrypt work
+    client_ip = request.client.host if request.client else "unknown"
+    retry_after = login_throttle.check(org_id, form_data.email, client_ip)
+    if retry_after:
+        raise HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail="Too many failed login attempts",
+            headers={"Retry-After": str(int(retry_after))},
+        )
+    
     user = await authenticate_user(form_data.email, form_data.password, org_id)
     if not user:
+        login_throttle.record_failure(org_id, form_data.email, client_ip)
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect email or password",
             headers={"WWW-Authenticate": "Bearer"},
         )
+    login_throttle.record_success(org_id, form_data.email)
     
-    access_token_expires = timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
-    access_token = create_access_token(
-        data={"sub": str(user.id), "org_id": org_id}, 
-        expires_delta=access_token_expires
-    )
+    access_token = issue_access_token(build_token_claims(user))
+    refresh_token = await SessionService.create_session(user.id, org_id)
     
     user_response = UserResponse(
         id=str(user.id),
@@ -39,9 +61,42 @@ async def login_for_access_token(org_id: str, form_data: UserLogin):
     return Token(
         access_token=access_token, 
         token_type="bearer",
-        user=user_response
+        user=user_response,
+        refresh_token=refresh_token
     )
 
+@router.post("/refresh", response_model=RefreshedToken)
+async def refresh_access_token(body: RefreshRequest):
+    # One primary-key update on the session; no user lookup or password hashing
+    rotated = await SessionService.rotate_session(body.refresh_token)
+    claims = None
+    if rotated is not None:
+        session, refresh_token = rotated
+        claims = await refresh_token_claims(session.user_id, session.organization_id)
+    if claims is None:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid or expired refresh token",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+    
+    return RefreshedToken(
+        access_token=issue_access_token(claims),
+        refresh_token=refresh_token,
+        token_type="bearer"
+    )
+
+@router.post("/logout")
+async def logout(
+    body: RefreshRequest,
+    credentials: Optional[HTTPAuthorizationCredentials] = Depends(optional_bearer)
+):
+    await SessionService.revoke_session(body.refresh_token)
+    # The access token presented with the logout stops working immediately too
+    if credentials is not None:
+        await revoke_access_token(credentials.credentials)
+    return {"message": "Logged out successfully"}
+
 @router.get("/me", response_model=UserResponse)
 async def read_users_me(current_user: User = Depends(get_current_active_user)):
     return UserResponse(
@@ -63,23 +118,24 @@ async def change_password(
 ):
     
     
-    if not verify_password(current_password, current_user.password):
+    if not await verify_password_async(current_password, current_user.password):
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Current password is incorrect"
         )
 
-    current_user.password = get_password_hash(new_password)
-    await current_user.save()
+    await UserService.set_password(current_user, await get_password_hash_async(new_password))
+    invalidate_principal(current_user.id)
+    await SessionService.revoke_user_sessions(current_user.id)
     
     return {"message": "Password updated successfully"}
 
 
 @router.get("/me/with-org")
 async def read_users_me_with_org(current_user: User = Depends(get_current_active_user)):
-    from app.models.organization import Organization
+    from app.services.organization import OrganizationService
     
-    organization = await Organization.get(current_user.organization_id)
+    organization = await OrganizationService.get_organization(current_user.organization_id)
     
     user_response = UserResponse(
         id=str(current_user.id),
@@ -1,13 +1,25 @@
-from typing import List
-from fastapi import APIRouter, HTTPException, status, Depends
-from app.schemas.note import NoteCreate, NoteResponse, NoteUpdate
-from app.services.note import NoteService
-from app.services.auth import get_current_active_user
-from app.models.user import User
+from typing import Optional
+from fastapi import APIRouter, HTTPException, status, Depends, Query, Header, Response
+from fastapi.responses import StreamingResponse
+from app.schemas.note import (
+    NoteCreate, NoteResponse, NoteUpdate, NotePage, NoteSummary,
+    NoteBatchRequest, NoteBatchResponse, NoteBatchResult,
+    NoteSearchHit, NoteSearchPage, NoteChanges
+)
+from app.services.note import (
+    NoteService, SyncTokenExpired, build_snippet, note_etag, parse_note_etags,
+    DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE, DEFAULT_SEARCH_PAGE_SIZE, DEFAULT_SYNC_PAGE_SIZE
+)
+from app.models.note import NoteSummaryView, NoteExcerptView
+from app.services.auth import get_current_principal
+from app.services.etag import make_etag, etag_matches
+from app.services.causal import read_session, write_session, causal_headers
+from app.responses import model_response
+from app.schemas.user import Principal
 
 router = APIRouter()
 
-def check_permission(user: User, action: str):
+def check_permission(user: Principal, action: str):
     """Check if user has permission for the requested action"""
     permissions = {
         "reader": ["read"],
@@ -24,109 +36,291 @@ def check_permission(user: User, action: str):
 @router.post("/", response_model=NoteResponse)
 async def create_note(
     note_data: NoteCreate,
-    current_user: User = Depends(get_current_active_user)
+    current_user: Principal = Depends(get_current_principal),
+    session=Depends(write_session)
 ):
     check_permission(current_user, "create")
     
     note = await NoteService.create_note(
         note_data, 
         current_user.organization_id, 
-        str(current_user.id)
+        str(current_user.id),
+        session=session
     )
     
-    return NoteResponse(
-        id=str(note.id),
-        title=note.title,
-        content=note.content,
-        organization_id=note.organization_id,
-        created_by=note.created_by,
-        created_at=note.created_at,
-        updated_at=note.updated_at
+    return model_response(
+        NoteResponse.model_validate(note),
+        headers={"ETag": note_etag(note), **causal_headers(session)}
     )
 
-@router.get("/", response_model=List[NoteResponse])
-async def list_notes(current_user: User = Depends(get_current_active_user)):
+@router.post("/batch", response_model=NoteBatchResponse)
+async def batch_notes(
+    batch: NoteBatchRequest,
+    current_user: Principal = Depends(get_current_principal),
+    session=Depends(write_session)
+):
+    """Create, update and delete many notes in one request.
+
+    Every operation is authorized like its single-note endpoint and gets
+    its own result; one failing item does not abort the others.
+    """
+    denied = []
+    allowed = []
+    for index, operation in enumerate(batch.operations):
+        try:
+            check_permission(current_user, operation.op)
+        except HTTPException as e:
+            denied.append(NoteBatchResult(
+                index=index, op=operation.op, status=e.status_code, id=operation.id, detail=e.detail
+            ))
+            continue
+        allowed.append((index, operation))
+    
+    applied = await NoteService.apply_batch(
+        allowed,
+        current_user.organization_id,
+        str(current_user.id),
+        own_notes_only=current_user.role == "writer",
+        session=session
+    )
+    
+    return model_response(
+        NoteBatchResponse(results=sorted(denied + applied, key=lambda r: r.index)),
+        headers=causal_headers(session)
+    )
+
+@router.get("/", response_model=NotePage)
+async def list_notes(
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+    view: str = Query("full", pattern="^(full|summary)$"),
+    excerpt: bool = False,
+    sort: str = Query("id", pattern="^(id|updated_at)$"),
+    if_none_match: Optional[str] = Header(None),
+    current_user: Principal = Depends(get_current_principal),
+    session=Depends(read_session)
+):
     check_permission(current_user, "read")
     
-    notes = await NoteService.get_organization_notes(current_user.organization_id)
-    return [
-        NoteResponse(
-            id=str(note.id),
-            title=note.title,
-            content=note.content,
-            organization_id=note.organization_id,
-            created_by=note.created_by,
-            created_at=note.created_at,
-            updated_at=note.updated_at
-        ) for note in notes
-    ]
+    # The tenant's listing version changes on every note write, so a matching
+    # ETag can be answered without reading any notes. It is read in the same
+    # causal session as the page, and before it, so the page is never older
+    version = await NoteService.get_listing_version(current_user.organization_id, session=session)
+    etag = make_etag(
+        current_user.organization_id, version, limit, cursor, view, excerpt, sort
+    )
+    if etag_matches(if_none_match, etag):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers={"ETag": etag})
+    
+    # Summary listings never load note bodies from MongoDB
+    projection = None
+    if view == "summary":
+        projection = NoteExcerptView if excerpt else NoteSummaryView
+    
+    try:
+        notes, next_cursor = await NoteService.get_organization_notes(
+            current_user.organization_id,
+            limit=limit,
+            cursor=cursor,
+            projection=projection,
+            sort=sort,
+            session=session
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    item_model = NoteSummary if projection is not None else NoteResponse
+    items = [item_model.model_validate(note) for note in notes]
+    
+    return model_response(NotePage(items=items, next_cursor=next_cursor), headers={"ETag": etag})
+
+@router.get("/search", response_model=NoteSearchPage)
+async def search_notes(
+    q: str = Query(..., min_length=1, max_length=256),
+    limit: int = Query(DEFAULT_SEARCH_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+    current_user: Principal = Depends(get_current_principal),
+    session=Depends(read_session)
+):
+    check_permission(current_user, "read")
+    
+    try:
+        hits, next_cursor = await NoteService.search_notes(
+            current_user.organization_id, q, limit=limit, cursor=cursor, session=session
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    return model_response(NoteSearchPage(
+        items=[
+            NoteSearchHit(
+                id=str(hit.id),
+                title=hit.title,
+                created_by=hit.created_by,
+                created_at=hit.created_at,
+                updated_at=hit.updated_at,
+                score=hit.score,
+                snippet=build_snippet(hit.content, q)
+            ) for hit in hits
+        ],
+        next_cursor=next_cursor
+    ))
+
+@router.get("/changes", response_model=NoteChanges)
+async def note_changes(
+    since: Optional[str] = None,
+    limit: int = Query(DEFAULT_SYNC_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    current_user: Principal = Depends(get_current_principal)
+):
+    """Notes created, updated or deleted since the ``since`` sync token.
+
+    Omit ``since`` for an initial sync. Keep calling with ``next_token``
+    while ``has_more`` is true.
+    """
+    check_permission(current_user, "read")
+    
+    try:
+        updated, deleted, next_token, has_more = await NoteService.get_changes(
+            current_user.organization_id, since=since, limit=limit
+        )
+    except SyncTokenExpired:
+        raise HTTPException(
+            status_code=status.HTTP_410_GONE,
+            detail="Sync token expired, perform a full sync"
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    return model_response(NoteChanges(
+        updated=[NoteResponse.model_validate(note) for note in updated],
+        deleted=deleted,
+        next_token=next_token,
+        has_more=has_more
+    ))
+
+@router.get("/export")
+async def export_notes(
+    after: Optional[str] = None,
+    current_user: Principal = Depends(get_current_principal)
+):
+    """Stream every note of the organization as newline-delimited JSON.
+
+    Pass the ``id`` of the last exported note as ``after`` to resume.
+    """
+    check_permission(current_user, "read")
+    
+    try:
+        notes = NoteService.stream_organization_notes(current_user.organization_id, after=after)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    async def ndjson():
+        async for note in notes:
+            yield NoteResponse.model_validate(note).model_dump_json() + "\n"
+    
+    return StreamingResponse(ndjson(), media_type="application/x-ndjson")
 
 @router.get("/{note_id}", response_model=NoteResponse)
-async def get_note(note_id: str, current_user: User = Depends(get_current_active_user)):
+async def get_note(
+    note_id: str,
+    if_none_match: Optional[str] = Header(None),
+    current_user: Principal = Depends(get_current_principal),
+    session=Depends(read_session)
+):
     check_permission(current_user, "read")
     
-    note = await NoteService.get_note(note_id, current_user.organization_id)
+    if if_none_match:
+        # Check the version alone first so unchanged notes never load content
+        version = await NoteService.get_note_version(
+            note_id, current_user.organization_id, session=session
+        )
+        if not version:
+            raise HTTPException(status_code=404, detail="Note not found")
+        etag = note_etag(version)
+        if etag_matches(if_none_match, etag):
+            return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers={"ETag": etag})
+    
+    note = await NoteService.get_note(note_id, current_user.organization_id, session=session)
     if not note:
         raise HTTPException(status_code=404, detail="Note not found")
     
-    return NoteResponse(
-        id=str(note.id),
-        title=note.title,
-        content=note.content,
-        organization_id=note.organization_id,
-        created_by=note.created_by,
-        created_at=note.created_at,
-        updated_at=note.updated_at
+    return model_response(NoteResponse.model_validate(note), headers={"ETag": note_etag(note)})
+
+async def raise_write_failure(
+    note_id: str,
+    current_user: Principal,
+    owner_id: Optional[str],
+    action: str,
+    session=None
+):
+    """Explain why a conditional update or delete matched no note.
+
+    Only runs once a write has already failed, so successful writes stay a
+    single round trip.
+    """
+    # The write's own session makes this read see at least what the write saw
+    note = await NoteService.get_note_version(
+        note_id, current_user.organization_id, session=session
+    )
+    if not note:
+        raise HTTPException(status_code=404, detail="Note not found")
+    if owner_id and note.created_by != owner_id:
+        raise HTTPException(
+            status_code=403, 
+            detail=f"Can only {action} your own notes"
+        )
+    raise HTTPException(
+        status_code=status.HTTP_412_PRECONDITION_FAILED,
+        detail="Note has been modified",
+        headers={"ETag": note_etag(note)}
     )
 
 @router.put("/{note_id}", response_model=NoteResponse)
 async def update_note(
     note_id: str, 
     note_data: NoteUpdate,
-    current_user: User = Depends(get_current_active_user)
+    if_match: Optional[str] = Header(None),
+    current_user: Principal = Depends(get_current_principal),
+    session=Depends(write_session)
 ):
     check_permission(current_user, "update")
     
-    note = await NoteService.get_note(note_id, current_user.organization_id)
-    if not note:
-        raise HTTPException(status_code=404, detail="Note not found")
-    
-    if current_user.role in ["writer"] and note.created_by != str(current_user.id):
-        raise HTTPException(
-            status_code=403, 
-            detail="Can only update your own notes"
-        )
-    
+    # Ownership and If-Match are both enforced by the update filter itself
+    owner_id = str(current_user.id) if current_user.role == "writer" else None
     updated_note = await NoteService.update_note(
-        note_id, note_data, current_user.organization_id
+        note_id,
+        note_data,
+        current_user.organization_id,
+        owner_id=owner_id,
+        expected_versions=parse_note_etags(if_match),
+        session=session
     )
+    if not updated_note:
+        await raise_write_failure(note_id, current_user, owner_id, "update", session)
     
-    return NoteResponse(
-        id=str(updated_note.id),
-        title=updated_note.title,
-        content=updated_note.content,
-        organization_id=updated_note.organization_id,
-        created_by=updated_note.created_by,
-        created_at=updated_note.created_at,
-        updated_at=updated_note.updated_at
+    return model_response(
+        NoteResponse.model_validate(updated_note),
+        headers={"ETag": note_etag(updated_note), **causal_headers(session)}
     )
 
 @router.delete("/{note_id}")
-async def delete_note(note_id: str, current_user: User = Depends(get_current_active_user)):
+async def delete_note(
+    note_id: str,
+    if_match: Optional[str] = Header(None),
+    current_user: Principal = Depends(get_current_principal),
+    session=Depends(write_session)
+):
     check_permission(current_user, "delete")
     
-    note = await NoteService.get_note(note_id, current_user.organization_id)
-    if not note:
-        raise HTTPException(status_code=404, detail="Note not found")
-    
-    if current_user.role == "writer" and note.created_by != str(current_user.id):
-        raise HTTPException(
-            status_code=403, 
-            detail="Can only delete your own notes"
-        )
-    
-    success = await NoteService.delete_note(note_id, current_user.organization_id)
+    owner_id = str(current_user.id) if current_user.role == "writer" else None
+    success = await NoteService.delete_note(
+        note_id,
+        current_user.organization_id,
+        owner_id=owner_id,
+        expected_versions=parse_note_etags(if_match),
+        session=session
+    )
     if not success:
-        raise HTTPException(status_code=404, detail="Note not found")
+        await raise_write_failure(note_id, current_user, owner_id, "delete", session)
     
-    return {"message": "Note deleted successfully"}
\ No newline at end of file
+    return model_response({"message": "Note deleted successfully"}, headers=causal_headers(session))
\ No newline at end of file
@@ -28,23 +28,14 @@ async def get_organization(org_id: str):
     if not organization:
         raise HTTPException(status_code=404, detail="Organization not found")
     
-    # Get the admin user for this organization
-    from app.models.user import User
-    admin_user = await User.find_one({
-        "organization_id": org_id, 
-        "role": "admin"
-    })
+    # The admin is denormalized onto the organization, so no user lookup here
+    admin_user = await OrganizationService.get_admin_summary(organization)
     
     return OrganizationResponse(
         id=str(organization.id),
         name=organization.name,
         description=organization.description,
-        admin_user={
-            "id": str(admin_user.id),
-            "email": admin_user.email,
-            "name": admin_user.name,
-            "role": admin_user.role
-        } if admin_user else None,
+        admin_user=admin_user.model_dump() if admin_user else None,
         created_at=organization.created_at,
         updated_at=organization.updated_at
-    )
\ No newline at end of file
+    )
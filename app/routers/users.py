@@ -2,7 +2,10 @@ from fastapi import APIRouter, HTTPException, Depends,status
 from typing import List
 from app.schemas.user import UserCreate, UserResponse
 from app.services.user import UserService
-from app.services.auth import get_current_active_user
+from app.services.auth import get_current_active_user, invalidate_principal
+from app.services.session import SessionService
+from app.services.organization import OrganizationService
+from app.responses import model_response
 from app.models.user import User
 
 router = APIRouter()
@@ -28,17 +31,11 @@ async def create_user(
     
     try:
         user = await UserService.create_user(user_data, org_id)
-        return UserResponse(
-            id=str(user.id),
-            email=user.email,
-            name=user.name,
-            role=user.role,
-            organization_id=user.organization_id,
-            is_active=user.is_active,
-            created_at=user.created_at
-        )
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
+    
+    await OrganizationService.sync_admin_summary(user)
+    return model_response(UserResponse.model_validate(user))
 
 @router.get("/", response_model=List[UserResponse])
 async def get_organization_users(
@@ -51,17 +48,7 @@ async def get_organization_users(
         raise HTTPException(status_code=403, detail="Access denied")
     
     users = await UserService.get_organization_users(org_id)
-    return [
-        UserResponse(
-            id=str(user.id),
-            email=user.email,
-            name=user.name,
-            role=user.role,
-            organization_id=user.organization_id,
-            is_active=user.is_active,
-            created_at=user.created_at
-        ) for user in users
-    ]
+    return model_response([UserResponse.model_validate(user) for user in users])
 
 @router.put("/{user_id}", response_model=UserResponse)
 async def update_user_role(
@@ -90,18 +77,11 @@ async def update_user_role(
     if new_role not in ["reader", "writer", "admin"]:
         raise HTTPException(status_code=400, detail="Invalid role")
     
-    user.role = new_role
-    await user.save()
+    await UserService.set_role(user, new_role)
+    invalidate_principal(user.id)
+    await OrganizationService.sync_admin_summary(user)
     
-    return UserResponse(
-        id=str(user.id),
-        email=user.email,
-        name=user.name,
-        role=user.role,
-        organization_id=user.organization_id,
-        is_active=user.is_active,
-        created_at=user.created_at
-    )
+    return model_response(UserResponse.model_validate(user))
 
 @router.delete("/{user_id}")
 async def delete_user(
@@ -124,5 +104,8 @@ async def delete_user(
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
     
-    await user.delete()
+    await UserService.delete_user(user)
+    invalidate_principal(user.id)
+    await SessionService.revoke_user_sessions(user.id)
+    await OrganizationService.sync_admin_summary(user, removed=True)
     return {"message": "User deleted successfully"}
\ No newline at end of file
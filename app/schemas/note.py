@@ -1,5 +1,5 @@
-from typing import Optional
-from pydantic import BaseModel
+from typing import List, Literal, Optional, Union
+from pydantic import BaseModel, Field, field_validator
 from datetime import datetime
 
 class NoteCreate(BaseModel):
@@ -19,5 +19,73 @@ class NoteResponse(BaseModel):
     created_at: datetime
     updated_at: datetime
 
+    # Lets NoteResponse.model_validate(note) read Beanie documents directly
+    @field_validator("id", mode="before")
+    @classmethod
+    def stringify_id(cls, value):
+        return str(value)
+
+    class Config:
+        from_attributes = True
+
+class NoteSummary(BaseModel):
+    id: str
+    title: str
+    organization_id: str
+    created_by: str
+    created_at: datetime
+    updated_at: datetime
+    excerpt: Optional[str] = None
+
+    @field_validator("id", mode="before")
+    @classmethod
+    def stringify_id(cls, value):
+        return str(value)
+
     class Config:
-        from_attributes = True
\ No newline at end of file
+        from_attributes = True
+
+class NoteSearchHit(BaseModel):
+    id: str
+    title: str
+    created_by: str
+    created_at: datetime
+    updated_at: datetime
+    score: float
+    snippet: str
+
+class NoteSearchPage(BaseModel):
+    items: List[NoteSearchHit]
+    next_cursor: Optional[str] = None
+
+class NoteChanges(BaseModel):
+    updated: List[NoteResponse]
+    deleted: List[str]
+    next_token: Optional[str] = None
+    has_more: bool
+
+class NotePage(BaseModel):
+    items: List[Union[NoteResponse, NoteSummary]]
+    next_cursor: Optional[str] = None
+
+
+MAX_BATCH_OPERATIONS = 500
+
+class NoteBatchOperation(BaseModel):
+    op: Literal["create", "update", "delete"]
+    id: Optional[str] = None
+    title: Optional[str] = None
+    content: Optional[str] = None
+
+class NoteBatchRequest(BaseModel):
+    operations: List[NoteBatchOperation] = Field(..., min_length=1, max_length=MAX_BATCH_OPERATIONS)
+
+class NoteBatchResult(BaseModel):
+    index: int
+    op: str
+    status: int
+    id: Optional[str] = None
+    detail: Optional[str] = None
+
+class NoteBatchResponse(BaseModel):
+    results: List[NoteBatchResult]
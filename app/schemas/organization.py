@@ -13,7 +13,7 @@ class OrganizationResponse(BaseModel):
     id: str
     name: str
     description: Optional[str]
-    admin_user: dict  # Include admin user details in response
+    admin_user: Optional[dict]  # Include admin user details in response
     created_at: datetime
     updated_at: datetime
 
@@ -1,5 +1,5 @@
 from typing import Optional
-from pydantic import BaseModel, EmailStr
+from pydantic import BaseModel, EmailStr, field_validator
 from datetime import datetime
 
 class UserCreate(BaseModel):
@@ -17,6 +17,12 @@ class UserResponse(BaseModel):
     is_active: bool
     created_at: datetime
 
+    # Lets UserResponse.model_validate(user) read Beanie documents directly
+    @field_validator("id", mode="before")
+    @classmethod
+    def stringify_id(cls, value):
+        return str(value)
+
     class Config:
         from_attributes = True
 
@@ -28,7 +34,31 @@ class Token(BaseModel):
     access_token: str
     token_type: str
     user: UserResponse
+    refresh_token: Optional[str] = None
+
+class RefreshRequest(BaseModel):
+    refresh_token: str
+
+class RefreshedToken(BaseModel):
+    access_token: str
+    refresh_token: str
+    token_type: str
 
 class TokenData(BaseModel):
     user_id: Optional[str] = None
-    org_id: Optional[str] = None
\ No newline at end of file
+    org_id: Optional[str] = None
+
+class Principal(BaseModel):
+    """Authenticated caller as far as authorization needs to know"""
+    id: str
+    organization_id: str
+    role: str
+    is_active: bool = True
+
+    @field_validator("id", mode="before")
+    @classmethod
+    def stringify_id(cls, value):
+        return str(value)
+
+    class Config:
+        from_attributes = True
@@ -1,13 +1,20 @@
 import os
+import asyncio
+import uuid
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
 from typing import Optional
 from jose import JWTError, jwt
 from passlib.context import CryptContext
-from fastapi import HTTPException, status, Depends
+from fastapi import HTTPException, Request, status, Depends
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 
-from app.models.user import User
-from app.schemas.user import TokenData
+from app.models.user import User, UserTokenVersionView
+from app.repositories import storage
+from app.schemas.user import TokenData, Principal
+from app.services.cache import TTLCache
+from app.services.revocation import revocation_list
+from app.services.keys import KeyRing, ASYMMETRIC_ALGORITHMS
 
 pwd_context = CryptContext(
     schemes=["bcrypt"],
@@ -18,9 +25,35 @@ security = HTTPBearer()
 
 # JWT Configuration
 SECRET_KEY = os.getenv("JWT_SECRET", "JHCJzjhDSHWEYUYUYWEUYCJDHjkhCYscgyC89w8eyiucdksjs")
-ALGORITHM = "HS256"
+ALGORITHM = os.getenv("JWT_ALGORITHM", "HS256")
 ACCESS_TOKEN_EXPIRE_MINUTES = 30
 
+# Asymmetric signing: a directory of <kid>.pem files; JWT_ACTIVE_KID picks the
+# signing key and may only be left unset while the directory holds one private key
+JWT_KEYS_DIR = os.getenv("JWT_KEYS_DIR")
+JWT_ACTIVE_KID = os.getenv("JWT_ACTIVE_KID")
+
+_keyring: Optional[KeyRing] = None
+
+# Password hashing pool configuration
+PASSWORD_HASH_WORKERS = int(os.getenv("PASSWORD_HASH_WORKERS", "4"))
+PASSWORD_HASH_MAX_PENDING = int(os.getenv("PASSWORD_HASH_MAX_PENDING", "64"))
+
+_password_pool: Optional[ThreadPoolExecutor] = None
+_password_pending = 0
+
+# Authenticated principal cache, keyed by user id
+PRINCIPAL_CACHE_SIZE = int(os.getenv("PRINCIPAL_CACHE_SIZE", "10000"))
+PRINCIPAL_CACHE_TTL_SECONDS = float(os.getenv("PRINCIPAL_CACHE_TTL_SECONDS", "30"))
+
+principal_cache = TTLCache(maxsize=PRINCIPAL_CACHE_SIZE, ttl=PRINCIPAL_CACHE_TTL_SECONDS)
+
+# Stateless mode: tokens carry role claims checked against a cached per-user version
+STATELESS_AUTH = os.getenv("STATELESS_AUTH", "false").lower() in ("1", "true", "yes")
+USER_VERSION_CACHE_TTL_SECONDS = float(os.getenv("USER_VERSION_CACHE_TTL_SECONDS", "10"))
+
+user_version_cache = TTLCache(maxsize=PRINCIPAL_CACHE_SIZE, ttl=USER_VERSION_CACHE_TTL_SECONDS)
+
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     """Verify a password against its hash"""
     try:
@@ -43,19 +76,79 @@ def get_password_hash(password: str) -> str:
         import hashlib
         return hashlib.sha256(password.encode()).hexdigest()
 
+async def _run_in_password_pool(func, *args):
+    """Run a bcrypt call on the worker pool so it never blocks the event loop.
+
+    Requests are shed with a 503 once ``PASSWORD_HASH_MAX_PENDING`` calls are
+    already queued or running, instead of letting the backlog grow unbounded.
+    """
+    global _password_pool, _password_pending
+    if _password_pending >= PASSWORD_HASH_MAX_PENDING:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Server is busy, please retry",
+            headers={"Retry-After": "1"},
+        )
+    if _password_pool is None:
+        _password_pool = ThreadPoolExecutor(
+            max_workers=PASSWORD_HASH_WORKERS,
+            thread_name_prefix="password-hash"
+        )
+
+    _password_pending += 1
+    try:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(_password_pool, func, *args)
+    finally:
+        _password_pending -= 1
+
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    """Verify a password against its hash on the password hashing pool"""
+    return await _run_in_password_pool(verify_password, plain_password, hashed_password)
+
+async def get_password_hash_async(password: str) -> str:
+    """Hash a password on the password hashing pool"""
+    return await _run_in_password_pool(get_password_hash, password)
+
+def shutdown_password_pool():
+    """Stop the password hashing pool"""
+    global _password_pool
+    if _password_pool is not None:
+        _password_pool.shutdown(wait=False)
+        _password_pool = None
+
 async def authenticate_user(email: str, password: str, organization_id: str):
     """Authenticate user with email, password and organization"""
     try:
-        user = await User.find_one({"email": email, "organization_id": organization_id})
+        user = await storage.users.find_by_email(email, organization_id)
         if not user:
             return False
-        if not verify_password(password, user.password):
+        if not await verify_password_async(password, user.password):
             return False
         return user
+    except HTTPException:
+        raise
     except Exception as e:
         print(f"Authentication error: {e}")
         return False
 
+def get_keyring() -> Optional[KeyRing]:
+    """Key ring for asymmetric algorithms; None when signing with the shared secret.
+
+    Also run at startup, so a missing or ambiguous key directory stops the
+    worker instead of failing every token.
+    """
+    global _keyring
+    if ALGORITHM not in ASYMMETRIC_ALGORITHMS:
+        return None
+    if _keyring is None:
+        if not JWT_KEYS_DIR:
+            # A per-process key would make every worker reject the others'
+            # tokens, and every restart invalidate them all
+            raise ValueError(f"JWT_KEYS_DIR must be set to sign {ALGORITHM} tokens")
+        _keyring = KeyRing.from_directory(ALGORITHM, JWT_KEYS_DIR, JWT_ACTIVE_KID)
+    return _keyring
+
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
     """Create JWT access token"""
     to_encode = data.copy()
@@ -64,30 +157,146 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
     else:
         expire = datetime.utcnow() + timedelta(minutes=15)
     to_encode.update({"exp": expire})
+    # Unique token id so a single token can be revoked before it expires
+    to_encode.setdefault("jti", uuid.uuid4().hex)
+    keyring = get_keyring()
+    if keyring is not None:
+        return jwt.encode(
+            to_encode, keyring.signing_key, algorithm=ALGORITHM,
+            headers={"kid": keyring.active_kid}
+        )
     encoded_jwt = jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
     return encoded_jwt
 
-async def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(security)):
-    """Get current user from JWT token"""
-    credentials_exception = HTTPException(
-        status_code=status.HTTP_401_UNAUTHORIZED,
-        detail="Could not validate credentials",
-        headers={"WWW-Authenticate": "Bearer"},
-    )
+def build_token_claims(user: User) -> dict:
+    """Claims for a user's access token; stateless mode adds role and version"""
+    claims = {"sub": str(user.id), "org_id": user.organization_id}
+    if STATELESS_AUTH:
+        claims.update({
+            "role": user.role,
+            "active": user.is_active,
+            "ver": user.token_version,
+        })
+    return claims
+
+async def refresh_token_claims(user_id: str, org_id: str) -> Optional[dict]:
+    """Claims for a token renewed from a session; None if the user may not renew"""
+    if not STATELESS_AUTH:
+        return {"sub": str(user_id), "org_id": org_id}
+    # Role claims must reflect the user as they are now, not at login
+    user = await storage.users.get(user_id)
+    if user is None or not user.is_active or user.organization_id != org_id:
+        return None
+    return build_token_claims(user)
+
+def decode_access_token(token: str) -> dict:
+    """Verify a JWT and return its claims; raises JWTError when invalid"""
+    keyring = get_keyring()
+    if keyring is None:
+        return jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+    key = keyring.verification_key(jwt.get_unverified_header(token).get("kid"))
+    if key is None:
+        raise JWTError("Unknown signing key")
+    return jwt.decode(token, key, algorithms=[ALGORITHM])
+
+credentials_exception = HTTPException(
+    status_code=status.HTTP_401_UNAUTHORIZED,
+    detail="Could not validate credentials",
+    headers={"WWW-Authenticate": "Bearer"},
+)
+
+async def get_token_claims(
+    request: Request,
+    credentials: HTTPAuthorizationCredentials = Depends(security)
+) -> dict:
+    """Verified, unrevoked claims of the bearer token"""
     try:
-        payload = jwt.decode(credentials.credentials, SECRET_KEY, algorithms=[ALGORITHM])
-        user_id: str = payload.get("sub")
-        org_id: str = payload.get("org_id")
-        if user_id is None or org_id is None:
-            raise credentials_exception
-        token_data = TokenData(user_id=user_id, org_id=org_id)
+        # Reuse the claims the rate limiting middleware already verified
+        decoded = getattr(request.state, "token_claims", None)
+        if decoded is not None and decoded[0] == credentials.credentials:
+            payload = decoded[1]
+        else:
+            payload = decode_access_token(credentials.credentials)
     except JWTError:
         raise credentials_exception
+    if payload.get("sub") is None or payload.get("org_id") is None:
+        raise credentials_exception
     
-    user = await User.get(token_data.user_id)
+    if await revocation_list.is_revoked(payload.get("jti")):
+        raise credentials_exception
+    return payload
+
+async def get_current_user(payload: dict = Depends(get_token_claims)):
+    """Get current user from JWT token"""
+    token_data = TokenData(user_id=payload["sub"], org_id=payload["org_id"])
+    
+    user = principal_cache.get(token_data.user_id)
+    if user is None:
+        user = await storage.users.get(token_data.user_id)
+        if user is not None:
+            principal_cache.set(token_data.user_id, user)
     if user is None or user.organization_id != token_data.org_id:
         raise credentials_exception
-    return user
+    # Hand out a copy so handlers mutating the user never touch the cached entry
+    return user.model_copy()
+
+async def get_user_token_version(user_id: str) -> Optional[UserTokenVersionView]:
+    """Current token version of a user, cached briefly; None if the user is gone"""
+    view = user_version_cache.get(user_id)
+    if view is None:
+        view = await storage.users.get_token_version(user_id)
+        if view is not None:
+            user_version_cache.set(user_id, view)
+    return view
+
+async def get_current_principal(
+    request: Request,
+    credentials: HTTPAuthorizationCredentials = Depends(security)
+) -> Principal:
+    """Authorize from token claims in stateless mode, else load the user.
+
+    A claims-only principal is accepted while the token's version matches
+    the user's current ``token_version``. That check hits a short-lived cache
+    and does not load the user document. Claims are ignored unless
+    ``STATELESS_AUTH`` is on, so turning it off takes effect for tokens
+    issued while it was on.
+    """
+    payload = await get_token_claims(request, credentials)
+    if not STATELESS_AUTH or "role" not in payload or "ver" not in payload:
+        user = await get_current_user(payload)
+        if not user.is_active:
+            raise HTTPException(status_code=400, detail="Inactive user")
+        return Principal.model_validate(user)
+    
+    current = await get_user_token_version(payload["sub"])
+    if current is None or current.token_version != payload["ver"]:
+        raise credentials_exception
+    if not payload.get("active", True) or not current.is_active:
+        raise HTTPException(status_code=400, detail="Inactive user")
+    return Principal(
+        id=payload["sub"],
+        organization_id=payload["org_id"],
+        role=payload["role"],
+        is_active=True
+    )
+
+async def revoke_access_token(token: str) -> bool:
+    """Revoke a still valid access token until it would have expired"""
+    try:
+        payload = decode_access_token(token)
+    except JWTError:
+        return False
+    if not payload.get("jti") or not payload.get("exp"):
+        return False
+    await revocation_list.revoke(
+        payload["jti"], payload.get("sub", ""), datetime.utcfromtimestamp(payload["exp"])
+    )
+    return True
+
+def invalidate_principal(user_id: str):
+    """Drop a user from the principal caches after it has been modified"""
+    principal_cache.invalidate(str(user_id))
+    user_version_cache.invalidate(str(user_id))
 
 async def get_current_active_user(current_user: User = Depends(get_current_user)):
     """Get current active user"""
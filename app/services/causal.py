@@ -0,0 +1,92 @@
+import base64
+import hashlib
+import hmac
+from contextlib import asynccontextmanager
+from typing import Optional
+
+import bson
+from fastapi import Header, HTTPException
+
+from app.database.settings import SECONDARY_READS
+from app.models.note import Note
+from app.services.auth import SECRET_KEY
+
+CAUSAL_TOKEN_HEADER = "X-Causal-Token"
+
+
+def _sign(payload: bytes) -> str:
+    digest = hmac.new(SECRET_KEY.encode(), payload, hashlib.sha256).digest()[:16]
+    return base64.urlsafe_b64encode(digest).decode().rstrip("=")
+
+
+def _b64decode(value: str) -> bytes:
+    return base64.urlsafe_b64decode(value + "=" * (-len(value) % 4))
+
+
+def encode_causal_token(session) -> Optional[str]:
+    """Operation and cluster time a session reached, signed so clients cannot forge it"""
+    if session is None or session.operation_time is None:
+        return None
+    times = {"operationTime": session.operation_time}
+    if session.cluster_time is not None:
+        times["clusterTime"] = session.cluster_time
+    payload = bson.encode(times)
+    return f"{base64.urlsafe_b64encode(payload).decode().rstrip('=')}.{_sign(payload)}"
+
+
+def decode_causal_token(token: str) -> dict:
+    """Times carried by a causal token; raises ValueError if it was tampered with"""
+    encoded, _, signature = token.partition(".")
+    try:
+        payload = _b64decode(encoded)
+    except Exception:
+        raise ValueError("Invalid causal token")
+    if not hmac.compare_digest(signature, _sign(payload)):
+        raise ValueError("Invalid causal token")
+    return bson.decode(payload)
+
+
+async def start_session():
+    motor_client = Note.get_motor_collection().database.client
+    return await motor_client.start_session(causal_consistency=True)
+
+
+@asynccontextmanager
+async def causal_session(times: Optional[dict] = None):
+    """Causally consistent session, or None when secondary reads are off.
+
+    ``times`` from an earlier write's causal token make reads in the
+    session wait until the node they are sent to has replicated it.
+    """
+    if not SECONDARY_READS:
+        yield None
+        return
+    async with await start_session() as session:
+        if times:
+            if "clusterTime" in times:
+                session.advance_cluster_time(times["clusterTime"])
+            session.advance_operation_time(times["operationTime"])
+        yield session
+
+
+async def read_session(x_causal_token: Optional[str] = Header(None)):
+    """Dependency: session for note reads honouring the client's causal token"""
+    times = None
+    if SECONDARY_READS and x_causal_token:
+        try:
+            times = decode_causal_token(x_causal_token)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+    async with causal_session(times) as session:
+        yield session
+
+
+async def write_session():
+    """Dependency: session for note writes, whose causal token is returned to the client"""
+    async with causal_session() as session:
+        yield session
+
+
+def causal_headers(session) -> dict:
+    token = encode_causal_token(session)
+    return {CAUSAL_TOKEN_HEADER: token} if token else {}
@@ -0,0 +1,21 @@
+import hashlib
+from typing import Optional
+
+def make_etag(*parts) -> str:
+    """Build a strong ETag from the values that identify a representation"""
+    digest = hashlib.sha256("|".join(str(part) for part in parts).encode()).hexdigest()
+    return f'"{digest[:32]}"'
+
+def etag_matches(header: Optional[str], etag: str) -> bool:
+    """Check an If-None-Match / If-Match header value against an ETag"""
+    if not header:
+        return False
+    for candidate in header.split(","):
+        candidate = candidate.strip()
+        if candidate == "*":
+            return True
+        if candidate.startswith("W/"):
+            candidate = candidate[2:]
+        if candidate == etag:
+            return True
+    return False
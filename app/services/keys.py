@@ -0,0 +1,90 @@
+import json
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from jose import jwk
+from jose.backends.base import Key
+
+from app.services.etag import make_etag
+
+ASYMMETRIC_ALGORITHMS = ("RS256", "RS384", "RS512", "ES256", "ES384", "ES512")
+
+
+class KeyRing:
+    """Signing key plus every key still accepted for verification.
+
+    Keys are PEM files named ``<kid>.pem`` in a directory. Private keys can
+    sign; public-only files are kept so tokens signed by a retired key keep
+    verifying until they expire. Rotation is: add the new private key, make
+    it active, and later delete the old file once its tokens have expired.
+
+    File names carry no ordering, so the active kid must be given whenever
+    more than one private key is present.
+    """
+
+    def __init__(self, algorithm: str, keys: Dict[str, Key], active_kid: str):
+        if active_kid not in keys:
+            raise ValueError(f"Active key {active_kid!r} is not in the key ring")
+        self.algorithm = algorithm
+        self.active_kid = active_kid
+        self._signing_key = keys[active_kid]
+        # Verify with public halves only; some backends reject private keys here
+        self._public_keys = {
+            kid: key if key.is_public() else key.public_key() for kid, key in keys.items()
+        }
+        # The JWKS document only changes when keys are reloaded, so render it once
+        self.jwks_body = json.dumps(self.jwks()).encode()
+        self.jwks_etag = make_etag(self.jwks_body.decode())
+
+    @classmethod
+    def from_directory(cls, algorithm: str, directory: str, active_kid: Optional[str] = None) -> "KeyRing":
+        keys = {}
+        private_kids: List[str] = []
+        for path in sorted(Path(directory).glob("*.pem")):
+            kid = path.name[:-len(".pem")]
+            pem = path.read_text()
+            keys[kid] = jwk.construct(pem, algorithm)
+            if "PRIVATE KEY" in pem:
+                private_kids.append(kid)
+        if not private_kids:
+            raise ValueError(f"No private signing key found in {directory}")
+        if active_kid is None:
+            if len(private_kids) > 1:
+                raise ValueError(
+                    f"Several private keys in {directory}; set JWT_ACTIVE_KID to one of {private_kids}"
+                )
+            active_kid = private_kids[0]
+        return cls(algorithm, keys, active_kid)
+
+    @classmethod
+    def generate(cls, algorithm: str, kid: str = "ephemeral") -> "KeyRing":
+        """Single in-memory key pair, for tests only"""
+        from cryptography.hazmat.primitives import serialization
+        from cryptography.hazmat.primitives.asymmetric import ec, rsa
+
+        if algorithm.startswith("RS"):
+            private_key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+        else:
+            curve = {"ES256": ec.SECP256R1(), "ES384": ec.SECP384R1(), "ES512": ec.SECP521R1()}[algorithm]
+            private_key = ec.generate_private_key(curve)
+        pem = private_key.private_bytes(
+            serialization.Encoding.PEM,
+            serialization.PrivateFormat.PKCS8,
+            serialization.NoEncryption()
+        )
+        return cls(algorithm, {kid: jwk.construct(pem, algorithm)}, kid)
+
+    @property
+    def signing_key(self) -> Key:
+        return self._signing_key
+
+    def verification_key(self, kid: Optional[str]) -> Optional[Key]:
+        return self._public_keys.get(kid) if kid else None
+
+    def jwks(self) -> dict:
+        keys = []
+        for kid, key in self._public_keys.items():
+            public = key.to_dict()
+            public.update({"kid": kid, "use": "sig", "alg": self.algorithm})
+            keys.append(public)
+        return {"keys": keys}
@@ -0,0 +1,137 @@
+import hashlib
+import math
+import os
+import time
+from collections import OrderedDict
+from typing import Callable, Hashable
+
+# Login throttling configuration
+LOGIN_FAILURE_WINDOW_SECONDS = float(os.getenv("LOGIN_FAILURE_WINDOW_SECONDS", "900"))
+LOGIN_MAX_FAILURES_PER_ACCOUNT = int(os.getenv("LOGIN_MAX_FAILURES_PER_ACCOUNT", "5"))
+LOGIN_MAX_FAILURES_PER_IP = int(os.getenv("LOGIN_MAX_FAILURES_PER_IP", "50"))
+LOGIN_THROTTLE_MAX_KEYS = int(os.getenv("LOGIN_THROTTLE_MAX_KEYS", "100000"))
+
+
+class SlidingWindowCounter:
+    """Approximate sliding-window event counts per key.
+
+    Each key keeps only the start of its current fixed window and the
+    counts of that window and the previous one; the sliding estimate
+    weights the previous count by how much of it still overlaps. Keys are
+    held in LRU order and capped at ``maxsize`` so memory stays bounded
+    however many distinct keys an attacker cycles through.
+    """
+
+    def __init__(self, window: float, maxsize: int, clock: Callable[[], float] = time.monotonic):
+        self.window = window
+        self.maxsize = maxsize
+        self.clock = clock
+        self._entries: "OrderedDict[Hashable, list]" = OrderedDict()
+
+    def _current(self, key: Hashable, now: float):
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        window_start, previous, current = entry
+        elapsed_windows = int((now - window_start) // self.window)
+        if elapsed_windows >= 2:
+            del self._entries[key]
+            return None
+        if elapsed_windows == 1:
+            entry[:] = [window_start + self.window, current, 0]
+        return entry
+
+    def count(self, key: Hashable) -> float:
+        now = self.clock()
+        entry = self._current(key, now)
+        if entry is None:
+            return 0.0
+        window_start, previous, current = entry
+        overlap = 1 - (now - window_start) / self.window
+        return previous * overlap + current
+
+    def add(self, key: Hashable):
+        now = self.clock()
+        entry = self._current(key, now)
+        if entry is None:
+            self._entries[key] = [now, 0, 1]
+        else:
+            entry[2] += 1
+            self._entries.move_to_end(key)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+
+    def reset(self, key: Hashable):
+        self._entries.pop(key, None)
+
+    def retry_after(self, key: Hashable, limit: int) -> float:
+        """Seconds until the estimate for ``key`` drops back below ``limit``"""
+        now = self.clock()
+        entry = self._current(key, now)
+        if entry is None:
+            return 0.0
+        window_start, previous, current = entry
+        elapsed = now - window_start
+        if current >= limit:
+            # Wait out this window, then for its count to decay as the previous one
+            return (self.window - elapsed) + self.window * (1 - limit / current)
+        if previous and previous * (1 - elapsed / self.window) + current >= limit:
+            return self.window * (1 - (limit - current) / previous) - elapsed
+        return 0.0
+
+    def clear(self):
+        self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+class LoginThrottle:
+    """Failed login tracking per account and per source address.
+
+    Everything lives in process memory, so recording an attempt never
+    touches MongoDB. Account keys are stored as short digests of the org
+    and email rather than the raw strings.
+    """
+
+    def __init__(
+        self,
+        window: float = LOGIN_FAILURE_WINDOW_SECONDS,
+        max_per_account: int = LOGIN_MAX_FAILURES_PER_ACCOUNT,
+        max_per_ip: int = LOGIN_MAX_FAILURES_PER_IP,
+        maxsize: int = LOGIN_THROTTLE_MAX_KEYS,
+        clock: Callable[[], float] = time.monotonic
+    ):
+        self.max_per_account = max_per_account
+        self.max_per_ip = max_per_ip
+        self.accounts = SlidingWindowCounter(window, maxsize, clock)
+        self.addresses = SlidingWindowCounter(window, maxsize, clock)
+
+    @staticmethod
+    def _account_key(org_id: str, email: str) -> bytes:
+        value = f"{org_id}:{email.strip().lower()}".encode()
+        return hashlib.blake2b(value, digest_size=12).digest()
+
+    def check(self, org_id: str, email: str, ip: str) -> float:
+        """Return 0 if a login attempt may proceed, else seconds to wait"""
+        account = self._account_key(org_id, email)
+        wait = 0.0
+        if self.accounts.count(account) >= self.max_per_account:
+            wait = self.accounts.retry_after(account, self.max_per_account)
+        if self.addresses.count(ip) >= self.max_per_ip:
+            wait = max(wait, self.addresses.retry_after(ip, self.max_per_ip))
+        return math.ceil(wait) if wait > 0 else 0.0
+
+    def record_failure(self, org_id: str, email: str, ip: str):
+        self.accounts.add(self._account_key(org_id, email))
+        self.addresses.add(ip)
+
+    def record_success(self, org_id: str, email: str):
+        self.accounts.reset(self._account_key(org_id, email))
+
+    def clear(self):
+        self.accounts.clear()
+        self.addresses.clear()
+
+
+login_throttle = LoginThrottle()
@@ -1,54 +1,427 @@
-from typing import List
-from app.models.note import Note
-from app.schemas.note import NoteCreate, NoteUpdate
+import asyncio
+import base64
+import html
+import re
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Tuple, Type
+from pydantic import BaseModel
+from beanie import PydanticObjectId
+from app.models.note import Note, NoteSearchView, NoteVersionView, NOTE_TOMBSTONE_TTL_DAYS
+from app.repositories import storage, NoteWrite
+from app.schemas.note import NoteCreate, NoteUpdate, NoteBatchOperation, NoteBatchResult
 from bson import ObjectId
 
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 200
+DEFAULT_SEARCH_PAGE_SIZE = 20
+MAX_SEARCH_OFFSET = 1000
+SEARCH_SNIPPET_LENGTH = 160
+DEFAULT_SYNC_PAGE_SIZE = 100
+SYNC_SETTLE_SECONDS = 2
+MIN_NOTE_ID = "0" * 24
+
+class SyncTokenExpired(Exception):
+    """The sync token predates retained tombstones; the client must resync fully"""
+
+def encode_cursor(position) -> str:
+    """Encode a pagination position as an opaque cursor"""
+    return base64.urlsafe_b64encode(str(position).encode()).decode().rstrip("=")
+
+def decode_cursor(cursor: str) -> str:
+    """Decode an opaque cursor back into the position it was built from"""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        return base64.urlsafe_b64decode(padded.encode()).decode()
+    except Exception:
+        raise ValueError("Invalid cursor")
+
+def decode_id_cursor(cursor: str) -> ObjectId:
+    """Decode a keyset cursor into the note id it points past"""
+    try:
+        return ObjectId(decode_cursor(cursor))
+    except Exception:
+        raise ValueError("Invalid cursor")
+
+def decode_offset_cursor(cursor: str) -> int:
+    """Decode a search cursor into the number of hits already returned"""
+    try:
+        offset = int(decode_cursor(cursor))
+    except ValueError:
+        raise ValueError("Invalid cursor")
+    if offset < 0 or offset > MAX_SEARCH_OFFSET:
+        raise ValueError("Invalid cursor")
+    return offset
+
+def encode_time_cursor(changed_at: datetime, note_id) -> str:
+    """Encode a ``(timestamp, note id)`` position as an opaque cursor"""
+    millis = (changed_at - datetime(1970, 1, 1)) // timedelta(milliseconds=1)
+    return encode_cursor(f"{millis}:{note_id}")
+
+def decode_time_cursor(cursor: str) -> Tuple[datetime, str]:
+    """Decode a cursor built by ``encode_time_cursor``"""
+    try:
+        millis, note_id = decode_cursor(cursor).split(":", 1)
+        ObjectId(note_id)
+        return datetime(1970, 1, 1) + timedelta(milliseconds=int(millis)), note_id
+    except Exception:
+        raise ValueError("Invalid cursor")
+
+def build_snippet(text: str, query: str, length: int = SEARCH_SNIPPET_LENGTH) -> str:
+    """Cut a window of ``text`` around the first search term and mark every hit.
+
+    The text is HTML-escaped and matches are wrapped in ``<mark>`` tags.
+    Negated terms (``-word``) are not highlighted.
+    """
+    terms = [term for term in re.findall(r"-?\w+", query) if not term.startswith("-")]
+    if not terms:
+        return html.escape(text[:length])
+    pattern = re.compile(
+        "|".join(re.escape(term) for term in sorted(terms, key=len, reverse=True)),
+        re.IGNORECASE
+    )
+    
+    first = pattern.search(text)
+    start = max(0, first.start() - length // 3) if first else 0
+    window = text[start:start + length]
+    
+    parts = []
+    last = 0
+    for match in pattern.finditer(window):
+        parts.append(html.escape(window[last:match.start()]))
+        parts.append(f"<mark>{html.escape(match.group())}</mark>")
+        last = match.end()
+    parts.append(html.escape(window[last:]))
+    
+    snippet = "".join(parts)
+    if start > 0:
+        snippet = "…" + snippet
+    if start + length < len(text):
+        snippet += "…"
+    return snippet
+
+def note_etag(note) -> str:
+    """Strong ETag of a single note: its version number"""
+    return f'"{note.version}"'
+
+def parse_note_etags(header: Optional[str]) -> Optional[List[int]]:
+    """Versions listed in an If-Match header, or ``None`` when any version will do.
+
+    Unparseable entries are dropped, so a header naming no valid version
+    yields an empty list and can never match.
+    """
+    if not header or header.strip() == "*":
+        return None
+    versions = []
+    for candidate in header.split(","):
+        candidate = candidate.strip()
+        if candidate.startswith("W/"):
+            continue  # Weak ETags never match for If-Match
+        try:
+            versions.append(int(candidate.strip('"')))
+        except ValueError:
+            continue
+    return versions
+
 class NoteService:
     @staticmethod
-    async def create_note(note_data: NoteCreate, organization_id: str, user_id: str):
+    async def create_note(note_data: NoteCreate, organization_id: str, user_id: str, session=None):
         note_dict = note_data.dict()
         note_dict["organization_id"] = organization_id
         note_dict["created_by"] = user_id
         
-        note = Note(**note_dict)
-        return await note.insert()
+        note = await storage.notes.create(note_dict, session=session)
+        await NoteService.bump_listing_version(organization_id, session=session)
+        return note
     
     @staticmethod
-    async def get_note(note_id: str, organization_id: str):
-        
-        try:
-            obj_id = ObjectId(note_id)
-        except Exception:
-            return None
-        return await Note.find_one({"_id": obj_id, "organization_id": organization_id})
+    async def get_note(note_id: str, organization_id: str, session=None):
+        return await storage.notes.get(note_id, organization_id, session=session)
+    
+    @staticmethod
+    async def get_note_version(
+        note_id: str, organization_id: str, session=None
+    ) -> Optional[NoteVersionView]:
+        """Fetch only what is needed for a note's ETag, without its content"""
+        return await storage.notes.get(
+            note_id, organization_id, projection=NoteVersionView, session=session
+        )
+    
+    @staticmethod
+    async def get_listing_version(organization_id: str, session=None) -> int:
+        """Current note listing version of an organization"""
+        return await storage.notes.get_listing_version(organization_id, session=session)
     
     @staticmethod
-    async def get_organization_notes(organization_id: str) -> List[Note]:
-        return await Note.find({"organization_id": organization_id}).to_list()
+    async def bump_listing_version(organization_id: str, session=None):
+        """Invalidate listing ETags of an organization after a note write"""
+        await storage.notes.bump_listing_version(organization_id, session=session)
+    
+    @staticmethod
+    async def get_organization_notes(
+        organization_id: str,
+        limit: int = DEFAULT_PAGE_SIZE,
+        cursor: Optional[str] = None,
+        projection: Optional[Type[BaseModel]] = None,
+        sort: str = "id",
+        session=None
+    ) -> Tuple[List[Note], Optional[str]]:
+        """Return one page of notes and the cursor for the next page.
+
+        Pages are keyed on ``(organization_id, _id)``, or on
+        ``(organization_id, updated_at, _id)`` newest first when ``sort`` is
+        ``"updated_at"``, so every page is a bounded index range scan however
+        deep the client pages. Passing a ``projection`` model only fetches
+        the fields that model declares.
+        """
+        after = None
+        if cursor:
+            after = decode_time_cursor(cursor) if sort == "updated_at" else str(decode_id_cursor(cursor))
+
+        # Fetch one extra note to find out whether another page exists
+        notes = await storage.notes.list_page(
+            organization_id, limit + 1, after=after, sort=sort, projection=projection, session=session
+        )
+        next_cursor = None
+        if len(notes) > limit:
+            notes = notes[:limit]
+            last = notes[-1]
+            if sort == "updated_at":
+                next_cursor = encode_time_cursor(last.updated_at, last.id)
+            else:
+                next_cursor = encode_cursor(last.id)
+        return notes, next_cursor
     
     @staticmethod
-    async def update_note(note_id: str, note_data: NoteUpdate, organization_id: str):
+    async def search_notes(
+        organization_id: str,
+        text: str,
+        limit: int = DEFAULT_SEARCH_PAGE_SIZE,
+        cursor: Optional[str] = None,
+        session=None
+    ) -> Tuple[List[NoteSearchView], Optional[str]]:
+        """Full-text search within one organization, best matches first.
+
+        Relevance ordering cannot be keyset-paginated, so cursors carry an
+        offset capped at ``MAX_SEARCH_OFFSET``.
+        """
+        offset = decode_offset_cursor(cursor) if cursor else 0
+        hits = await storage.notes.search(
+            organization_id, text, offset, limit + 1, session=session
+        )
         
-        try:
-            obj_id = ObjectId(note_id)
-        except Exception:
-            return None
-        note = await Note.find_one({"_id": obj_id, "organization_id": organization_id})
-        if note:
-            update_data = note_data.dict(exclude_unset=True)
-            await note.set(update_data)
-            return note
-        return None
+        next_cursor = None
+        if len(hits) > limit:
+            hits = hits[:limit]
+            if offset + limit <= MAX_SEARCH_OFFSET:
+                next_cursor = encode_cursor(offset + limit)
+        return hits, next_cursor
     
     @staticmethod
-    async def delete_note(note_id: str, organization_id: str):
+    async def get_changes(
+        organization_id: str,
+        since: Optional[str] = None,
+        limit: int = DEFAULT_SYNC_PAGE_SIZE
+    ) -> Tuple[List[Note], List[str], Optional[str], bool]:
+        """Return notes changed and ids deleted after the ``since`` watermark.
+
+        Notes and tombstones are both read in ``(time, id)`` order from their
+        ``organization_id``-prefixed indexes and merged, so the cost of a poll
+        depends on how much changed rather than on the size of the tenant.
+        Changes from the last ``SYNC_SETTLE_SECONDS`` may be delivered twice.
+        Returns ``(updated, deleted_ids, next_token, has_more)``.
+        """
+        since_watermark = None
+        if since:
+            since_watermark = decode_time_cursor(since)
+            if since_watermark[0] < datetime.utcnow() - timedelta(days=NOTE_TOMBSTONE_TTL_DAYS):
+                raise SyncTokenExpired()
         
-        try:
-            obj_id = ObjectId(note_id)
-        except Exception:
+        notes, tombstones = await asyncio.gather(
+            storage.notes.changed_since(organization_id, since_watermark, limit + 1),
+            storage.notes.deleted_since(organization_id, since_watermark, limit + 1),
+        )
+        
+        changes = sorted(
+            [(note.updated_at, str(note.id), note) for note in notes]
+            + [(tombstone.deleted_at, tombstone.note_id, None) for tombstone in tombstones],
+            key=lambda change: (change[0], change[1])
+        )
+        has_more = len(changes) > limit
+        changes = changes[:limit]
+        
+        watermark = since_watermark
+        if changes:
+            watermark = changes[-1][:2]
+        if not has_more:
+            # Writes from the last few seconds may still be committing with
+            # earlier timestamps, so hold the token back and let the next poll
+            # repeat them. Clients apply changes idempotently.
+            settled = datetime.utcnow() - timedelta(seconds=SYNC_SETTLE_SECONDS)
+            settled = (settled.replace(microsecond=settled.microsecond // 1000 * 1000), MIN_NOTE_ID)
+            watermark = min(watermark, settled) if watermark else settled
+            if since_watermark:
+                watermark = max(watermark, since_watermark)
+        next_token = encode_time_cursor(*watermark)
+        
+        updated = [note for _, _, note in changes if note is not None]
+        deleted = [note_id for _, note_id, note in changes if note is None]
+        return updated, deleted, next_token, has_more
+    
+    @staticmethod
+    def stream_organization_notes(organization_id: str, after: Optional[str] = None):
+        """Iterate over every note of an organization in ``_id`` order.
+
+        Notes are fetched ``EXPORT_BATCH_SIZE`` at a time, so memory stays
+        flat however many notes the tenant has. ``after`` is the id of the
+        last note already received, for resuming an export.
+        """
+        return storage.notes.stream(organization_id, after=after)
+    
+    @staticmethod
+    async def update_note(
+        note_id: str,
+        note_data: NoteUpdate,
+        organization_id: str,
+        owner_id: Optional[str] = None,
+        expected_versions: Optional[List[int]] = None,
+        session=None
+    ):
+        """Update a note in a single atomic round trip.
+
+        When ``owner_id`` is given the note must also have been created by
+        that user, and when ``expected_versions`` is given it must still be
+        at one of those versions. A note that does not match the filter is
+        left untouched and ``None`` is returned.
+        """
+        update_data = note_data.model_dump(exclude_unset=True)
+        note = await storage.notes.update(
+            note_id, organization_id, update_data,
+            owner_id=owner_id, expected_versions=expected_versions, session=session
+        )
+        if note is not None and update_data:
+            await NoteService.bump_listing_version(organization_id, session=session)
+        return note
+    
+    @staticmethod
+    async def delete_note(
+        note_id: str,
+        organization_id: str,
+        owner_id: Optional[str] = None,
+        expected_versions: Optional[List[int]] = None,
+        session=None
+    ):
+        """Delete a note with a single conditional delete.
+
+        A tombstone is recorded afterwards so sync clients see the deletion.
+        """
+        deleted = await storage.notes.delete(
+            note_id, organization_id,
+            owner_id=owner_id, expected_versions=expected_versions, session=session
+        )
+        if not deleted:
             return False
-        note = await Note.find_one({"_id": obj_id, "organization_id": organization_id})
-        if note:
-            await note.delete()
-            return True
-        return False
\ No newline at end of file
+        await storage.notes.add_tombstones([note_id], organization_id, session=session)
+        await NoteService.bump_listing_version(organization_id, session=session)
+        return True
+    
+    @staticmethod
+    async def apply_batch(
+        operations: List[Tuple[int, NoteBatchOperation]],
+        organization_id: str,
+        user_id: str,
+        own_notes_only: bool,
+        session=None
+    ) -> List[NoteBatchResult]:
+        """Apply create/update/delete operations with one unordered bulk write.
+
+        ``operations`` pairs each operation with its index in the request so
+        results can be reported per item. Target notes are resolved with a
+        single lookup; when ``own_notes_only`` is set, updates and deletes
+        are limited to notes created by ``user_id``.
+        """
+        results: Dict[int, NoteBatchResult] = {}
+        
+        def result(index, operation, status, note_id=None, detail=None):
+            results[index] = NoteBatchResult(
+                index=index, op=operation.op, status=status, id=note_id, detail=detail
+            )
+        
+        target_ids = {}
+        for index, operation in operations:
+            if operation.op == "create":
+                continue
+            if ObjectId.is_valid(operation.id):
+                target_ids[index] = str(ObjectId(operation.id))
+            else:
+                result(index, operation, 404, operation.id, "Note not found")
+        
+        owners = {}
+        if target_ids:
+            owners = await storage.notes.owners(
+                list(set(target_ids.values())), organization_id, session=session
+            )
+        
+        writes: List[NoteWrite] = []
+        queued = []  # Request index of every write, by position in ``writes``
+        targeted = set()
+        for index, operation in operations:
+            if index in results:
+                continue
+            
+            if operation.op == "create":
+                if operation.title is None or operation.content is None:
+                    result(index, operation, 400, detail="title and content are required")
+                    continue
+                note_id = str(PydanticObjectId())
+                writes.append(NoteWrite("create", note_id, {
+                    "title": operation.title,
+                    "content": operation.content,
+                    "created_by": user_id,
+                }))
+                queued.append(index)
+                result(index, operation, 200, note_id)
+                continue
+            
+            note_id = target_ids[index]
+            if note_id in targeted:
+                # A second write could only miss or repeat the first one
+                result(index, operation, 400, operation.id, "Note appears more than once in the batch")
+                continue
+            targeted.add(note_id)
+            if note_id not in owners:
+                result(index, operation, 404, operation.id, "Note not found")
+                continue
+            if own_notes_only and owners[note_id] != user_id:
+                result(index, operation, 403, operation.id, f"Can only {operation.op} your own notes")
+                continue
+            
+            # Ownership stays part of the filter in case the note changed hands
+            # meanwhile; writes that then match nothing are reported by bulk_write
+            owner_id = user_id if own_notes_only else None
+            if operation.op == "update":
+                update_data = operation.model_dump(include={"title", "content"}, exclude_none=True)
+                if update_data:
+                    writes.append(NoteWrite("update", note_id, update_data, owner_id))
+                    queued.append(index)
+            else:
+                writes.append(NoteWrite("delete", note_id, owner_id=owner_id))
+                queued.append(index)
+            result(index, operation, 200, operation.id)
+        
+        if writes:
+            failures = await storage.notes.bulk_write(writes, organization_id, session=session)
+            for position, (status, detail) in failures.items():
+                index = queued[position]
+                results[index] = results[index].model_copy(update={"status": status, "detail": detail})
+        
+        deleted = [
+            results[index].id
+            for index, operation in operations
+            if operation.op == "delete" and results[index].status == 200
+        ]
+        if deleted:
+            await storage.notes.add_tombstones(deleted, organization_id, session=session)
+        if queued:
+            await NoteService.bump_listing_version(organization_id, session=session)
+        
+        return [results[index] for index in sorted(results)]
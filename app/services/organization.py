@@ -1,42 +1,109 @@
-from app.models.organization import Organization
+import os
+from typing import Optional
+from beanie import PydanticObjectId
+from app.models.organization import Organization, AdminSummary
 from app.models.user import User
 from app.schemas.organization import OrganizationCreate
-from app.services.auth import get_password_hash
-from bson import ObjectId
+from app.services.auth import get_password_hash_async
+from app.services.cache import TTLCache
+from app.repositories import storage
+
+# Per-process organization cache
+ORG_CACHE_SIZE = int(os.getenv("ORG_CACHE_SIZE", "10000"))
+ORG_CACHE_TTL_SECONDS = float(os.getenv("ORG_CACHE_TTL_SECONDS", "60"))
+
+organization_cache = TTLCache(maxsize=ORG_CACHE_SIZE, ttl=ORG_CACHE_TTL_SECONDS)
+
+def admin_summary(user: User) -> AdminSummary:
+    return AdminSummary(id=str(user.id), email=user.email, name=user.name, role=user.role)
+
+def invalidate_organization(org_id: str):
+    """Drop an organization from the cache after it has been modified"""
+    organization_cache.invalidate(str(org_id))
 
 class OrganizationService:
     @staticmethod
     async def create_organization_with_admin(organization_data: OrganizationCreate):
-        try:
-            # Create organization first
-            organization = Organization(
-                name=organization_data.name,
-                description=organization_data.description
-            )
-            await organization.insert()
-            
-            # Create admin user for this organization
-            admin_user = User(
-                email=organization_data.admin_email,
-                password=get_password_hash(organization_data.admin_password),
-                name=organization_data.admin_name,
-                role="admin",
-                organization_id=str(organization.id)
-            )
-            await admin_user.insert()
-            
-            return organization, admin_user
-        except Exception as e:
-            # Clean up organization if user creation fails
-            if 'organization' in locals():
-                await organization.delete()
-            raise e
+        # Hash up front so a saturated hashing pool rejects before any writes
+        admin_password = await get_password_hash_async(organization_data.admin_password)
+        
+        # Ids are assigned up front so the org can embed its admin summary
+        organization_id = str(PydanticObjectId())
+        admin = {
+            "id": str(PydanticObjectId()),
+            "email": organization_data.admin_email,
+            "password": admin_password,
+            "name": organization_data.admin_name,
+            "role": "admin",
+            "organization_id": organization_id,
+        }
+        
+        organization = {
+            "id": organization_id,
+            "name": organization_data.name,
+            "description": organization_data.description,
+            "admin_user": AdminSummary(
+                id=admin["id"], email=admin["email"], name=admin["name"], role=admin["role"]
+            ),
+        }
+        
+        # Both are written or neither is
+        return await storage.organizations.create_with_admin(organization, admin)
     
     @staticmethod
     async def get_organization(org_id: str):
+        """Organization by id, served from the per-process cache when possible"""
+        organization = organization_cache.get(org_id)
+        if organization is None:
+            organization = await storage.organizations.get(org_id)
+            if organization is None:
+                return None
+            organization_cache.set(org_id, organization)
+        # Hand out a copy so callers mutating it never touch the cached entry
+        return organization.model_copy()
+    
+    @staticmethod
+    async def get_admin_summary(organization: Organization) -> Optional[AdminSummary]:
+        """Admin summary of an organization, backfilled for older documents"""
+        if organization.admin_user is None:
+            admin = await storage.users.find_admin(str(organization.id))
+            if admin is not None:
+                await OrganizationService.set_admin_summary(str(organization.id), admin_summary(admin))
+                return admin_summary(admin)
+        return organization.admin_user
+    
+    @staticmethod
+    async def set_admin_summary(org_id: str, summary: Optional[AdminSummary]):
+        await storage.organizations.set_admin_summary(org_id, summary)
+        invalidate_organization(org_id)
+    
+    @staticmethod
+    async def sync_admin_summary(user: User, removed: bool = False):
+        """Keep the organization's admin summary right after a user's role changes.
+
+        Only touches the organization when ``user`` is or was its summarized
+        admin, or when it has none and ``user`` is now an admin.
+        """
+        org_id = user.organization_id
+        # Decide against the stored summary: another worker's cached copy may
+        # still name an admin that has since been demoted or deleted
+        organization = await storage.organizations.get(org_id)
+        if organization is None:
+            return
+        current = organization.admin_user
+        is_admin = user.role == "admin" and not removed
         
-        try:
-            obj_id = ObjectId(org_id)
-        except Exception:
-            return None
-        return await Organization.get(obj_id)
\ No newline at end of file
+        if current is None:
+            if is_admin:
+                await OrganizationService.set_admin_summary(org_id, admin_summary(user))
+            return
+        if current.id != str(user.id):
+            return
+        if is_admin:
+            summary = admin_summary(user)
+        else:
+            # The summarized admin is gone; fall back to any remaining admin
+            replacement = await storage.users.find_admin(org_id, exclude_id=str(user.id))
+            summary = admin_summary(replacement) if replacement else None
+        if summary != current:
+            await OrganizationService.set_admin_summary(org_id, summary)
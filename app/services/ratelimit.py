@@ -0,0 +1,246 @@
+import math
+import os
+import time
+from collections import OrderedDict
+from itertools import islice
+from datetime import datetime, timedelta
+from typing import Dict, NamedTuple, Optional, Tuple
+from pymongo import ReturnDocument
+
+# Rate limit configuration, per route class as "<requests>/<seconds>"
+RATE_LIMIT_ENABLED = os.getenv("RATE_LIMIT_ENABLED", "true").lower() in ("1", "true", "yes")
+RATE_LIMIT_BACKEND = os.getenv("RATE_LIMIT_BACKEND", "memory")
+RATE_LIMIT_TENANT_FACTOR = float(os.getenv("RATE_LIMIT_TENANT_FACTOR", "10"))
+RATE_LIMIT_MAX_KEYS = int(os.getenv("RATE_LIMIT_MAX_KEYS", "100000"))
+
+DEFAULT_ROUTE_LIMITS = {
+    "read": "600/60",
+    "write": "120/60",
+    "bulk": "30/60",
+    "auth": "30/60",
+}
+
+
+class RateLimit(NamedTuple):
+    rate: float  # tokens refilled per second
+    burst: float  # bucket capacity
+
+    def scaled(self, factor: float) -> "RateLimit":
+        return RateLimit(self.rate * factor, self.burst * factor)
+
+    @property
+    def idle_seconds(self) -> float:
+        """Time after which an untouched bucket is full again and can be forgotten"""
+        return self.burst / self.rate
+
+
+def parse_limit(value: str) -> Optional[RateLimit]:
+    """Parse ``"<requests>/<seconds>"``; ``"off"`` or ``"0"`` disables the limit"""
+    value = value.strip().lower()
+    if value in ("", "0", "off", "none"):
+        return None
+    requests, _, seconds = value.partition("/")
+    requests, seconds = float(requests), float(seconds or 1)
+    if requests <= 0 or seconds <= 0:
+        raise ValueError(f"Invalid rate limit: {value!r}")
+    return RateLimit(rate=requests / seconds, burst=requests)
+
+
+def load_route_limits() -> Dict[str, Optional[RateLimit]]:
+    return {
+        route_class: parse_limit(os.getenv(f"RATE_LIMIT_{route_class.upper()}", default))
+        for route_class, default in DEFAULT_ROUTE_LIMITS.items()
+    }
+
+
+UNLIMITED_PATHS = frozenset({
+    "/", "/health", "/health/mongo", "/docs", "/redoc", "/openapi.json", "/scalar",
+    "/.well-known/jwks.json",
+})
+
+
+def classify_route(method: str, path: str) -> Optional[str]:
+    """Map a request to its rate limit class, or None for unlimited routes"""
+    if path in UNLIMITED_PATHS:
+        return None
+    if path.startswith(("/auth/login", "/auth/refresh")) or (method == "POST" and path.rstrip("/") == "/organizations"):
+        return "auth"
+    if path.startswith(("/notes/export", "/notes/batch", "/notes/search")):
+        return "bulk"
+    if method in ("GET", "HEAD", "OPTIONS"):
+        return "read"
+    return "write"
+
+
+class MemoryBucketStore:
+    """In-process token buckets.
+
+    Each active key holds just its token count, last refill time and the
+    time it will be full again. Only full buckets are ever dropped, since
+    recreating one is indistinguishable from keeping it; dropping a drained
+    bucket would hand its key a fresh burst. Keys are kept in LRU order so
+    full buckets are usually found at the front in O(1) per request.
+
+    ``max_keys`` is a soft bound: past it, up to ``eviction_scan`` of the
+    least recently used buckets are checked for full ones. Buckets that are
+    not yet full were all used within the longest limit window, so the map
+    cannot outgrow the keys active in that window.
+    """
+
+    eviction_scan = 32
+
+    def __init__(self, max_keys: int = RATE_LIMIT_MAX_KEYS):
+        self.max_keys = max_keys
+        self._buckets: "OrderedDict[str, list]" = OrderedDict()
+
+    async def take(self, key: str, limit: RateLimit) -> Tuple[bool, float]:
+        now = time.monotonic()
+        self._evict_idle(now)
+
+        bucket = self._buckets.get(key)
+        if bucket is None:
+            tokens = limit.burst
+        else:
+            tokens = min(limit.burst, bucket[0] + (now - bucket[1]) * limit.rate)
+            self._buckets.move_to_end(key)
+
+        allowed = tokens >= 1
+        if allowed:
+            tokens -= 1
+        # Entries hold the time they are full again so eviction needs no limit lookup
+        self._buckets[key] = [tokens, now, now + (limit.burst - tokens) / limit.rate]
+        if len(self._buckets) > self.max_keys:
+            self._evict_full(now)
+        return allowed, 0.0 if allowed else (1 - tokens) / limit.rate
+
+    def _evict_idle(self, now: float, budget: int = 2):
+        # A couple of evictions per call keeps the map bounded without scans
+        for _ in range(budget):
+            if not self._buckets:
+                return
+            key, bucket = next(iter(self._buckets.items()))
+            if bucket[2] > now:
+                return
+            del self._buckets[key]
+
+    def _evict_full(self, now: float):
+        full = [
+            key for key, bucket in islice(self._buckets.items(), self.eviction_scan)
+            if bucket[2] <= now
+        ]
+        for key in full[:len(self._buckets) - self.max_keys]:
+            del self._buckets[key]
+
+    def reset(self):
+        self._buckets.clear()
+
+    def __len__(self) -> int:
+        return len(self._buckets)
+
+
+class MongoBucketStore:
+    """Token buckets shared by all workers through a MongoDB collection.
+
+    Each check is a single atomic pipeline update; a TTL index removes
+    buckets once they have been idle long enough to be full again.
+    """
+
+    collection_name = "rate_limit_buckets"
+
+    def __init__(self):
+        self._indexed = False
+
+    def _collection(self):
+        from app.database import mongodb
+        database_name = os.getenv("MONGO_DB", "notes_api")
+        return mongodb.client[database_name][self.collection_name]
+
+    async def take(self, key: str, limit: RateLimit) -> Tuple[bool, float]:
+        collection = self._collection()
+        if not self._indexed:
+            await collection.create_index("expires_at", expireAfterSeconds=0)
+            self._indexed = True
+
+        now = datetime.utcnow()
+        refilled = {
+            "$min": [
+                limit.burst,
+                {
+                    "$add": [
+                        {"$ifNull": ["$tokens", limit.burst]},
+                        {
+                            "$multiply": [
+                                {"$divide": [{"$subtract": [now, {"$ifNull": ["$updated_at", now]}]}, 1000]},
+                                limit.rate
+                            ]
+                        }
+                    ]
+                }
+            ]
+        }
+        bucket = await collection.find_one_and_update(
+            {"_id": key},
+            [
+                {"$set": {"tokens": refilled, "updated_at": now}},
+                {
+                    "$set": {
+                        "allowed": {"$gte": ["$tokens", 1]},
+                        "tokens": {
+                            "$cond": [{"$gte": ["$tokens", 1]}, {"$subtract": ["$tokens", 1]}, "$tokens"]
+                        },
+                        "expires_at": now + timedelta(seconds=limit.idle_seconds),
+                    }
+                },
+            ],
+            upsert=True,
+            return_document=ReturnDocument.AFTER,
+        )
+        if bucket["allowed"]:
+            return True, 0.0
+        return False, (1 - bucket["tokens"]) / limit.rate
+
+    def reset(self):
+        pass
+
+
+class RateLimiter:
+    """Per-user and per-tenant token bucket limits for each route class"""
+
+    def __init__(self, store=None, limits: Optional[Dict[str, Optional[RateLimit]]] = None,
+                 tenant_factor: float = RATE_LIMIT_TENANT_FACTOR):
+        if store is None:
+            store = MongoBucketStore() if RATE_LIMIT_BACKEND == "mongo" else MemoryBucketStore()
+        self.store = store
+        self.limits = limits if limits is not None else load_route_limits()
+        self.tenant_factor = tenant_factor
+
+    async def check(self, route_class: str, principal: str, org_id: Optional[str] = None) -> float:
+        """Consume one request; returns 0 if allowed, else seconds to wait"""
+        limit = self.limits.get(route_class)
+        if limit is None:
+            return 0.0
+
+        allowed, retry_after = await self.store.take(f"{principal}:{route_class}", limit)
+        if not allowed:
+            return retry_after
+
+        # The tenant bucket caps a whole organization across all of its users.
+        # It is only charged for requests the user's own bucket allowed, so one
+        # user retrying past their limit cannot drain it for everyone else
+        if org_id is not None and self.tenant_factor > 0:
+            allowed, retry_after = await self.store.take(
+                f"org:{org_id}:{route_class}", limit.scaled(self.tenant_factor)
+            )
+            if not allowed:
+                return retry_after
+        return 0.0
+
+    def reset(self):
+        self.store.reset()
+
+
+def retry_after_header(seconds: float) -> str:
+    return str(max(1, math.ceil(seconds)))
+
+
+rate_limiter = RateLimiter()
@@ -0,0 +1,137 @@
+import hashlib
+import math
+import os
+import time
+from datetime import datetime, timedelta
+from typing import Optional
+
+from app.repositories import storage
+
+# Revocation filter configuration
+REVOCATION_FILTER_CAPACITY = int(os.getenv("REVOCATION_FILTER_CAPACITY", "100000"))
+REVOCATION_FILTER_ERROR_RATE = float(os.getenv("REVOCATION_FILTER_ERROR_RATE", "0.001"))
+REVOCATION_REFRESH_SECONDS = float(os.getenv("REVOCATION_REFRESH_SECONDS", "5"))
+# Re-read this far behind the watermark so late-committed revocations are not missed
+REVOCATION_SETTLE_SECONDS = 2
+
+
+class BloomFilter:
+    """Fixed-size Bloom filter over strings.
+
+    Sized for ``capacity`` items at ``error_rate`` false positives; bit
+    positions come from double hashing a single blake2b digest.
+    """
+
+    def __init__(self, capacity: int, error_rate: float):
+        self.capacity = capacity
+        self.size = max(8, int(-capacity * math.log(error_rate) / (math.log(2) ** 2)))
+        self.hashes = max(1, round(self.size / capacity * math.log(2)))
+        self.count = 0
+        self._bits = bytearray((self.size + 7) // 8)
+
+    def _positions(self, item: str):
+        digest = hashlib.blake2b(item.encode(), digest_size=16).digest()
+        first = int.from_bytes(digest[:8], "little")
+        second = int.from_bytes(digest[8:], "little") | 1
+        for i in range(self.hashes):
+            yield (first + i * second) % self.size
+
+    def add(self, item: str) -> bool:
+        """Set the bits of ``item``; True if any were unset before.
+
+        Only items the filter has not seen count towards ``capacity``, so
+        adding the same id twice does not fill it up.
+        """
+        added = False
+        for position in self._positions(item):
+            mask = 1 << (position & 7)
+            if not self._bits[position >> 3] & mask:
+                self._bits[position >> 3] |= mask
+                added = True
+        if added:
+            self.count += 1
+        return added
+
+    def __contains__(self, item: str) -> bool:
+        return all(self._bits[position >> 3] & (1 << (position & 7)) for position in self._positions(item))
+
+
+class RevocationList:
+    """Revoked token ids, checked in memory on every request.
+
+    The Bloom filter answers "not revoked" without any I/O. A filter hit
+    is confirmed against the stored revocations. New revocations
+    from other workers are pulled in incrementally every
+    ``REVOCATION_REFRESH_SECONDS``.
+    """
+
+    def __init__(
+        self,
+        capacity: int = REVOCATION_FILTER_CAPACITY,
+        error_rate: float = REVOCATION_FILTER_ERROR_RATE,
+        refresh_seconds: float = REVOCATION_REFRESH_SECONDS
+    ):
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self.refresh_seconds = refresh_seconds
+        self.reset()
+
+    def reset(self):
+        self._filter = BloomFilter(self.capacity, self.error_rate)
+        self._watermark: Optional[datetime] = None
+        self._next_refresh = 0.0
+        # Filter being rebuilt while the current one keeps answering checks
+        self._rebuilding: Optional[BloomFilter] = None
+
+    async def refresh(self):
+        """Add revocations recorded since the last refresh to the filter"""
+        self._next_refresh = time.monotonic() + self.refresh_seconds
+        if self._filter.count >= self.capacity:
+            await self.rebuild()
+            return
+
+        since = None
+        if self._watermark is not None:
+            since = self._watermark - timedelta(seconds=REVOCATION_SETTLE_SECONDS)
+        async for entry in storage.revoked_tokens.revoked_since(since):
+            self._filter.add(entry.jti)
+            self._watermark = entry.revoked_at
+
+    async def rebuild(self):
+        """Reload every stored revocation into a fresh filter.
+
+        Expired entries have been dropped by the TTL index, so the new
+        filter has room again. The full filter keeps answering checks until
+        the new one is complete.
+        """
+        if self._rebuilding is not None:
+            return
+        rebuilt = self._rebuilding = BloomFilter(self.capacity, self.error_rate)
+        watermark = None
+        try:
+            async for entry in storage.revoked_tokens.revoked_since(None):
+                rebuilt.add(entry.jti)
+                watermark = entry.revoked_at
+        finally:
+            self._rebuilding = None
+        self._filter = rebuilt
+        self._watermark = watermark
+
+    async def is_revoked(self, jti: Optional[str]) -> bool:
+        if not jti:
+            return False
+        if time.monotonic() >= self._next_refresh:
+            await self.refresh()
+        if jti not in self._filter:
+            return False
+        return await storage.revoked_tokens.exists(jti)
+
+    async def revoke(self, jti: str, user_id: str, expires_at: datetime):
+        await storage.revoked_tokens.add(jti, user_id, expires_at)
+        self._filter.add(jti)
+        if self._rebuilding is not None:
+            # The rebuild may already have read past this revocation
+            self._rebuilding.add(jti)
+
+
+revocation_list = RevocationList()
@@ -0,0 +1,73 @@
+import hashlib
+import secrets
+from datetime import datetime, timedelta
+from typing import Optional, Tuple
+from beanie import PydanticObjectId
+
+from app.models.session import Session, REFRESH_TOKEN_EXPIRE_DAYS
+from app.repositories import storage
+
+def hash_refresh_token(secret: str) -> str:
+    return hashlib.sha256(secret.encode()).hexdigest()
+
+def split_refresh_token(refresh_token: str) -> Optional[Tuple[PydanticObjectId, str]]:
+    """Refresh tokens are ``<session id>.<secret>``"""
+    session_id, _, secret = refresh_token.partition(".")
+    try:
+        return PydanticObjectId(session_id), secret
+    except Exception:
+        return None
+
+class SessionService:
+    @staticmethod
+    async def create_session(user_id: str, organization_id: str) -> str:
+        """Start a session and return its first refresh token"""
+        secret = secrets.token_urlsafe(32)
+        session = await storage.sessions.create({
+            "user_id": str(user_id),
+            "organization_id": organization_id,
+            "token_hash": hash_refresh_token(secret),
+            "expires_at": datetime.utcnow() + timedelta(days=REFRESH_TOKEN_EXPIRE_DAYS),
+        })
+        return f"{session.id}.{secret}"
+
+    @staticmethod
+    async def rotate_session(refresh_token: str) -> Optional[Tuple[Session, str]]:
+        """Swap a refresh token for a new one in a single primary-key update.
+
+        Returns None if the token is unknown or expired. Presenting an
+        already rotated token means it leaked, so the whole session is
+        revoked.
+        """
+        parts = split_refresh_token(refresh_token)
+        if parts is None:
+            return None
+        session_id, secret = parts
+        token_hash = hash_refresh_token(secret)
+        new_secret = secrets.token_urlsafe(32)
+        now = datetime.utcnow()
+
+        session = await storage.sessions.rotate(
+            str(session_id),
+            token_hash,
+            hash_refresh_token(new_secret),
+            now,
+            now + timedelta(days=REFRESH_TOKEN_EXPIRE_DAYS)
+        )
+        if session is None:
+            # Reuse of a rotated token: drop the session for everyone holding it
+            await storage.sessions.delete_rotated(str(session_id), token_hash)
+            return None
+        return session, f"{session_id}.{new_secret}"
+
+    @staticmethod
+    async def revoke_session(refresh_token: str) -> bool:
+        parts = split_refresh_token(refresh_token)
+        if parts is None:
+            return False
+        session_id, secret = parts
+        return await storage.sessions.delete(str(session_id), hash_refresh_token(secret))
+
+    @staticmethod
+    async def revoke_user_sessions(user_id: str):
+        await storage.sessions.delete_for_user(str(user_id))
@@ -1,18 +1,11 @@
 from app.models.user import User
+from app.repositories import storage, DuplicateError
 from app.schemas.user import UserCreate
-from app.services.auth import get_password_hash
-from bson import ObjectId
+from app.services.auth import get_password_hash_async
 
 class UserService:
     @staticmethod
     async def create_user(user_data: UserCreate, organization_id: str):
-        existing_user = await User.find_one({
-            "email": user_data.email, 
-            "organization_id": organization_id
-        })
-        if existing_user:
-            raise ValueError("User with this email already exists in organization")
-
         pw_bytes = user_data.password.encode("utf-8") if user_data.password is not None else b""
         if len(pw_bytes) > 72:
             raise ValueError(
@@ -21,22 +14,35 @@ class UserService:
             )
 
         user_dict = user_data.dict()
-        user_dict["password"] = get_password_hash(user_data.password)
+        user_dict["password"] = await get_password_hash_async(user_data.password)
         user_dict["organization_id"] = organization_id
         
-        user = User(**user_dict)
-        return await user.insert()
+        try:
+            return await storage.users.create(user_dict)
+        except DuplicateError:
+            raise ValueError("User with this email already exists in organization")
     
     @staticmethod
     async def get_user_by_id(user_id: str, organization_id: str):
-
-        
-        try:
-            obj_id = ObjectId(user_id)
-        except Exception:
-            return None
-        return await User.find_one({"_id": obj_id, "organization_id": organization_id})
+        return await storage.users.get(user_id, organization_id)
     
     @staticmethod
     async def get_organization_users(organization_id: str):
-        return await User.find({"organization_id": organization_id}).to_list()
\ No newline at end of file
+        return await storage.users.list_for_organization(organization_id)
+    
+    @staticmethod
+    async def set_role(user: User, role: str):
+        """Change a user's role and, in the same write, invalidate the role
+        claims of their outstanding tokens"""
+        user.role = role
+        user.token_version += 1
+        await storage.users.update(str(user.id), {"role": role}, bump_token_version=True)
+    
+    @staticmethod
+    async def set_password(user: User, password_hash: str):
+        user.password = password_hash
+        await storage.users.update(str(user.id), {"password": password_hash})
+    
+    @staticmethod
+    async def delete_user(user: User):
+        await storage.users.delete(str(user.id))
@@ -0,0 +1,101 @@
+"""Compare the response paths for a page of notes, without a database.
+
+Builds 1,000 in-memory ``Note`` documents and serves the same page through
+two routes on a throwaway app:
+
+* ``legacy``: hand-built ``NoteResponse`` objects returned to FastAPI, which
+  re-validates them against ``response_model`` and encodes with
+  ``jsonable_encoder`` + ``json.dumps``.
+* ``fast``: ``NoteResponse.model_validate`` straight from the documents and
+  rendered by pydantic-core via ``model_response``.
+
+    python benchmarks/list_notes.py --notes 1000 --page-size 200
+"""
+import argparse
+import asyncio
+import os
+import sys
+import time
+from datetime import datetime
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import httpx
+from beanie import PydanticObjectId
+from fastapi import FastAPI
+
+from app.models.note import Note
+from app.responses import model_response
+from app.schemas.note import NotePage, NoteResponse
+
+
+def build_notes(count):
+    now = datetime.utcnow()
+    return [
+        Note.model_construct(
+            id=PydanticObjectId(),
+            title=f"Note {i}",
+            content="Lorem ipsum dolor sit amet. " * 20,
+            organization_id="bench-org",
+            created_by="bench-user",
+            created_at=now,
+            updated_at=now,
+            version=1,
+        )
+        for i in range(count)
+    ]
+
+
+def build_app(notes, page_size):
+    app = FastAPI()
+    page = notes[:page_size]
+
+    @app.get("/legacy", response_model=NotePage)
+    async def legacy():
+        return NotePage(items=[
+            NoteResponse(
+                id=str(note.id),
+                title=note.title,
+                content=note.content,
+                organization_id=note.organization_id,
+                created_by=note.created_by,
+                created_at=note.created_at,
+                updated_at=note.updated_at
+            ) for note in page
+        ])
+
+    @app.get("/fast", response_model=NotePage)
+    async def fast():
+        return model_response(NotePage(items=[NoteResponse.model_validate(note) for note in page]))
+
+    return app
+
+
+async def measure(client, path, seconds):
+    requests = 0
+    deadline = time.perf_counter() + seconds
+    while time.perf_counter() < deadline:
+        response = await client.get(path)
+        response.raise_for_status()
+        requests += 1
+    return requests / seconds
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--notes", type=int, default=1000)
+    parser.add_argument("--page-size", type=int, default=200)
+    parser.add_argument("--seconds", type=float, default=5.0)
+    args = parser.parse_args()
+
+    app = build_app(build_notes(args.notes), args.page_size)
+    async with httpx.AsyncClient(app=app, base_url="http://bench") as client:
+        legacy_body = (await client.get("/legacy")).json()
+        assert legacy_body == (await client.get("/fast")).json(), "paths must render the same JSON"
+        for path in ("/legacy", "/fast"):
+            rate = await measure(client, path, args.seconds)
+            print(f"{path:>8}: {rate:8.1f} req/s")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
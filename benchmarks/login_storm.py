@@ -0,0 +1,92 @@
+"""Measure latency of an unrelated endpoint while logins hammer bcrypt.
+
+Run against a live server (``uvicorn main:app``) backed by MongoDB, with
+rate limiting off so logins reach bcrypt instead of being answered with 429:
+
+    RATE_LIMIT_AUTH=off RATE_LIMIT_READ=off uvicorn main:app
+    python benchmarks/login_storm.py --base-url http://localhost:8000
+
+The login failure throttle only counts failed logins, and every login here
+uses the right password, so it never engages.
+
+The script creates a throwaway organization, then fires concurrent logins
+while polling ``GET /notes/`` and reports its p50/p99 latency. Compare a run
+with ``PASSWORD_HASH_WORKERS`` set against the numbers from before the pool.
+Responses are counted by status, and the run fails if any was not a 200,
+since latencies of rejected requests say nothing about bcrypt.
+"""
+import argparse
+import asyncio
+import statistics
+import sys
+import time
+import uuid
+from collections import Counter
+
+import httpx
+
+
+async def login_storm(client, org_id, email, password, stop, statuses):
+    while not stop.is_set():
+        response = await client.post(f"/auth/login/{org_id}", json={"email": email, "password": password})
+        statuses[response.status_code] += 1
+
+
+async def probe(client, token, samples, statuses):
+    headers = {"Authorization": f"Bearer {token}"}
+    latencies = []
+    for _ in range(samples):
+        start = time.perf_counter()
+        response = await client.get("/notes/", headers=headers)
+        latencies.append((time.perf_counter() - start) * 1000)
+        statuses[response.status_code] += 1
+    return latencies
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--base-url", default="http://localhost:8000")
+    parser.add_argument("--logins", type=int, default=32, help="concurrent login loops")
+    parser.add_argument("--samples", type=int, default=200, help="probe requests to time")
+    args = parser.parse_args()
+
+    email = f"bench-{uuid.uuid4().hex[:8]}@bench.com"
+    password = "bench-password"
+    async with httpx.AsyncClient(base_url=args.base_url, timeout=60) as client:
+        org = (await client.post("/organizations/", json={
+            "name": "Login Storm Bench",
+            "admin_email": email,
+            "admin_password": password,
+            "admin_name": "Bench Admin",
+        })).json()
+        token = (await client.post(
+            f"/auth/login/{org['id']}", json={"email": email, "password": password}
+        )).json()["access_token"]
+
+        probe_statuses, login_statuses = Counter(), Counter()
+        baseline = await probe(client, token, args.samples, probe_statuses)
+
+        stop = asyncio.Event()
+        storm = [
+            asyncio.create_task(login_storm(client, org["id"], email, password, stop, login_statuses))
+            for _ in range(args.logins)
+        ]
+        loaded = await probe(client, token, args.samples, probe_statuses)
+        stop.set()
+        await asyncio.gather(*storm, return_exceptions=True)
+
+    for label, latencies in (("idle", baseline), ("login storm", loaded)):
+        latencies.sort()
+        p99 = latencies[int(len(latencies) * 0.99) - 1]
+        print(f"{label:>12}: p50={statistics.median(latencies):7.1f} ms  p99={p99:7.1f} ms")
+    for label, statuses in (("probes", probe_statuses), ("logins", login_statuses)):
+        print(f"{label:>12}: " + "  ".join(f"{code}={count}" for code, count in sorted(statuses.items())))
+
+    rejected = sum(count for statuses in (probe_statuses, login_statuses)
+                   for code, count in statuses.items() if code != 200)
+    if rejected:
+        sys.exit(f"{rejected} requests were not answered with 200; is rate limiting off?")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,91 @@
+"""Time full-text note search against a large seeded tenant.
+
+Needs a MongoDB server; the tenant is seeded once and reused:
+
+    MONGO_URL=mongodb://localhost:27017 python benchmarks/search.py --notes 1000000
+
+Seeding writes raw documents with ``insert_many`` in batches and is skipped
+when the benchmark tenant already holds enough notes.
+"""
+import argparse
+import asyncio
+import os
+import random
+import statistics
+import sys
+import time
+from datetime import datetime
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from beanie import init_beanie
+from motor.motor_asyncio import AsyncIOMotorClient
+
+from app.models.note import Note
+from app.models.organization import Organization
+from app.models.user import User
+from app.services.note import NoteService
+
+BENCH_ORG_ID = "bench-search-tenant"
+WORDS = (
+    "budget roadmap invoice meeting release design review customer launch "
+    "planning hiring retro incident migration quarterly sprint backlog vendor "
+    "contract security audit onboarding pricing forecast latency database"
+).split()
+QUERIES = ["budget", "incident migration", "quarterly forecast", "security audit", "vendor contract"]
+
+
+def random_text(words):
+    return " ".join(random.choice(WORDS) for _ in range(words))
+
+
+async def seed(total, batch_size=10_000):
+    existing = await Note.find({"organization_id": BENCH_ORG_ID}).count()
+    collection = Note.get_motor_collection()
+    now = datetime.utcnow()
+    for start in range(existing, total, batch_size):
+        count = min(batch_size, total - start)
+        await collection.insert_many([
+            {
+                "title": random_text(4),
+                "content": random_text(60),
+                "organization_id": BENCH_ORG_ID,
+                "created_by": "bench-user",
+                "created_at": now,
+                "updated_at": now,
+            }
+            for _ in range(count)
+        ], ordered=False)
+        print(f"seeded {start + count}/{total}", end="\r", flush=True)
+    print()
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--notes", type=int, default=1_000_000)
+    parser.add_argument("--runs", type=int, default=50, help="searches per query")
+    parser.add_argument("--limit", type=int, default=20)
+    args = parser.parse_args()
+
+    client = AsyncIOMotorClient(os.getenv("MONGO_URL", "mongodb://localhost:27017"))
+    await init_beanie(
+        database=client[os.getenv("MONGO_DB", "notes_api_bench")],
+        document_models=[User, Organization, Note]
+    )
+    await seed(args.notes)
+
+    for query in QUERIES:
+        latencies = []
+        for _ in range(args.runs):
+            start = time.perf_counter()
+            await NoteService.search_notes(BENCH_ORG_ID, query, limit=args.limit)
+            latencies.append((time.perf_counter() - start) * 1000)
+        latencies.sort()
+        p99 = latencies[int(len(latencies) * 0.99) - 1]
+        print(f"{query!r:>24}: p50={statistics.median(latencies):8.1f} ms  p99={p99:8.1f} ms")
+
+    client.close()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
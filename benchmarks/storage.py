@@ -0,0 +1,133 @@
+"""Run the same note workload against each storage backend.
+
+Every backend gets a fresh organization and goes through ``NoteService``,
+so the numbers include the service layer but not HTTP:
+
+    python benchmarks/storage.py --notes 5000 --concurrency 16
+    MONGO_URL=mongodb://localhost:27017 python benchmarks/storage.py --backends mongo,sqlite
+
+The SQLite database is written to a temporary directory unless
+``SQLITE_PATH`` is set. MongoDB uses ``MONGO_URL`` and ``MONGO_DB``
+(default ``notes_api_bench``).
+"""
+import argparse
+import asyncio
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("MONGO_DB", "notes_api_bench")
+
+from app.repositories import storage, build_backend
+from app.repositories.sqlite import SQLiteBackend
+from app.schemas.note import NoteCreate, NoteUpdate
+from app.schemas.organization import OrganizationCreate
+from app.services.auth import shutdown_password_pool
+from app.services.note import NoteService
+from app.services.organization import OrganizationService
+
+WORDS = (
+    "budget roadmap invoice meeting release design review customer launch "
+    "planning hiring retro incident migration quarterly sprint backlog vendor "
+    "contract security audit onboarding pricing forecast latency database"
+).split()
+QUERIES = ["budget", "incident migration", "quarterly forecast", "security audit", "vendor contract"]
+
+
+def random_text(words):
+    return " ".join(random.choice(WORDS) for _ in range(words))
+
+
+async def timed(name, operations, concurrency):
+    """Await every operation factory, ``concurrency`` at a time, and report latencies"""
+    latencies = []
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def run(operation):
+        async with semaphore:
+            start = time.perf_counter()
+            await operation()
+            latencies.append((time.perf_counter() - start) * 1000)
+
+    start = time.perf_counter()
+    await asyncio.gather(*[run(operation) for operation in operations])
+    elapsed = time.perf_counter() - start
+    latencies.sort()
+    p99 = latencies[max(0, int(len(latencies) * 0.99) - 1)]
+    print(
+        f"  {name:>8}: {len(latencies) / elapsed:9.0f} ops/s  "
+        f"p50={statistics.median(latencies):7.2f} ms  p99={p99:7.2f} ms"
+    )
+
+
+async def workload(args):
+    organization, admin = await OrganizationService.create_organization_with_admin(OrganizationCreate(
+        name="Storage Bench",
+        admin_email="bench@bench.com",
+        admin_password="bench-password",
+        admin_name="Bench Admin"
+    ))
+    org_id, user_id = str(organization.id), str(admin.id)
+    note_ids = []
+
+    async def create():
+        note = await NoteService.create_note(
+            NoteCreate(title=random_text(4), content=random_text(60)), org_id, user_id
+        )
+        note_ids.append(str(note.id))
+
+    async def page_through():
+        cursor = None
+        while True:
+            _, cursor = await NoteService.get_organization_notes(org_id, limit=50, cursor=cursor)
+            if cursor is None:
+                return
+
+    await timed("create", [create] * args.notes, args.concurrency)
+    await timed("get", [
+        lambda: NoteService.get_note(random.choice(note_ids), org_id) for _ in range(args.notes)
+    ], args.concurrency)
+    await timed("list", [page_through] * args.listings, args.concurrency)
+    await timed("search", [
+        lambda query=query: NoteService.search_notes(org_id, query) for query in QUERIES * args.searches
+    ], args.concurrency)
+    await timed("update", [
+        lambda note_id=note_id: NoteService.update_note(note_id, NoteUpdate(content=random_text(60)), org_id)
+        for note_id in note_ids
+    ], args.concurrency)
+    await timed("delete", [
+        lambda note_id=note_id: NoteService.delete_note(note_id, org_id) for note_id in note_ids
+    ], args.concurrency)
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--backends", default="sqlite,mongo", help="comma separated")
+    parser.add_argument("--notes", type=int, default=2000)
+    parser.add_argument("--listings", type=int, default=20, help="full listings to page through")
+    parser.add_argument("--searches", type=int, default=20, help="runs of each search query")
+    parser.add_argument("--concurrency", type=int, default=16)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        for name in args.backends.split(","):
+            if name == "sqlite":
+                backend = SQLiteBackend(os.getenv("SQLITE_PATH", os.path.join(directory, "bench.db")))
+            else:
+                backend = build_backend(name)
+            storage.backend = backend
+            await storage.connect()
+            print(f"{name}:")
+            try:
+                await workload(args)
+            finally:
+                await storage.close()
+    shutdown_password_pool()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -1,14 +1,30 @@
-from fastapi import FastAPI, Depends
-from app.database.mongodb import connect_to_mongo, close_mongo_connection
+from typing import Optional
+from fastapi import FastAPI, Depends, Header, Response
+from app.repositories import storage
+from app.database.metrics import pool_metrics
 from app.routers import auth, organizations, users, notes
-from app.services.auth import get_current_user
+from app.services.auth import get_current_user, get_keyring, shutdown_password_pool
+from app.services.etag import etag_matches
+from app.responses import get_default_response_class
+from app.middleware.compression import CompressionMiddleware
+from app.middleware.ratelimit import RateLimitMiddleware
 from scalar_fastapi import get_scalar_api_reference
 
-app = FastAPI(title="Multi-Tenant Notes API", version="1.0.0")
+app = FastAPI(
+    title="Multi-Tenant Notes API",
+    version="1.0.0",
+    default_response_class=get_default_response_class()
+)
 
+app.add_middleware(RateLimitMiddleware)
+app.add_middleware(CompressionMiddleware)
 
-app.add_event_handler("startup", connect_to_mongo)
-app.add_event_handler("shutdown", close_mongo_connection)
+
+# Load signing keys first so a bad key configuration stops the worker at once
+app.add_event_handler("startup", get_keyring)
+app.add_event_handler("startup", storage.connect)
+app.add_event_handler("shutdown", storage.close)
+app.add_event_handler("shutdown", shutdown_password_pool)
 
 
 app.include_router(auth.router, prefix="/auth", tags=["Authentication"])
@@ -24,6 +40,23 @@ async def root():
 async def health_check():
     return {"status": "healthy"}
 
+@app.get("/health/mongo")
+async def mongo_pool_metrics():
+    """MongoDB connection pool usage of this worker"""
+    return {"pool": pool_metrics.snapshot()}
+
+@app.get("/.well-known/jwks.json", include_in_schema=False)
+async def jwks(if_none_match: Optional[str] = Header(None)):
+    """Public keys for verifying access tokens without calling this API"""
+    keyring = get_keyring()
+    if keyring is None:
+        # Tokens are signed with a shared secret, which is never published
+        return {"keys": []}
+    headers = {"ETag": keyring.jwks_etag, "Cache-Control": "public, max-age=300"}
+    if etag_matches(if_none_match, keyring.jwks_etag):
+        return Response(status_code=304, headers=headers)
+    return Response(content=keyring.jwks_body, media_type="application/json", headers=headers)
+
 @app.get("/scalar")
 async def scalar():
     return get_scalar_api_reference(
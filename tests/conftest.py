@@ -10,7 +10,9 @@ from beanie import init_beanie
 from main import app
 from app.models.user import User
 from app.models.organization import Organization
-from app.models.note import Note
+from app.models.note import Note, NoteTombstone
+from app.models.session import Session
+from app.models.revoked_token import RevokedToken
 from app.services.auth import get_password_hash
 
 # Test database configuration
@@ -32,7 +34,7 @@ async def test_database():
     # Initialize Beanie with test database
     await init_beanie(
         database=client[TEST_DB_NAME],
-        document_models=[User, Organization, Note]
+        document_models=[User, Organization, Note, NoteTombstone, Session, RevokedToken]
     )
     
     yield
@@ -45,6 +47,11 @@ async def test_database():
 async def client(test_database):
     """Create a test client."""
     from httpx import AsyncClient
+    from app.services.ratelimit import rate_limiter
+    from app.services.login_throttle import login_throttle
+    # Rate limit buckets and login failures are per process; start every test clean
+    rate_limiter.reset()
+    login_throttle.clear()
     async with AsyncClient(app=app, base_url="http://test") as ac:
         yield ac
 
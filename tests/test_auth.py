@@ -45,6 +45,22 @@ class TestAuthentication:
         response = await client.post(f"/auth/login/{org_id}", json=login_data)
         assert response.status_code == 401
     
+    @pytest.mark.asyncio
+    async def test_login_rejected_when_hash_pool_saturated(self, client, test_organization, monkeypatch):
+        """Test login is shed with 503 when the password hashing pool is full."""
+        from app.services import auth as auth_service
+        monkeypatch.setattr(auth_service, "PASSWORD_HASH_MAX_PENDING", 0)
+        
+        org_id = test_organization["id"]
+        login_data = {
+            "email": "admin@test.com",
+            "password": "admin123"
+        }
+        
+        response = await client.post(f"/auth/login/{org_id}", json=login_data)
+        assert response.status_code == 503
+        assert "retry-after" in response.headers
+    
     @pytest.mark.asyncio
     async def test_get_current_user(self, client, admin_token):
         """Test getting current user info."""
@@ -105,4 +121,213 @@ class TestAuthentication:
         """Test accessing protected endpoint with invalid token."""
         headers = {"Authorization": "Bearer invalid_token"}
         response = await client.get("/auth/me", headers=headers)
-        assert response.status_code == 401
\ No newline at end of file
+        assert response.status_code == 401
+    
+    @pytest.mark.asyncio
+    async def test_login_throttled_after_failures(self, client, test_organization, monkeypatch):
+        """Test repeated failures throttle the account before any bcrypt work."""
+        from app.services import auth as auth_service
+        from app.services.login_throttle import LOGIN_MAX_FAILURES_PER_ACCOUNT
+        
+        org_id = test_organization["id"]
+        bad_login = {"email": "admin@test.com", "password": "wrongpassword"}
+        for _ in range(LOGIN_MAX_FAILURES_PER_ACCOUNT):
+            response = await client.post(f"/auth/login/{org_id}", json=bad_login)
+            assert response.status_code == 401
+        
+        verify_calls = []
+        original_verify = auth_service.verify_password_async
+        
+        async def counting_verify(*args):
+            verify_calls.append(args)
+            return await original_verify(*args)
+        
+        monkeypatch.setattr(auth_service, "verify_password_async", counting_verify)
+        
+        # Even the right password is refused while the account is throttled
+        good_login = {"email": "ADMIN@test.com", "password": "admin123"}
+        response = await client.post(f"/auth/login/{org_id}", json=good_login)
+        assert response.status_code == 429
+        assert int(response.headers["retry-after"]) > 0
+        assert verify_calls == []
+    
+    @pytest.mark.asyncio
+    async def test_login_success_clears_failures(self, client, test_organization):
+        """Test a successful login resets the account's failure count."""
+        from app.services.login_throttle import LOGIN_MAX_FAILURES_PER_ACCOUNT
+        
+        org_id = test_organization["id"]
+        bad_login = {"email": "admin@test.com", "password": "wrongpassword"}
+        good_login = {"email": "admin@test.com", "password": "admin123"}
+        for _ in range(LOGIN_MAX_FAILURES_PER_ACCOUNT - 1):
+            await client.post(f"/auth/login/{org_id}", json=bad_login)
+        
+        response = await client.post(f"/auth/login/{org_id}", json=good_login)
+        assert response.status_code == 200
+        response = await client.post(f"/auth/login/{org_id}", json=bad_login)
+        assert response.status_code == 401
+    
+    def test_sliding_window_counter(self):
+        """Test the failure counter decays across windows and stays bounded."""
+        from app.services.login_throttle import SlidingWindowCounter
+        
+        now = [0.0]
+        counter = SlidingWindowCounter(window=100, maxsize=2, clock=lambda: now[0])
+        for _ in range(4):
+            counter.add("a")
+        assert counter.count("a") == 4
+        assert counter.retry_after("a", 4) == 100
+        
+        now[0] = 125  # three quarters of the previous window still overlap
+        assert counter.count("a") == 3
+        assert counter.retry_after("a", 2) == 25
+        
+        now[0] = 300
+        assert counter.count("a") == 0
+        
+        for key in ("a", "b", "c"):
+            counter.add(key)
+        assert len(counter) == 2
+    
+    @pytest.mark.asyncio
+    async def test_refresh_token_rotation(self, client, test_organization, monkeypatch):
+        """Test refreshing issues new tokens without verifying the password."""
+        from app.services import auth as auth_service
+        
+        org_id = test_organization["id"]
+        login_data = {"email": "admin@test.com", "password": "admin123"}
+        response = await client.post(f"/auth/login/{org_id}", json=login_data)
+        refresh_token = response.json()["refresh_token"]
+        
+        async def fail_verify(*args):
+            raise AssertionError("refresh must not hash passwords")
+        
+        monkeypatch.setattr(auth_service, "verify_password_async", fail_verify)
+        
+        response = await client.post("/auth/refresh", json={"refresh_token": refresh_token})
+        assert response.status_code == 200
+        data = response.json()
+        assert data["refresh_token"] != refresh_token
+        
+        headers = {"Authorization": f"Bearer {data['access_token']}"}
+        response = await client.get("/auth/me", headers=headers)
+        assert response.status_code == 200
+        assert response.json()["email"] == "admin@test.com"
+    
+    @pytest.mark.asyncio
+    async def test_refresh_token_reuse_revokes_session(self, client, test_organization):
+        """Test replaying a rotated refresh token kills the whole session."""
+        org_id = test_organization["id"]
+        login_data = {"email": "admin@test.com", "password": "admin123"}
+        response = await client.post(f"/auth/login/{org_id}", json=login_data)
+        first_token = response.json()["refresh_token"]
+        
+        response = await client.post("/auth/refresh", json={"refresh_token": first_token})
+        second_token = response.json()["refresh_token"]
+        
+        response = await client.post("/auth/refresh", json={"refresh_token": first_token})
+        assert response.status_code == 401
+        response = await client.post("/auth/refresh", json={"refresh_token": second_token})
+        assert response.status_code == 401
+    
+    @pytest.mark.asyncio
+    async def test_logout_revokes_refresh_token(self, client, test_organization):
+        """Test logging out invalidates the refresh token."""
+        org_id = test_organization["id"]
+        login_data = {"email": "admin@test.com", "password": "admin123"}
+        response = await client.post(f"/auth/login/{org_id}", json=login_data)
+        refresh_token = response.json()["refresh_token"]
+        
+        response = await client.post("/auth/logout", json={"refresh_token": refresh_token})
+        assert response.status_code == 200
+        response = await client.post("/auth/refresh", json={"refresh_token": refresh_token})
+        assert response.status_code == 401
+        response = await client.post("/auth/refresh", json={"refresh_token": "garbage"})
+        assert response.status_code == 401
+    
+    @pytest.mark.asyncio
+    async def test_logout_revokes_access_token(self, client, test_organization):
+        """Test an access token presented at logout is rejected afterwards."""
+        org_id = test_organization["id"]
+        login_data = {"email": "admin@test.com", "password": "admin123"}
+        response = await client.post(f"/auth/login/{org_id}", json=login_data)
+        tokens = response.json()
+        headers = {"Authorization": f"Bearer {tokens['access_token']}"}
+        
+        assert (await client.get("/auth/me", headers=headers)).status_code == 200
+        response = await client.post(
+            "/auth/logout", json={"refresh_token": tokens["refresh_token"]}, headers=headers
+        )
+        assert response.status_code == 200
+        assert (await client.get("/auth/me", headers=headers)).status_code == 401
+    
+    @pytest.mark.asyncio
+    async def test_revocations_from_other_workers_picked_up(self, client, admin_token):
+        """Test a revocation written by another process reaches the filter on refresh."""
+        from datetime import datetime, timedelta
+        from app.models.revoked_token import RevokedToken
+        from app.services.auth import decode_access_token
+        from app.services.revocation import revocation_list
+        
+        headers = {"Authorization": f"Bearer {admin_token}"}
+        assert (await client.get("/auth/me", headers=headers)).status_code == 200
+        
+        claims = decode_access_token(admin_token)
+        await RevokedToken(
+            jti=claims["jti"],
+            user_id=claims["sub"],
+            expires_at=datetime.utcnow() + timedelta(minutes=30)
+        ).insert()
+        await revocation_list.refresh()
+        assert (await client.get("/auth/me", headers=headers)).status_code == 401
+    
+    @pytest.mark.asyncio
+    async def test_revocation_filter_rebuilds_without_gap(self, client, monkeypatch):
+        """Test a full filter keeps answering checks while its replacement is loaded."""
+        from datetime import datetime, timedelta
+        from app.repositories import storage
+        from app.services.revocation import RevocationList
+        
+        revocations = RevocationList(error_rate=0.01)
+        await revocations.refresh()
+        existing = revocations._filter.count
+        # Full after three more revocations
+        revocations.capacity = existing + 3
+        
+        expires_at = datetime.utcnow() + timedelta(minutes=30)
+        await revocations.revoke("rebuild-a", "user", expires_at)
+        await revocations.revoke("rebuild-b", "user", expires_at)
+        await revocations.refresh()
+        await revocations.refresh()
+        # Revocations re-read on refresh are not counted again
+        assert revocations._filter.count == existing + 2
+        
+        await revocations.revoke("rebuild-c", "user", expires_at)
+        checks = []
+        revoked_since = storage.revoked_tokens.revoked_since
+        
+        async def observed(since):
+            async for entry in revoked_since(since):
+                checks.append(await revocations.is_revoked("rebuild-a"))
+                yield entry
+        
+        monkeypatch.setattr(storage.revoked_tokens, "revoked_since", observed)
+        await revocations.refresh()
+        assert checks and all(checks)
+        assert await revocations.is_revoked("rebuild-c")
+    
+    def test_bloom_filter(self):
+        """Test the revocation filter has no false negatives and few false positives."""
+        from app.services.revocation import BloomFilter
+        
+        bloom = BloomFilter(capacity=1000, error_rate=0.01)
+        for i in range(1000):
+            bloom.add(f"revoked-{i}")
+        assert all(f"revoked-{i}" in bloom for i in range(1000))
+        false_positives = sum(f"other-{i}" in bloom for i in range(10000))
+        assert false_positives < 300
+        
+        count = bloom.count
+        assert not bloom.add("revoked-0")
+        assert bloom.count == count
+
@@ -0,0 +1,142 @@
+import pytest
+from bson import Timestamp
+from fastapi import HTTPException
+
+from app.services import causal
+
+
+class FakeSession:
+    """Stands in for a Motor session; mongomock has no session support."""
+
+    def __init__(self, operation_time=None, cluster_time=None):
+        self.operation_time = operation_time
+        self.cluster_time = cluster_time
+        self.advanced = []
+
+    def advance_cluster_time(self, cluster_time):
+        self.advanced.append(("cluster", cluster_time))
+
+    def advance_operation_time(self, operation_time):
+        self.advanced.append(("operation", operation_time))
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        return False
+
+
+@pytest.fixture
+def secondary_reads(monkeypatch):
+    sessions = []
+
+    async def start_session():
+        session = FakeSession()
+        sessions.append(session)
+        return session
+
+    monkeypatch.setattr(causal, "SECONDARY_READS", True)
+    monkeypatch.setattr(causal, "start_session", start_session)
+    return sessions
+
+
+class TestCausalTokens:
+    """Test read-your-writes tokens for secondary note reads."""
+
+    def test_token_round_trip(self):
+        """Test a write session's times survive encoding and are signed."""
+        cluster_time = {"clusterTime": Timestamp(1700000000, 3), "signature": {"keyId": 0}}
+        session = FakeSession(Timestamp(1700000000, 3), cluster_time)
+
+        token = causal.encode_causal_token(session)
+        times = causal.decode_causal_token(token)
+        assert times["operationTime"] == Timestamp(1700000000, 3)
+        assert times["clusterTime"] == cluster_time
+
+        encoded, _, signature = token.partition(".")
+        forged = causal.encode_causal_token(FakeSession(Timestamp(1800000000, 1)))
+        with pytest.raises(ValueError):
+            causal.decode_causal_token(f"{forged.partition('.')[0]}.{signature}")
+        with pytest.raises(ValueError):
+            causal.decode_causal_token("not-a-token")
+
+    def test_no_token_without_session(self):
+        """Test primary-only mode sends no causal header."""
+        assert causal.causal_headers(None) == {}
+        assert causal.causal_headers(FakeSession()) == {}
+
+    @pytest.mark.asyncio
+    async def test_read_session_advances_to_token(self, secondary_reads):
+        """Test reads wait for the write a client's token points at."""
+        token = causal.encode_causal_token(
+            FakeSession(Timestamp(1700000000, 7), {"clusterTime": Timestamp(1700000000, 7)})
+        )
+
+        async for session in causal.read_session(token):
+            assert session is secondary_reads[0]
+        assert secondary_reads[0].advanced == [
+            ("cluster", {"clusterTime": Timestamp(1700000000, 7)}),
+            ("operation", Timestamp(1700000000, 7)),
+        ]
+
+        with pytest.raises(HTTPException) as exc_info:
+            async for _ in causal.read_session("bogus.token"):
+                pass
+        assert exc_info.value.status_code == 400
+
+    @pytest.mark.asyncio
+    async def test_primary_mode_ignores_token(self):
+        """Test tokens are neither validated nor applied while reads use the primary."""
+        async for session in causal.read_session("bogus.token"):
+            assert session is None
+
+    @pytest.mark.asyncio
+    async def test_note_writes_without_secondary_reads(self, client, admin_token):
+        """Test note writes carry no causal token in primary-only mode."""
+        headers = {"Authorization": f"Bearer {admin_token}"}
+        response = await client.post(
+            "/notes/", json={"title": "Causal", "content": "Body"}, headers=headers
+        )
+        assert response.status_code == 200
+        assert causal.CAUSAL_TOKEN_HEADER not in response.headers
+
+        note_id = response.json()["id"]
+        response = await client.get(
+            f"/notes/{note_id}",
+            headers={**headers, causal.CAUSAL_TOKEN_HEADER: "ignored"}
+        )
+        assert response.status_code == 200
+
+        response = await client.delete(f"/notes/{note_id}", headers=headers)
+        assert response.status_code == 200
+        assert response.json() == {"message": "Note deleted successfully"}
+
+    @pytest.mark.asyncio
+    async def test_listing_version_read_with_page(self, client, admin_token, monkeypatch):
+        """Test the listing ETag version is read in the page's session, before the page."""
+        from main import app
+        from app.repositories import storage
+
+        session = FakeSession()
+        calls = []
+
+        async def override_read_session():
+            yield session
+
+        async def get_listing_version(organization_id, session=None):
+            calls.append(("version", session))
+            return 1
+
+        async def list_page(organization_id, limit, after=None, sort="id", projection=None, session=None):
+            calls.append(("page", session))
+            return []
+
+        monkeypatch.setattr(storage.notes, "get_listing_version", get_listing_version)
+        monkeypatch.setattr(storage.notes, "list_page", list_page)
+        app.dependency_overrides[causal.read_session] = override_read_session
+        try:
+            response = await client.get("/notes/", headers={"Authorization": f"Bearer {admin_token}"})
+        finally:
+            del app.dependency_overrides[causal.read_session]
+        assert response.status_code == 200
+        assert calls == [("version", session), ("page", session)]
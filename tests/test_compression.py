@@ -0,0 +1,89 @@
+import gzip
+import pytest
+
+from app.middleware.compression import negotiate_encoding
+
+
+class TestCompression:
+    """Test negotiated response compression."""
+
+    @pytest.mark.asyncio
+    async def test_small_response_not_compressed(self, client):
+        """Test bodies below the size threshold are sent uncompressed."""
+        response = await client.get("/health", headers={"Accept-Encoding": "gzip"})
+
+        assert response.status_code == 200
+        assert "content-encoding" not in response.headers
+        assert response.json() == {"status": "healthy"}
+
+    @pytest.mark.asyncio
+    async def test_large_listing_gzipped(self, client, writer_token):
+        """Test large listings are gzipped and still carry their ETag."""
+        headers = {"Authorization": f"Bearer {writer_token}"}
+        for i in range(5):
+            await client.post(
+                "/notes/",
+                json={"title": f"Note {i}", "content": "lorem ipsum " * 100},
+                headers=headers
+            )
+
+        response = await client.get("/notes/", headers={**headers, "Accept-Encoding": "gzip"})
+        assert response.status_code == 200
+        assert response.headers["content-encoding"] == "gzip"
+        assert "Accept-Encoding" in response.headers["vary"]
+        assert len(response.json()["items"]) == 5
+
+        # A cached compressed body must decode identically, and the ETag still revalidates
+        etag = response.headers["etag"]
+        again = await client.get("/notes/", headers={**headers, "Accept-Encoding": "gzip"})
+        assert again.json() == response.json()
+        not_modified = await client.get(
+            "/notes/", headers={**headers, "Accept-Encoding": "gzip", "If-None-Match": etag}
+        )
+        assert not_modified.status_code == 304
+
+    @pytest.mark.asyncio
+    async def test_identity_when_not_accepted(self, client, writer_token):
+        """Test responses stay uncompressed when the client refuses gzip."""
+        headers = {"Authorization": f"Bearer {writer_token}"}
+        await client.post(
+            "/notes/",
+            json={"title": "Big", "content": "x" * 4000},
+            headers=headers
+        )
+
+        response = await client.get("/notes/", headers={**headers, "Accept-Encoding": "gzip;q=0"})
+        assert response.status_code == 200
+        assert "content-encoding" not in response.headers
+
+    @pytest.mark.asyncio
+    async def test_export_stream_gzipped(self, client, writer_token):
+        """Test the streaming export is compressed chunk by chunk."""
+        headers = {"Authorization": f"Bearer {writer_token}"}
+        for i in range(3):
+            await client.post(
+                "/notes/",
+                json={"title": f"Export {i}", "content": "streamed " * 50},
+                headers=headers
+            )
+
+        async with client.stream(
+            "GET", "/notes/export", headers={**headers, "Accept-Encoding": "gzip"}
+        ) as response:
+            assert response.status_code == 200
+            assert response.headers["content-encoding"] == "gzip"
+            assert "content-length" not in response.headers
+            raw = b"".join([chunk async for chunk in response.aiter_raw()])
+
+        lines = gzip.decompress(raw).decode().strip().split("\n")
+        assert len(lines) == 3
+
+    def test_negotiate_encoding(self):
+        """Test Accept-Encoding negotiation honours q-values."""
+        encodings = {"br": object, "gzip": object}
+        assert negotiate_encoding("gzip, br", encodings) == "br"
+        assert negotiate_encoding("br;q=0, gzip", encodings) == "gzip"
+        assert negotiate_encoding("gzip;q=0.5, br;q=0.1", encodings) == "gzip"
+        assert negotiate_encoding("*", encodings) == "br"
+        assert negotiate_encoding("identity", encodings) is None
+        assert negotiate_encoding("", encodings) is None
@@ -0,0 +1,76 @@
+import pytest
+from pymongo import ReadPreference
+
+from app.database import settings
+from app.database.metrics import PoolMetrics
+from app.database.mongodb import read_collection
+from app.models.note import Note
+
+
+class TestDatabaseSettings:
+    """Test MongoDB client settings, read routing and pool metrics."""
+
+    def test_client_options_only_include_configured_values(self, monkeypatch):
+        """Test unset settings fall back to the driver defaults."""
+        assert settings.client_options() == {}
+
+        monkeypatch.setattr(settings, "MONGO_MAX_POOL_SIZE", 200)
+        monkeypatch.setattr(settings, "MONGO_WAIT_QUEUE_TIMEOUT_MS", 500)
+        monkeypatch.setattr(settings, "MONGO_COMPRESSORS", "zstd,snappy")
+        assert settings.client_options() == {
+            "maxPoolSize": 200,
+            "waitQueueTimeoutMS": 500,
+            "compressors": "zstd,snappy",
+        }
+
+    def test_parse_read_preference(self):
+        """Test read preference names and staleness bounds."""
+        assert settings.parse_read_preference("primary", 120) == ReadPreference.PRIMARY
+        preference = settings.parse_read_preference("secondaryPreferred", 120)
+        assert preference.mode == ReadPreference.SECONDARY_PREFERRED.mode
+        assert preference.max_staleness == 120
+
+    @pytest.mark.asyncio
+    async def test_listing_reads_use_operation_read_preference(self, test_database, monkeypatch):
+        """Test only the configured operations are routed away from the primary."""
+        collection = Note.get_motor_collection()
+        assert read_collection(Note, "listing") is collection
+
+        routed = []
+        monkeypatch.setattr(
+            type(collection), "with_options",
+            lambda self, **options: routed.append(options) or self,
+            raising=False
+        )
+        monkeypatch.setitem(
+            settings.OPERATION_READ_PREFERENCES, "listing",
+            settings.parse_read_preference("secondaryPreferred")
+        )
+        read_collection(Note, "listing")
+        assert routed[0]["read_preference"].mode == ReadPreference.SECONDARY_PREFERRED.mode
+        assert read_collection(Note, "get") is collection
+
+    def test_pool_metrics(self):
+        """Test pool events are tallied into a snapshot."""
+        metrics = PoolMetrics()
+        metrics.connection_created(None)
+        metrics.connection_created(None)
+        metrics.connection_check_out_started(None)
+        metrics.connection_checked_out(None)
+        metrics.connection_check_out_started(None)
+        metrics.connection_check_out_failed(None)
+        metrics.connection_closed(None)
+
+        snapshot = metrics.snapshot()
+        assert snapshot["open_connections"] == 1
+        assert snapshot["checked_out"] == 1
+        assert snapshot["waiting"] == 0
+        assert snapshot["checkouts"] == 1
+        assert snapshot["checkout_failures"] == 1
+
+    @pytest.mark.asyncio
+    async def test_pool_metrics_endpoint(self, client):
+        """Test the pool metrics are exposed over HTTP."""
+        response = await client.get("/health/mongo")
+        assert response.status_code == 200
+        assert "checked_out" in response.json()["pool"]
@@ -0,0 +1,97 @@
+import pytest
+from jose import jwt
+
+from app.services import auth as auth_service
+from app.services.keys import KeyRing
+
+
+@pytest.fixture
+def rs256_keyring(monkeypatch):
+    keyring = KeyRing.generate("RS256", kid="key-1")
+    monkeypatch.setattr(auth_service, "ALGORITHM", "RS256")
+    monkeypatch.setattr(auth_service, "_keyring", keyring)
+    return keyring
+
+
+class TestSigningKeys:
+    """Test asymmetric token signing and the JWKS endpoint."""
+
+    @pytest.mark.asyncio
+    async def test_jwks_empty_for_shared_secret(self, client):
+        """Test the HS256 secret is never published."""
+        response = await client.get("/.well-known/jwks.json")
+        assert response.status_code == 200
+        assert response.json() == {"keys": []}
+
+    def test_keys_dir_required(self, monkeypatch):
+        """Test asymmetric signing refuses to invent a per-process key."""
+        monkeypatch.setattr(auth_service, "ALGORITHM", "ES256")
+        monkeypatch.setattr(auth_service, "JWT_KEYS_DIR", None)
+        monkeypatch.setattr(auth_service, "_keyring", None)
+        with pytest.raises(ValueError):
+            auth_service.get_keyring()
+
+    @pytest.mark.asyncio
+    async def test_token_verifiable_from_jwks(self, client, test_organization, rs256_keyring):
+        """Test a downstream service can verify tokens using only the JWKS."""
+        org_id = test_organization["id"]
+        response = await client.post(f"/auth/login/{org_id}", json={
+            "email": "admin@test.com",
+            "password": "admin123"
+        })
+        token = response.json()["access_token"]
+        assert jwt.get_unverified_header(token)["kid"] == "key-1"
+
+        response = await client.get("/.well-known/jwks.json")
+        assert response.status_code == 200
+        assert "max-age" in response.headers["cache-control"]
+        jwks = response.json()
+        assert [key["kid"] for key in jwks["keys"]] == ["key-1"]
+        assert "d" not in jwks["keys"][0]  # no private material
+
+        claims = jwt.decode(token, jwks["keys"][0], algorithms=["RS256"])
+        assert claims["org_id"] == org_id
+
+        response = await client.get(
+            "/.well-known/jwks.json", headers={"If-None-Match": response.headers["etag"]}
+        )
+        assert response.status_code == 304
+
+        response = await client.get("/auth/me", headers={"Authorization": f"Bearer {token}"})
+        assert response.status_code == 200
+
+    @pytest.mark.asyncio
+    async def test_rotated_key_still_verifies(self, client, admin_token, monkeypatch, tmp_path, rs256_keyring):
+        """Test tokens from a retired key verify while a new key signs."""
+        from cryptography.hazmat.primitives import serialization
+        from cryptography.hazmat.primitives.asymmetric import rsa
+
+        for kid in ("key-1", "key-2"):
+            private_key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+            (tmp_path / f"{kid}.pem").write_bytes(private_key.private_bytes(
+                serialization.Encoding.PEM,
+                serialization.PrivateFormat.PKCS8,
+                serialization.NoEncryption()
+            ))
+        # Two private keys are ambiguous without an explicit active kid
+        with pytest.raises(ValueError):
+            KeyRing.from_directory("RS256", str(tmp_path))
+        old_ring = KeyRing.from_directory("RS256", str(tmp_path), active_kid="key-1")
+        monkeypatch.setattr(auth_service, "_keyring", old_ring)
+        old_token = auth_service.create_access_token({"sub": "user", "org_id": "org"})
+
+        # Retire key-1 to public only and let key-2 sign
+        public_pem = old_ring.verification_key("key-1").to_pem()
+        (tmp_path / "key-1.pem").write_bytes(public_pem)
+        new_ring = KeyRing.from_directory("RS256", str(tmp_path))
+        monkeypatch.setattr(auth_service, "_keyring", new_ring)
+        assert new_ring.active_kid == "key-2"
+
+        new_token = auth_service.create_access_token({"sub": "user", "org_id": "org"})
+        assert jwt.get_unverified_header(new_token)["kid"] == "key-2"
+        assert auth_service.decode_access_token(old_token)["sub"] == "user"
+        assert auth_service.decode_access_token(new_token)["sub"] == "user"
+
+        # HS256 tokens are refused once asymmetric signing is configured
+        response = await client.get("/auth/me", headers={"Authorization": f"Bearer {admin_token}"})
+        assert response.status_code == 401
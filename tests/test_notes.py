@@ -1,3 +1,4 @@
+import asyncio
 import pytest
 
 class TestNotes:
@@ -63,8 +64,278 @@ class TestNotes:
         response = await client.get("/notes/", headers=headers)
         
         assert response.status_code == 200
-        notes = response.json()
-        assert isinstance(notes, list)
+        page = response.json()
+        assert isinstance(page["items"], list)
+        assert "next_cursor" in page
+    
+    @pytest.mark.asyncio
+    async def test_list_notes_pagination(self, client, writer_token):
+        """Test paging through notes with a cursor."""
+        headers = {"Authorization": f"Bearer {writer_token}"}
+        for i in range(5):
+            await client.post("/notes/", json={
+                "title": f"Paged Note {i}",
+                "content": "Paged content"
+            }, headers=headers)
+        
+        seen = []
+        cursor = None
+        while True:
+            params = {"limit": 2}
+            if cursor:
+                params["cursor"] = cursor
+            response = await client.get("/notes/", params=params, headers=headers)
+            assert response.status_code == 200
+            page = response.json()
+            assert len(page["items"]) <= 2
+            seen.extend(note["id"] for note in page["items"])
+            cursor = page["next_cursor"]
+            if not cursor:
+                break
+        
+        assert len(seen) == len(set(seen))
+        assert len(seen) >= 5
+    
+    @pytest.mark.asyncio
+    async def test_list_notes_invalid_cursor(self, client, writer_token):
+        """Test listing notes with a malformed cursor."""
+        headers = {"Authorization": f"Bearer {writer_token}"}
+        response = await client.get("/notes/", params={"cursor": "not-a-cursor"}, headers=headers)
+        assert response.status_code == 400
+    
+    @pytest.mark.asyncio
+    async def test_list_notes_summary_view(self, client, writer_token):
+        """Test the summary listing leaves out note bodies."""
+        headers = {"Authorization": f"Bearer {writer_token}"}
+        await client.post("/notes/", json={
+            "title": "Summary Note",
+            "content": "A body that list views do not need"
+        }, headers=headers)
+        
+        response = await client.get("/notes/", params={"view": "summary"}, headers=headers)
+        assert response.status_code == 200
+        items = response.json()["items"]
+        assert len(items) >= 1
+        for item in items:
+            assert "content" not in item
+            assert "title" in item
+            assert "created_by" in item
+            assert "updated_at" in item
+    
+    @pytest.mark.asyncio
+    async def test_list_notes_summary_excerpt(self, client, writer_token):
+        """Test the summary listing can include a short content excerpt."""
+        headers = {"Authorization": f"Bearer {writer_token}"}
+        await client.post("/notes/", json={
+            "title": "Long Note",
+            "content": "x" * 1000
+        }, headers=headers)
+        
+        response = await client.get(
+            "/notes/", params={"view": "summary", "excerpt": "true"}, headers=headers
+        )
+        assert response.status_code == 200
+        items = response.json()["items"]
+        assert all(len(item["excerpt"]) <= 200 for item in items)
+    
+    @pytest.mark.asyncio
+    async def test_export_notes(self, client, writer_token):
+        """Test streaming an NDJSON export and resuming it."""
+        import json
+        headers = {"Authorization": f"Bearer {writer_token}"}
+        for i in range(3):
+            await client.post("/notes/", json={
+                "title": f"Export Note {i}",
+                "content": "Exported content"
+            }, headers=headers)
+        
+        response = await client.get("/notes/export", headers=headers)
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("application/x-ndjson")
+        notes = [json.loads(line) for line in response.text.splitlines()]
+        assert len(notes) >= 3
+        
+        resumed = await client.get(
+            "/notes/export", params={"after": notes[0]["id"]}, headers=headers
+        )
+        resumed_ids = [json.loads(line)["id"] for line in resumed.text.splitlines()]
+        assert resumed_ids == [note["id"] for note in notes[1:]]
+    
+    @pytest.mark.asyncio
+    async def test_export_notes_invalid_resume_id(self, client, writer_token):
+        """Test resuming an export from a malformed note id."""
+        headers = {"Authorization": f"Bearer {writer_token}"}
+        response = await client.get("/notes/export", params={"after": "bogus"}, headers=headers)
+        assert response.status_code == 400
+    
+    @pytest.mark.asyncio
+    async def test_batch_notes_as_writer(self, client, admin_token, writer_token):
+        """Test a writer batch is authorized per operation."""
+        admin_headers = {"Authorization": f"Bearer {admin_token}"}
+        admin_note = await client.post("/notes/", json={
+            "title": "Admin Batch Target",
+            "content": "Owned by admin"
+        }, headers=admin_headers)
+        admin_note_id = admin_note.json()["id"]
+        
+        headers = {"Authorization": f"Bearer {writer_token}"}
+        own_note = await client.post("/notes/", json={
+            "title": "Writer Batch Target",
+            "content": "Owned by writer"
+        }, headers=headers)
+        own_note_id = own_note.json()["id"]
+        
+        response = await client.post("/notes/batch", json={"operations": [
+            {"op": "create", "title": "Batch Note", "content": "Created in a batch"},
+            {"op": "update", "id": own_note_id, "title": "Updated in a batch"},
+            {"op": "update", "id": admin_note_id, "title": "Not allowed"},
+            {"op": "delete", "id": own_note_id},
+            {"op": "update", "id": "nonexistent_id", "title": "Missing"},
+            {"op": "create", "title": "No content"}
+        ]}, headers=headers)
+        assert response.status_code == 200
+        statuses = [result["status"] for result in response.json()["results"]]
+        assert statuses == [200, 200, 403, 403, 404, 400]
+        
+        created_id = response.json()["results"][0]["id"]
+        created = await client.get(f"/notes/{created_id}", headers=headers)
+        assert created.json()["title"] == "Batch Note"
+        
+        updated = await client.get(f"/notes/{own_note_id}", headers=headers)
+        assert updated.json()["title"] == "Updated in a batch"
+        
+        untouched = await client.get(f"/notes/{admin_note_id}", headers=headers)
+        assert untouched.json()["title"] == "Admin Batch Target"
+    
+    @pytest.mark.asyncio
+    async def test_batch_delete_as_admin(self, client, admin_token, writer_token):
+        """Test an admin deleting notes in a batch."""
+        writer_headers = {"Authorization": f"Bearer {writer_token}"}
+        note = await client.post("/notes/", json={
+            "title": "Batch Delete Target",
+            "content": "Will be deleted"
+        }, headers=writer_headers)
+        note_id = note.json()["id"]
+        
+        admin_headers = {"Authorization": f"Bearer {admin_token}"}
+        response = await client.post("/notes/batch", json={"operations": [
+            {"op": "delete", "id": note_id}
+        ]}, headers=admin_headers)
+        assert response.json()["results"][0]["status"] == 200
+        
+        get_response = await client.get(f"/notes/{note_id}", headers=admin_headers)
+        assert get_response.status_code == 404
+    
+    @pytest.mark.asyncio
+    async def test_batch_reports_writes_that_missed(self, client, admin_token, writer_token, monkeypatch):
+        """Test batch writes whose note changed after the lookup are not reported as applied."""
+        from bson import ObjectId
+        from app.models.note import Note
+        from app.repositories import storage
+        from app.services.note import NoteService
+        
+        writer_headers = {"Authorization": f"Bearer {writer_token}"}
+        admin_headers = {"Authorization": f"Bearer {admin_token}"}
+        ids = []
+        for title in ("Kept", "Deleted meanwhile", "Given away"):
+            response = await client.post("/notes/", json={"title": title, "content": "Body"}, headers=writer_headers)
+            ids.append(response.json()["id"])
+        org_id = (await client.get("/auth/me", headers=writer_headers)).json()["organization_id"]
+        
+        owners = storage.notes.owners
+        deleted_meanwhile = [ids[1]]
+        
+        async def stale_owners(*args, **kwargs):
+            found = await owners(*args, **kwargs)
+            # Another request deletes one note and reassigns another after the lookup
+            await NoteService.delete_note(deleted_meanwhile[0], org_id)
+            await Note.get_motor_collection().update_one(
+                {"_id": ObjectId(ids[2])}, {"$set": {"created_by": "someone-else"}}
+            )
+            return found
+        
+        monkeypatch.setattr(storage.notes, "owners", stale_owners)
+        response = await client.post("/notes/batch", json={"operations": [
+            {"op": "update", "id": ids[0], "title": "Renamed"},
+            {"op": "update", "id": ids[1], "title": "Renamed"},
+            {"op": "update", "id": ids[2], "title": "Renamed"},
+            {"op": "update", "id": ids[0], "title": "Again"},
+        ]}, headers=writer_headers)
+        assert [result["status"] for result in response.json()["results"]] == [200, 404, 409, 400]
+        
+        response = await client.post("/notes/", json={"title": "Raced", "content": "Body"}, headers=writer_headers)
+        deleted_meanwhile[0] = response.json()["id"]
+        response = await client.post("/notes/batch", json={"operations": [
+            {"op": "delete", "id": deleted_meanwhile[0]},
+            {"op": "delete", "id": ids[0]},
+        ]}, headers=admin_headers)
+        monkeypatch.undo()
+        assert [result["status"] for result in response.json()["results"]] == [404, 200]
+        
+        # Each deletion reaches sync clients exactly once
+        changes = await client.get("/notes/changes", headers=writer_headers)
+        assert sorted(changes.json()["deleted"]) == sorted([ids[0], ids[1], deleted_meanwhile[0]])
+    
+    @pytest.mark.asyncio
+    async def test_search_notes(self, client, writer_token):
+        """Test full-text search ranks and highlights matches."""
+        headers = {"Authorization": f"Bearer {writer_token}"}
+        await client.post("/notes/", json={
+            "title": "Quarterly planning",
+            "content": "Budget review for the quarterly planning meeting"
+        }, headers=headers)
+        await client.post("/notes/", json={
+            "title": "Groceries",
+            "content": "Milk, eggs and bread"
+        }, headers=headers)
+        
+        response = await client.get("/notes/search", params={"q": "quarterly"}, headers=headers)
+        assert response.status_code == 200
+        hits = response.json()["items"]
+        assert [hit["title"] for hit in hits] == ["Quarterly planning"]
+        assert "<mark>quarterly</mark>" in hits[0]["snippet"]
+    
+    @pytest.mark.asyncio
+    async def test_search_notes_invalid_cursor(self, client, writer_token):
+        """Test searching with a malformed cursor."""
+        headers = {"Authorization": f"Bearer {writer_token}"}
+        response = await client.get(
+            "/notes/search", params={"q": "anything", "cursor": "%%%"}, headers=headers
+        )
+        assert response.status_code == 400
+    
+    @pytest.mark.asyncio
+    async def test_note_changes(self, client, admin_token):
+        """Test incremental sync reports updates and deletions since a token."""
+        headers = {"Authorization": f"Bearer {admin_token}"}
+        kept = await client.post("/notes/", json={"title": "Kept", "content": "Stays"}, headers=headers)
+        doomed = await client.post("/notes/", json={"title": "Doomed", "content": "Goes"}, headers=headers)
+        kept_id = kept.json()["id"]
+        doomed_id = doomed.json()["id"]
+        
+        initial = await client.get("/notes/changes", headers=headers)
+        assert initial.status_code == 200
+        assert {kept_id, doomed_id} <= {note["id"] for note in initial.json()["updated"]}
+        token = initial.json()["next_token"]
+        
+        await client.put(f"/notes/{kept_id}", json={"title": "Kept and edited"}, headers=headers)
+        await client.delete(f"/notes/{doomed_id}", headers=headers)
+        
+        changes = await client.get("/notes/changes", params={"since": token}, headers=headers)
+        assert changes.status_code == 200
+        data = changes.json()
+        titles = {note["id"]: note["title"] for note in data["updated"]}
+        assert titles[kept_id] == "Kept and edited"
+        assert doomed_id not in titles
+        assert data["deleted"] == [doomed_id]
+        assert data["has_more"] is False
+    
+    @pytest.mark.asyncio
+    async def test_note_changes_invalid_token(self, client, writer_token):
+        """Test polling for changes with a malformed sync token."""
+        headers = {"Authorization": f"Bearer {writer_token}"}
+        response = await client.get("/notes/changes", params={"since": "garbage"}, headers=headers)
+        assert response.status_code == 400
     
     @pytest.mark.asyncio
     async def test_get_note(self, client, writer_token):
@@ -86,6 +357,45 @@ class TestNotes:
         assert data["id"] == note_id
         assert data["title"] == note_data["title"]
     
+    @pytest.mark.asyncio
+    async def test_get_note_conditional(self, client, writer_token):
+        """Test If-None-Match on a single note."""
+        headers = {"Authorization": f"Bearer {writer_token}"}
+        create_response = await client.post("/notes/", json={
+            "title": "Cached Note",
+            "content": "Rarely changes"
+        }, headers=headers)
+        note_id = create_response.json()["id"]
+        
+        first = await client.get(f"/notes/{note_id}", headers=headers)
+        etag = first.headers["etag"]
+        
+        cached = await client.get(f"/notes/{note_id}", headers={**headers, "If-None-Match": etag})
+        assert cached.status_code == 304
+        assert cached.headers["etag"] == etag
+        
+        await asyncio.sleep(0.01)
+        await client.put(f"/notes/{note_id}", json={"title": "Changed"}, headers=headers)
+        refreshed = await client.get(f"/notes/{note_id}", headers={**headers, "If-None-Match": etag})
+        assert refreshed.status_code == 200
+        assert refreshed.json()["title"] == "Changed"
+        assert refreshed.headers["etag"] != etag
+    
+    @pytest.mark.asyncio
+    async def test_list_notes_conditional(self, client, writer_token):
+        """Test If-None-Match on the note listing."""
+        headers = {"Authorization": f"Bearer {writer_token}"}
+        first = await client.get("/notes/", headers=headers)
+        etag = first.headers["etag"]
+        
+        cached = await client.get("/notes/", headers={**headers, "If-None-Match": etag})
+        assert cached.status_code == 304
+        
+        await client.post("/notes/", json={"title": "New", "content": "Listing changed"}, headers=headers)
+        refreshed = await client.get("/notes/", headers={**headers, "If-None-Match": etag})
+        assert refreshed.status_code == 200
+        assert refreshed.headers["etag"] != etag
+    
     @pytest.mark.asyncio
     async def test_get_nonexistent_note(self, client, writer_token):
         """Test getting a note that doesn't exist."""
@@ -123,6 +433,104 @@ class TestNotes:
         assert data["title"] == update_data["title"]
         assert data["content"] == update_data["content"]
     
+    @pytest.mark.asyncio
+    async def test_update_note_bumps_updated_at(self, client, writer_token):
+        """Test updating a note refreshes its updated_at timestamp."""
+        headers = {"Authorization": f"Bearer {writer_token}"}
+        create_response = await client.post("/notes/", json={
+            "title": "Timestamped",
+            "content": "Original"
+        }, headers=headers)
+        note_id = create_response.json()["id"]
+        created = (await client.get(f"/notes/{note_id}", headers=headers)).json()
+        await asyncio.sleep(0.01)
+        
+        update_response = await client.put(
+            f"/notes/{created['id']}", json={"content": "Edited"}, headers=headers
+        )
+        updated = update_response.json()
+        assert updated["updated_at"] > created["updated_at"]
+        assert updated["created_at"] == created["created_at"]
+    
+    @pytest.mark.asyncio
+    async def test_list_notes_sorted_by_updated_at(self, client, writer_token):
+        """Test listing notes most recently updated first."""
+        headers = {"Authorization": f"Bearer {writer_token}"}
+        ids = []
+        for i in range(3):
+            response = await client.post("/notes/", json={
+                "title": f"Recency {i}",
+                "content": "Content"
+            }, headers=headers)
+            ids.append(response.json()["id"])
+        await asyncio.sleep(0.01)
+        await client.put(f"/notes/{ids[0]}", json={"title": "Recency 0 edited"}, headers=headers)
+        
+        seen = []
+        cursor = None
+        while True:
+            params = {"sort": "updated_at", "limit": 2}
+            if cursor:
+                params["cursor"] = cursor
+            response = await client.get("/notes/", params=params, headers=headers)
+            assert response.status_code == 200
+            page = response.json()
+            seen.extend(page["items"])
+            cursor = page["next_cursor"]
+            if not cursor:
+                break
+        
+        assert seen[0]["id"] == ids[0]
+        timestamps = [note["updated_at"] for note in seen]
+        assert timestamps == sorted(timestamps, reverse=True)
+        assert len({note["id"] for note in seen}) == len(seen)
+    
+    @pytest.mark.asyncio
+    async def test_update_note_if_match(self, client, writer_token):
+        """Test optimistic concurrency on update with If-Match."""
+        headers = {"Authorization": f"Bearer {writer_token}"}
+        create_response = await client.post("/notes/", json={
+            "title": "Versioned",
+            "content": "v1"
+        }, headers=headers)
+        note_id = create_response.json()["id"]
+        etag = create_response.headers["etag"]
+        
+        first = await client.put(
+            f"/notes/{note_id}", json={"content": "v2"}, headers={**headers, "If-Match": etag}
+        )
+        assert first.status_code == 200
+        new_etag = first.headers["etag"]
+        assert new_etag != etag
+        
+        stale = await client.put(
+            f"/notes/{note_id}", json={"content": "lost update"}, headers={**headers, "If-Match": etag}
+        )
+        assert stale.status_code == 412
+        assert stale.headers["etag"] == new_etag
+        
+        current = await client.get(f"/notes/{note_id}", headers=headers)
+        assert current.json()["content"] == "v2"
+    
+    @pytest.mark.asyncio
+    async def test_delete_note_if_match(self, client, admin_token):
+        """Test a stale If-Match blocks a delete."""
+        headers = {"Authorization": f"Bearer {admin_token}"}
+        create_response = await client.post("/notes/", json={
+            "title": "Versioned Delete",
+            "content": "v1"
+        }, headers=headers)
+        note_id = create_response.json()["id"]
+        etag = create_response.headers["etag"]
+        await client.put(f"/notes/{note_id}", json={"content": "v2"}, headers=headers)
+        
+        stale = await client.delete(f"/notes/{note_id}", headers={**headers, "If-Match": etag})
+        assert stale.status_code == 412
+        
+        current_etag = (await client.get(f"/notes/{note_id}", headers=headers)).headers["etag"]
+        deleted = await client.delete(f"/notes/{note_id}", headers={**headers, "If-Match": current_etag})
+        assert deleted.status_code == 200
+    
     @pytest.mark.asyncio
     async def test_update_others_note_as_writer(self, client, test_organization, admin_token, writer_token):
         """Test writer trying to update another user's note (should fail)."""
@@ -171,6 +579,17 @@ class TestNotes:
         
         assert update_response.status_code == 200
     
+    @pytest.mark.asyncio
+    async def test_update_nonexistent_note(self, client, writer_token):
+        """Test updating a note that doesn't exist."""
+        headers = {"Authorization": f"Bearer {writer_token}"}
+        response = await client.put(
+            "/notes/000000000000000000000000",
+            json={"title": "Missing"},
+            headers=headers
+        )
+        assert response.status_code == 404
+    
     @pytest.mark.asyncio
     async def test_delete_note_as_admin(self, client, admin_token, writer_token):
         """Test admin deleting another user's note."""
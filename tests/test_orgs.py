@@ -54,4 +54,141 @@ class TestOrganizations:
     async def test_get_nonexistent_organization(self, client):
         """Test getting a organization that doesn't exist."""
         response = await client.get("/organizations/nonexistent_id")
-        assert response.status_code == 404
\ No newline at end of file
+        assert response.status_code == 404
+    
+    @pytest.mark.asyncio
+    async def test_get_organization_without_user_lookup(self, client, test_organization, monkeypatch):
+        """Test the organization endpoint serves the denormalized admin."""
+        from app.models.user import User
+        
+        async def no_user_scan(*args, **kwargs):
+            raise AssertionError("organization lookups must not scan users")
+        
+        monkeypatch.setattr(User, "find_one", no_user_scan)
+        org_id = test_organization["id"]
+        for _ in range(2):
+            response = await client.get(f"/organizations/{org_id}")
+            assert response.status_code == 200
+            assert response.json()["admin_user"]["email"] == "admin@test.com"
+    
+    @pytest.mark.asyncio
+    async def test_admin_summary_follows_role_changes(self, client, test_organization, admin_token):
+        """Test demoting the summarized admin hands the summary to another admin."""
+        org_id = test_organization["id"]
+        headers = {"Authorization": f"Bearer {admin_token}"}
+        response = await client.get(f"/organizations/{org_id}")
+        original_admin_id = response.json()["admin_user"]["id"]
+        
+        await client.post(f"/organizations/{org_id}/users/", json={
+            "email": "second_admin@test.com",
+            "password": "second123",
+            "name": "Second Admin",
+            "role": "admin"
+        }, headers=headers)
+        response = await client.get(f"/organizations/{org_id}")
+        assert response.json()["admin_user"]["id"] == original_admin_id
+        
+        login_response = await client.post(f"/auth/login/{org_id}", json={
+            "email": "second_admin@test.com",
+            "password": "second123"
+        })
+        second_headers = {"Authorization": f"Bearer {login_response.json()['access_token']}"}
+        response = await client.put(
+            f"/organizations/{org_id}/users/{original_admin_id}",
+            json={"role": "reader"},
+            headers=second_headers
+        )
+        assert response.status_code == 200
+        
+        response = await client.get(f"/organizations/{org_id}")
+        assert response.json()["admin_user"]["email"] == "second_admin@test.com"
+    
+    @pytest.mark.asyncio
+    async def test_admin_summary_ignores_stale_cache(self, client, test_organization, admin_token):
+        """Test a role change is checked against the stored summary, not a cached copy."""
+        from app.models.organization import AdminSummary
+        from app.repositories import storage
+        from app.services.organization import organization_cache
+        
+        org_id = test_organization["id"]
+        headers = {"Authorization": f"Bearer {admin_token}"}
+        original_admin_id = test_organization["admin_user"]["id"]
+        second = await client.post(f"/organizations/{org_id}/users/", json={
+            "email": "second_admin@test.com",
+            "password": "second123",
+            "name": "Second Admin",
+            "role": "admin"
+        }, headers=headers)
+        third = await client.post(f"/organizations/{org_id}/users/", json={
+            "email": "third_admin@test.com",
+            "password": "third123",
+            "name": "Third Admin",
+            "role": "admin"
+        }, headers=headers)
+        
+        # This worker's cache wrongly names the second admin
+        stale = await storage.organizations.get(org_id)
+        stale.admin_user = AdminSummary(
+            id=second.json()["id"], email="second_admin@test.com", name="Second Admin"
+        )
+        organization_cache.set(org_id, stale)
+        
+        third_login = await client.post(f"/auth/login/{org_id}", json={
+            "email": "third_admin@test.com",
+            "password": "third123"
+        })
+        third_headers = {"Authorization": f"Bearer {third_login.json()['access_token']}"}
+        response = await client.put(
+            f"/organizations/{org_id}/users/{original_admin_id}",
+            json={"role": "reader"},
+            headers=third_headers
+        )
+        assert response.status_code == 200
+        
+        stored = await storage.organizations.get(org_id)
+        assert stored.admin_user.id != original_admin_id
+    
+    @pytest.mark.asyncio
+    async def test_admin_summary_backfilled(self, client, test_organization):
+        """Test organizations created before the summary existed get one on read."""
+        from bson import ObjectId
+        from app.models.organization import Organization
+        from app.services.organization import invalidate_organization
+        
+        org_id = test_organization["id"]
+        await Organization.get_motor_collection().update_one(
+            {"_id": ObjectId(org_id)}, {"$unset": {"admin_user": ""}}
+        )
+        invalidate_organization(org_id)
+        
+        response = await client.get(f"/organizations/{org_id}")
+        assert response.json()["admin_user"]["email"] == "admin@test.com"
+        organization = await Organization.get(ObjectId(org_id))
+        assert organization.admin_user.email == "admin@test.com"
+    
+    @pytest.mark.asyncio
+    async def test_failed_admin_insert_leaves_no_organization(self, client, monkeypatch):
+        """Test a failed admin insert does not leave an orphaned organization."""
+        from httpx import ASGITransport, AsyncClient
+        from main import app
+        from app.models.organization import Organization
+        from app.models.user import User
+        
+        async def failing_insert(self, *args, **kwargs):
+            raise RuntimeError("insert failed")
+        
+        monkeypatch.setattr(User, "insert", failing_insert)
+        org_data = {
+            "name": "Orphan Org",
+            "description": "Should not survive",
+            "admin_email": "orphan@test.com",
+            "admin_password": "orphan123",
+            "admin_name": "Orphan Admin"
+        }
+        # Let the failure reach the client as the 500 a real server would send
+        transport = ASGITransport(app=app, raise_app_exceptions=False)
+        async with AsyncClient(transport=transport, base_url="http://test") as server_client:
+            response = await server_client.post("/organizations/", json=org_data)
+        assert response.status_code == 500
+        
+        assert await Organization.find_one({"name": "Orphan Org"}) is None
@@ -0,0 +1,101 @@
+import pytest
+
+from app.services.ratelimit import (
+    MemoryBucketStore, RateLimit, classify_route, parse_limit, rate_limiter
+)
+
+
+class TestRateLimit:
+    """Test tenant-aware token bucket rate limiting."""
+
+    @pytest.mark.asyncio
+    async def test_user_limit_returns_429(self, client, writer_token, monkeypatch):
+        """Test a user exceeding the write limit gets 429 with Retry-After."""
+        monkeypatch.setitem(rate_limiter.limits, "write", RateLimit(rate=0.5, burst=2))
+        headers = {"Authorization": f"Bearer {writer_token}"}
+        note_data = {"title": "Limited", "content": "content"}
+
+        for _ in range(2):
+            response = await client.post("/notes/", json=note_data, headers=headers)
+            assert response.status_code == 200
+
+        response = await client.post("/notes/", json=note_data, headers=headers)
+        assert response.status_code == 429
+        assert response.headers["retry-after"] == "2"
+
+        # Other route classes have their own buckets
+        response = await client.get("/notes/", headers=headers)
+        assert response.status_code == 200
+
+    @pytest.mark.asyncio
+    async def test_tenant_limit_shared_by_users(self, client, admin_token, writer_token, monkeypatch):
+        """Test the organization bucket caps all of a tenant's users together."""
+        monkeypatch.setitem(rate_limiter.limits, "read", RateLimit(rate=0.01, burst=2))
+        monkeypatch.setattr(rate_limiter, "tenant_factor", 1.5)
+
+        admin_headers = {"Authorization": f"Bearer {admin_token}"}
+        writer_headers = {"Authorization": f"Bearer {writer_token}"}
+        assert (await client.get("/notes/", headers=admin_headers)).status_code == 200
+        assert (await client.get("/notes/", headers=writer_headers)).status_code == 200
+        # Each user still has a token left, but the tenant bucket of 3 is empty
+        assert (await client.get("/notes/", headers=admin_headers)).status_code == 200
+        assert (await client.get("/notes/", headers=writer_headers)).status_code == 429
+
+    @pytest.mark.asyncio
+    async def test_denied_user_does_not_drain_tenant(self, client, admin_token, writer_token, monkeypatch):
+        """Test requests refused by a user's own bucket are not charged to the tenant."""
+        monkeypatch.setitem(rate_limiter.limits, "read", RateLimit(rate=0.01, burst=1))
+        monkeypatch.setattr(rate_limiter, "tenant_factor", 2)
+
+        admin_headers = {"Authorization": f"Bearer {admin_token}"}
+        writer_headers = {"Authorization": f"Bearer {writer_token}"}
+        assert (await client.get("/notes/", headers=admin_headers)).status_code == 200
+        for _ in range(5):
+            assert (await client.get("/notes/", headers=admin_headers)).status_code == 429
+        assert (await client.get("/notes/", headers=writer_headers)).status_code == 200
+
+    @pytest.mark.asyncio
+    async def test_health_not_limited(self, client, monkeypatch):
+        """Test unclassified routes bypass the limiter."""
+        monkeypatch.setitem(rate_limiter.limits, "read", RateLimit(rate=0.01, burst=1))
+        for _ in range(3):
+            assert (await client.get("/health")).status_code == 200
+
+    @pytest.mark.asyncio
+    async def test_idle_buckets_evicted(self):
+        """Test buckets that have refilled are dropped from the store."""
+        store = MemoryBucketStore(max_keys=100)
+        limit = RateLimit(rate=1000, burst=1)
+        assert await store.take("a", limit) == (True, 0.0)
+        allowed, retry_after = await store.take("a", limit)
+        assert not allowed and retry_after > 0
+
+        store._buckets["a"][2] = 0  # pretend it has been idle past its horizon
+        await store.take("b", limit)
+        assert len(store) == 1
+
+    @pytest.mark.asyncio
+    async def test_drained_buckets_kept_past_max_keys(self):
+        """Test a full store drops full buckets but never hands a drained key a fresh burst."""
+        store = MemoryBucketStore(max_keys=2)
+        slow = RateLimit(rate=0.01, burst=1)
+        assert (await store.take("drained", slow))[0]
+        await store.take("idle", slow)
+        store._buckets["idle"][2] = 0  # pretend it has refilled
+
+        await store.take("new", slow)
+        assert "idle" not in store._buckets and "drained" in store._buckets
+        await store.take("newer", slow)
+        assert len(store) == 3
+        allowed, _ = await store.take("drained", slow)
+        assert not allowed
+
+    def test_parse_and_classify(self):
+        """Test limit parsing and route classification."""
+        assert parse_limit("120/60") == RateLimit(rate=2.0, burst=120.0)
+        assert parse_limit("off") is None
+        assert classify_route("POST", "/auth/login/abc") == "auth"
+        assert classify_route("GET", "/notes/export") == "bulk"
+        assert classify_route("GET", "/notes/") == "read"
+        assert classify_route("DELETE", "/notes/abc") == "write"
+        assert classify_route("GET", "/health") is None
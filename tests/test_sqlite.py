@@ -0,0 +1,223 @@
+import json
+
+import pytest
+import pytest_asyncio
+
+from app.repositories import storage, build_backend, NoteWrite
+from app.repositories.sqlite import SQLiteBackend, fetch_one, fts_query
+
+
+@pytest_asyncio.fixture(autouse=True)
+async def sqlite_storage(tmp_path, monkeypatch):
+    """Serve every request in this module from a fresh SQLite file."""
+    from app.services.auth import principal_cache, user_version_cache
+    from app.services.organization import organization_cache
+    from app.services.revocation import revocation_list
+
+    backend = SQLiteBackend(str(tmp_path / "notes.db"))
+    await backend.connect()
+    monkeypatch.setattr(storage, "backend", backend)
+    for cache in (principal_cache, user_version_cache, organization_cache):
+        cache.clear()
+    revocation_list.reset()
+    yield backend
+    await backend.close()
+    revocation_list.reset()
+
+
+class TestSQLiteBackend:
+    """Test the API end to end on the SQLite storage backend."""
+
+    @pytest.mark.asyncio
+    async def test_database_uses_wal(self, sqlite_storage):
+        """Test the database file is switched to write-ahead logging."""
+        row = await sqlite_storage.db.read(fetch_one, "PRAGMA journal_mode")
+        assert row[0] == "wal"
+
+    def test_mongo_only_settings_rejected(self, monkeypatch):
+        """Test settings that need MongoDB stop a SQLite deployment at startup."""
+        from app.database import settings
+        from app.services import ratelimit
+
+        monkeypatch.setattr(settings, "SECONDARY_READS", True)
+        with pytest.raises(ValueError):
+            build_backend("sqlite")
+        monkeypatch.setattr(settings, "SECONDARY_READS", False)
+        monkeypatch.setattr(ratelimit, "RATE_LIMIT_BACKEND", "mongo")
+        with pytest.raises(ValueError):
+            build_backend("sqlite")
+
+    def test_fts_query(self):
+        """Test MongoDB text search syntax is translated for FTS5."""
+        assert fts_query("org", "budget plan") == (
+            'organization_id : "org" AND {title content} : ("budget" OR "plan")'
+        )
+        assert fts_query("org", '"quarterly plan" budget -draft') == (
+            'organization_id : "org" AND {title content} : (("quarterly plan") NOT "draft")'
+        )
+        assert fts_query("org", "-draft") is None
+
+    @pytest.mark.asyncio
+    async def test_note_lifecycle(self, client, admin_token):
+        """Test creating, paging, updating, deleting and syncing notes."""
+        headers = {"Authorization": f"Bearer {admin_token}"}
+        ids = []
+        for i in range(3):
+            response = await client.post("/notes/", json={
+                "title": f"SQLite Note {i}",
+                "content": "x" * 300
+            }, headers=headers)
+            assert response.status_code == 200
+            ids.append(response.json()["id"])
+
+        first = await client.get("/notes/", params={"limit": 2}, headers=headers)
+        assert [note["id"] for note in first.json()["items"]] == ids[:2]
+        second = await client.get(
+            "/notes/", params={"limit": 2, "cursor": first.json()["next_cursor"]}, headers=headers
+        )
+        assert [note["id"] for note in second.json()["items"]] == ids[2:]
+        assert second.json()["next_cursor"] is None
+
+        summary = await client.get(
+            "/notes/", params={"view": "summary", "excerpt": True}, headers=headers
+        )
+        assert len(summary.json()["items"][0]["excerpt"]) == 200
+
+        note = await client.get(f"/notes/{ids[0]}", headers=headers)
+        etag = note.headers["etag"]
+        updated = await client.put(
+            f"/notes/{ids[0]}", json={"title": "Edited"}, headers={**headers, "If-Match": etag}
+        )
+        assert updated.status_code == 200
+        assert updated.json()["title"] == "Edited"
+        assert updated.headers["etag"] == '"2"'
+        stale = await client.put(
+            f"/notes/{ids[0]}", json={"title": "Again"}, headers={**headers, "If-Match": etag}
+        )
+        assert stale.status_code == 412
+
+        recent = await client.get("/notes/", params={"sort": "updated_at", "limit": 1}, headers=headers)
+        assert recent.json()["items"][0]["id"] == ids[0]
+
+        initial = await client.get("/notes/changes", headers=headers)
+        assert len(initial.json()["updated"]) == 3
+        response = await client.delete(f"/notes/{ids[1]}", headers=headers)
+        assert response.status_code == 200
+        assert (await client.get(f"/notes/{ids[1]}", headers=headers)).status_code == 404
+
+        changes = await client.get("/notes/changes", params={"since": initial.json()["next_token"]}, headers=headers)
+        assert ids[1] in changes.json()["deleted"]
+
+        export = await client.get("/notes/export", headers=headers)
+        assert [json.loads(line)["id"] for line in export.text.splitlines()] == [ids[0], ids[2]]
+
+    @pytest.mark.asyncio
+    async def test_search_stays_in_tenant(self, client, admin_token):
+        """Test full-text search ranks matches and never crosses organizations."""
+        headers = {"Authorization": f"Bearer {admin_token}"}
+        for title, content in [
+            ("Budget review", "Quarterly budget planning for the robotics team"),
+            ("Groceries", "Milk, eggs and a planning notebook"),
+            ("Offsite", "Planning the team offsite"),
+        ]:
+            await client.post("/notes/", json={"title": title, "content": content}, headers=headers)
+
+        other = await client.post("/organizations/", json={
+            "name": "Other Org",
+            "admin_email": "other@test.com",
+            "admin_password": "other123",
+            "admin_name": "Other Admin"
+        })
+        other_login = await client.post(
+            f"/auth/login/{other.json()['id']}",
+            json={"email": "other@test.com", "password": "other123"}
+        )
+        other_headers = {"Authorization": f"Bearer {other_login.json()['access_token']}"}
+        await client.post("/notes/", json={"title": "Budget", "content": "budget"}, headers=other_headers)
+
+        response = await client.get("/notes/search", params={"q": "budget"}, headers=headers)
+        assert response.status_code == 200
+        hits = response.json()["items"]
+        assert [hit["title"] for hit in hits] == ["Budget review"]
+        assert "<mark>" in hits[0]["snippet"]
+
+        response = await client.get("/notes/search", params={"q": "planning -milk"}, headers=headers)
+        assert {hit["title"] for hit in response.json()["items"]} == {"Budget review", "Offsite"}
+
+        response = await client.get("/notes/search", params={"q": '"team offsite"'}, headers=headers)
+        assert [hit["title"] for hit in response.json()["items"]] == ["Offsite"]
+
+    @pytest.mark.asyncio
+    async def test_batch_notes(self, client, admin_token):
+        """Test a mixed batch is applied in one transaction with per-item results."""
+        headers = {"Authorization": f"Bearer {admin_token}"}
+        existing = (await client.post("/notes/", json={"title": "Old", "content": "Body"}, headers=headers)).json()
+        doomed = (await client.post("/notes/", json={"title": "Doomed", "content": "Body"}, headers=headers)).json()
+
+        response = await client.post("/notes/batch", json={"operations": [
+            {"op": "create", "title": "Batch", "content": "Created"},
+            {"op": "update", "id": existing["id"], "title": "Renamed"},
+            {"op": "delete", "id": doomed["id"]},
+            {"op": "delete", "id": "0" * 24},
+            {"op": "delete", "id": doomed["id"]},
+        ]}, headers=headers)
+        assert [result["status"] for result in response.json()["results"]] == [200, 200, 200, 404, 400]
+
+        created_id = response.json()["results"][0]["id"]
+        assert (await client.get(f"/notes/{created_id}", headers=headers)).json()["title"] == "Batch"
+        renamed = await client.get(f"/notes/{existing['id']}", headers=headers)
+        assert renamed.json()["title"] == "Renamed"
+        assert renamed.headers["etag"] == '"2"'
+        assert (await client.get(f"/notes/{doomed['id']}", headers=headers)).status_code == 404
+
+        # Writes that match nothing are reported, not counted as applied
+        failures = await storage.notes.bulk_write([
+            NoteWrite("update", existing["id"], {"title": "Taken"}, owner_id="someone-else"),
+            NoteWrite("delete", doomed["id"]),
+        ], renamed.json()["organization_id"])
+        assert {position: status for position, (status, _) in failures.items()} == {0: 409, 1: 404}
+
+    @pytest.mark.asyncio
+    async def test_users_and_sessions(self, client, test_organization, admin_token, test_user):
+        """Test unique emails, role changes, refresh rotation and logout."""
+        org_id = test_organization["id"]
+        headers = {"Authorization": f"Bearer {admin_token}"}
+        duplicate = await client.post(f"/organizations/{org_id}/users/", json={
+            "email": "writer@test.com",
+            "password": "writer123",
+            "name": "Duplicate",
+            "role": "writer"
+        }, headers=headers)
+        assert duplicate.status_code == 400
+
+        promoted = await client.put(
+            f"/organizations/{org_id}/users/{test_user['id']}", json={"role": "reader"}, headers=headers
+        )
+        assert promoted.json()["role"] == "reader"
+
+        login = await client.post(
+            f"/auth/login/{org_id}", json={"email": "writer@test.com", "password": "writer123"}
+        )
+        assert login.json()["user"]["role"] == "reader"
+        refresh_token = login.json()["refresh_token"]
+
+        rotated = await client.post("/auth/refresh", json={"refresh_token": refresh_token})
+        assert rotated.status_code == 200
+        reused = await client.post("/auth/refresh", json={"refresh_token": refresh_token})
+        assert reused.status_code == 401
+        # Reusing the old token revoked the whole session
+        revoked = await client.post("/auth/refresh", json={"refresh_token": rotated.json()["refresh_token"]})
+        assert revoked.status_code == 401
+
+        access_token = rotated.json()["access_token"]
+        logout = await client.post(
+            "/auth/logout",
+            json={"refresh_token": login.json()["refresh_token"]},
+            headers={"Authorization": f"Bearer {access_token}"}
+        )
+        assert logout.status_code == 200
+        me = await client.get("/auth/me", headers={"Authorization": f"Bearer {access_token}"})
+        assert me.status_code == 401
+
+        organization = await client.get(f"/organizations/{org_id}")
+        assert organization.json()["admin_user"]["email"] == "admin@test.com"
@@ -166,4 +166,141 @@ class TestUsers:
             headers=headers
         )
         
-        assert response.status_code == 400
\ No newline at end of file
+        assert response.status_code == 400
+    
+    @pytest.mark.asyncio
+    async def test_role_change_takes_effect_immediately(self, client, test_organization, admin_token, test_user, writer_token):
+        """Test a demoted user loses permissions on their very next request."""
+        org_id = test_organization["id"]
+        writer_headers = {"Authorization": f"Bearer {writer_token}"}
+        
+        # Warm the principal cache with the writer
+        response = await client.get("/auth/me", headers=writer_headers)
+        assert response.json()["role"] == "writer"
+        
+        headers = {"Authorization": f"Bearer {admin_token}"}
+        await client.put(
+            f"/organizations/{org_id}/users/{test_user['id']}",
+            json={"role": "reader"},
+            headers=headers
+        )
+        
+        response = await client.post("/notes/", json={
+            "title": "Should fail",
+            "content": "Writer was demoted"
+        }, headers=writer_headers)
+        assert response.status_code == 403
+    
+    @pytest.mark.asyncio
+    async def test_deleted_user_token_rejected(self, client, test_organization, admin_token, test_user, writer_token):
+        """Test a deleted user's token stops working right away."""
+        org_id = test_organization["id"]
+        writer_headers = {"Authorization": f"Bearer {writer_token}"}
+        
+        response = await client.get("/auth/me", headers=writer_headers)
+        assert response.status_code == 200
+        
+        headers = {"Authorization": f"Bearer {admin_token}"}
+        await client.delete(f"/organizations/{org_id}/users/{test_user['id']}", headers=headers)
+        
+        response = await client.get("/auth/me", headers=writer_headers)
+        assert response.status_code == 401
+    
+    @pytest.mark.asyncio
+    async def test_stateless_role_claims(self, client, test_organization, admin_token, test_user, monkeypatch):
+        """Test notes are authorized from token claims without loading the user."""
+        from beanie import PydanticObjectId
+        from app.models.user import User
+        from app.services import auth as auth_service
+        monkeypatch.setattr(auth_service, "STATELESS_AUTH", True)
+        
+        org_id = test_organization["id"]
+        response = await client.post(f"/auth/login/{org_id}", json={
+            "email": "writer@test.com",
+            "password": "writer123"
+        })
+        writer_token = response.json()["access_token"]
+        writer_headers = {"Authorization": f"Bearer {writer_token}"}
+        claims = auth_service.decode_access_token(writer_token)
+        assert claims["role"] == "writer" and claims["ver"] == 0
+        
+        async def no_user_fetch(*args, **kwargs):
+            raise AssertionError("stateless tokens must not load the user")
+        
+        monkeypatch.setattr(User, "get", no_user_fetch)
+        response = await client.post("/notes/", json={
+            "title": "Stateless",
+            "content": "Authorized from claims"
+        }, headers=writer_headers)
+        assert response.status_code == 200
+        monkeypatch.undo()
+        monkeypatch.setattr(auth_service, "STATELESS_AUTH", True)
+        
+        # Demotion bumps the user's version, so the old claims are refused
+        headers = {"Authorization": f"Bearer {admin_token}"}
+        await client.put(
+            f"/organizations/{org_id}/users/{test_user['id']}",
+            json={"role": "reader"},
+            headers=headers
+        )
+        # Role and version change together in a single write
+        demoted = await User.get(PydanticObjectId(test_user["id"]))
+        assert (demoted.role, demoted.token_version) == ("reader", 1)
+        response = await client.get("/notes/", headers=writer_headers)
+        assert response.status_code == 401
+        
+        response = await client.post(f"/auth/login/{org_id}", json={
+            "email": "writer@test.com",
+            "password": "writer123"
+        })
+        reader_headers = {"Authorization": f"Bearer {response.json()['access_token']}"}
+        response = await client.get("/notes/", headers=reader_headers)
+        assert response.status_code == 200
+        response = await client.post("/notes/", json={
+            "title": "Should fail",
+            "content": "Now a reader"
+        }, headers=reader_headers)
+        assert response.status_code == 403
+    
+    @pytest.mark.asyncio
+    async def test_claims_ignored_when_stateless_off(self, client, test_organization, test_user, monkeypatch):
+        """Test tokens issued in stateless mode load the user once the mode is off."""
+        from app.repositories import storage
+        from app.services import auth as auth_service
+        monkeypatch.setattr(auth_service, "STATELESS_AUTH", True)
+        
+        org_id = test_organization["id"]
+        response = await client.post(f"/auth/login/{org_id}", json={
+            "email": "writer@test.com",
+            "password": "writer123"
+        })
+        headers = {"Authorization": f"Bearer {response.json()['access_token']}"}
+        
+        # The stored role changes without a version bump, so only a user load sees it
+        await storage.users.update(test_user["id"], {"role": "reader"})
+        auth_service.invalidate_principal(test_user["id"])
+        monkeypatch.setattr(auth_service, "STATELESS_AUTH", False)
+        response = await client.post("/notes/", json={
+            "title": "Stale claims",
+            "content": "Still says writer"
+        }, headers=headers)
+        assert response.status_code == 403
+    
+    @pytest.mark.asyncio
+    async def test_concurrent_duplicate_users(self, client, test_organization, admin_token):
+        """Test the unique index lets only one of two racing creates through."""
+        import asyncio
+        
+        org_id = test_organization["id"]
+        headers = {"Authorization": f"Bearer {admin_token}"}
+        user_data = {
+            "email": "racer@test.com",
+            "password": "racer123",
+            "name": "Racer",
+            "role": "reader"
+        }
+        responses = await asyncio.gather(*[
+            client.post(f"/organizations/{org_id}/users/", json=user_data, headers=headers)
+            for _ in range(2)
+        ])
+        assert sorted(response.status_code for response in responses) == [200, 400]